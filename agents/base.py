@@ -4,8 +4,25 @@ from __future__ import annotations
 
 import abc
 import asyncio
+import concurrent.futures
+import dataclasses
+import functools
+import inspect
 import json
-from typing import Any, Dict, Optional, AsyncIterator
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    ClassVar,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
 from pathlib import Path
 
 try:
@@ -15,14 +32,12 @@ try:
 except ImportError:
     LLM_AVAILABLE = False
 
+from agents.common.metrics import instrument_run, instrument_run_async
+from agents.common.profiling import profile_run, profile_run_async
 
-def resolve_platform_log(agent_name: str) -> Path:
-    """Return a writable log file path for the given agent.
 
-    Prefers /logs/<agent>.log, but gracefully falls back to ./logs or /tmp/logs if
-    /logs is not writable (helpful for local dev and tests). Always ensures the
-    directory exists.
-    """
+@functools.lru_cache(maxsize=None)
+def _platform_log_dir() -> Path:
     candidates = [Path("/logs"), Path.cwd() / "logs", Path("/tmp/logs")]
     for cand in candidates:
         try:
@@ -33,18 +48,202 @@ def resolve_platform_log(agent_name: str) -> Path:
                 test_file.unlink()
             except Exception:
                 pass
-            return cand / f"{agent_name}.log"
+            return cand
         except Exception:
             continue
     # Last resort: relative logs dir
     fallback = Path("logs")
     fallback.mkdir(parents=True, exist_ok=True)
-    return fallback / f"{agent_name}.log"
+    return fallback
+
+
+def resolve_platform_log(agent_name: str) -> Path:
+    """Return a writable log file path for the given agent.
+
+    Prefers /logs/<agent>.log, but gracefully falls back to ./logs or /tmp/logs if
+    /logs is not writable (helpful for local dev and tests). The directory is probed
+    once per process; call ``resolve_platform_log.cache_clear()`` to probe again.
+    """
+    return _platform_log_dir() / f"{agent_name}.log"
+
+
+resolve_platform_log.cache_clear = _platform_log_dir.cache_clear  # type: ignore[attr-defined]
+
+
+COST_CLASSES = frozenset({"cpu", "io", "net"})
+
+
+@dataclass(frozen=True)
+class CommandSpec:
+    """Declarative description of a command exposed by an agent."""
+
+    name: str
+    handler: Callable[..., Any]
+    args: Mapping[str, Any] = field(default_factory=dict)
+    cost: str = "cpu"
+    restricted: bool = False
+    idempotent: bool = False
+    description: str = ""
+    async_handler: Optional[Callable[..., Awaitable[Any]]] = None
+
+    @property
+    def is_async(self) -> bool:
+        """True when the command has a native coroutine implementation."""
+        return self.async_handler is not None or inspect.iscoroutinefunction(self.handler)
+
+    def validate(self, args: Mapping[str, Any]) -> Dict[str, Any]:
+        """Check supplied arguments against the declared schema; returns them normalized.
+
+        Numbers given for ``str`` arguments (the CLI parses ``--arg device_id=42`` as
+        an int) are passed on as strings. Any other mismatch is rejected.
+        """
+        normalized = dict(args)
+        for key, expected in self.args.items():
+            value = args.get(key)
+            if value is None or _matches(value, expected):
+                continue
+            types = expected if isinstance(expected, tuple) else (expected,)
+            if str in types and isinstance(value, (int, float)) and not isinstance(value, bool):
+                normalized[key] = str(value)
+                continue
+            raise ValueError(
+                f"argument '{key}' for '{self.name}' must be {_type_name(expected)}"
+            )
+        return normalized
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "args": {key: _type_name(expected) for key, expected in self.args.items()},
+            "cost": self.cost,
+            "restricted": self.restricted,
+            "idempotent": self.idempotent,
+            "async": self.is_async,
+            "description": self.description,
+        }
+
+
+def _type_name(expected: Any) -> str:
+    if isinstance(expected, tuple):
+        return "/".join(t.__name__ for t in expected)
+    return expected.__name__
+
+
+def _matches(value: Any, expected: Any) -> bool:
+    types = expected if isinstance(expected, tuple) else (expected,)
+    if isinstance(value, bool) and bool not in types:
+        return False
+    if isinstance(value, types):
+        return True
+    if float in types and isinstance(value, int):
+        return True
+    if isinstance(value, str) and (int in types or float in types):
+        try:
+            float(value)
+            return True
+        except ValueError:
+            return False
+    return False
+
+
+def command(
+    name: Optional[str] = None,
+    *,
+    args: Optional[Mapping[str, Any]] = None,
+    cost: str = "cpu",
+    restricted: bool = False,
+    idempotent: bool = False,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Register a method as an agent command.
+
+    The decorated method is called as ``handler(self, args)``. ``args`` maps argument
+    names to the accepted type (or tuple of types); ``cost`` is one of cpu, io or net
+    and lets schedulers place work; ``restricted`` marks commands that agents may gate;
+    ``idempotent`` commands have no side effects and may be retried on another replica.
+    """
+    if cost not in COST_CLASSES:
+        raise ValueError(f"unknown cost class '{cost}'")
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        doc = (func.__doc__ or "").strip().splitlines()
+        spec = CommandSpec(
+            name=name or func.__name__.lstrip("_"),
+            handler=func,
+            args=dict(args or {}),
+            cost=cost,
+            restricted=restricted,
+            idempotent=idempotent,
+            description=doc[0] if doc else "",
+        )
+        func.__agent_commands__ = [*getattr(func, "__agent_commands__", []), spec]
+        return func
+
+    return decorator
+
+
+def async_command(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Register a coroutine as the native async implementation of command ``name``.
+
+    ``run_async`` awaits it instead of pushing the synchronous handler onto an
+    executor; the synchronous handler keeps serving ``run``.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        if not inspect.iscoroutinefunction(func):
+            raise TypeError(f"async implementation of '{name}' must be a coroutine function")
+        func.__agent_async_commands__ = [*getattr(func, "__agent_async_commands__", []), name]
+        return func
+
+    return decorator
+
+
+def _run_coroutine_sync(coro: Awaitable[Any]) -> Any:
+    """Drive ``coro`` to completion from synchronous code, even inside a running loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+CommandHook = Callable[[str, CommandSpec, float, Optional[BaseException]], None]
+_command_hooks: List[CommandHook] = []
+
+
+def add_command_hook(hook: CommandHook) -> None:
+    """Register ``hook(agent, spec, seconds, error)`` to observe every dispatched command."""
+    if hook not in _command_hooks:
+        _command_hooks.append(hook)
+
+
+def remove_command_hook(hook: CommandHook) -> None:
+    if hook in _command_hooks:
+        _command_hooks.remove(hook)
 
 
 class BaseAgent(abc.ABC):
     """Base class that defines the required agent interface with optional LLM integration."""
 
+    _commands: ClassVar[Dict[str, CommandSpec]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        commands: Dict[str, CommandSpec] = dict(cls._commands)
+        for attr in vars(cls).values():
+            for spec in getattr(attr, "__agent_commands__", ()):
+                commands[spec.name] = spec
+        for attr in vars(cls).values():
+            for name in getattr(attr, "__agent_async_commands__", ()):
+                if name not in commands:
+                    raise TypeError(f"async implementation for unknown command '{name}'")
+                commands[name] = dataclasses.replace(commands[name], async_handler=attr)
+        cls._commands = commands
+        if "run" in vars(cls):
+            cls.run = instrument_run(profile_run(vars(cls)["run"]))
+        if "run_async" in vars(cls):
+            cls.run_async = instrument_run_async(profile_run_async(vars(cls)["run_async"]))
+
     def __init__(
         self,
         name: str,
@@ -111,10 +310,84 @@ class BaseAgent(abc.ABC):
         """Disable LLM for this agent."""
         self.llm_enabled = False
 
+    def list_commands(self) -> List[Dict[str, Any]]:
+        """Describe every registered command, sorted by name."""
+        return [self._commands[name].describe() for name in sorted(self._commands)]
+
+    def get_command(self, command: Optional[str]) -> Optional[CommandSpec]:
+        return self._commands.get(command or "")
+
+    def _authorize_command(self, spec: CommandSpec) -> None:
+        """Hook for agents that gate restricted commands; raise PermissionError to deny."""
+
+    def _resolve_command(
+        self, command: Optional[str], args: Dict[str, Any]
+    ) -> Tuple[CommandSpec, Dict[str, Any]]:
+        spec = self._commands.get(command or "")
+        if spec is None:
+            raise ValueError(f"unknown command '{command}'")
+        self._authorize_command(spec)
+        return spec, spec.validate(args)
+
+    def _notify_hooks(
+        self, spec: CommandSpec, elapsed: float, failure: Optional[BaseException]
+    ) -> None:
+        for hook in list(_command_hooks):
+            try:
+                hook(self.name, spec, elapsed, failure)
+            except Exception:
+                pass
+
+    def dispatch_command(self, command: Optional[str], args: Dict[str, Any]) -> Any:
+        """Look up ``command`` in the registry, validate ``args`` and invoke its handler."""
+        spec, args = self._resolve_command(command, args)
+        started = time.perf_counter()
+        failure: Optional[BaseException] = None
+        try:
+            result = spec.handler(self, args)
+            if inspect.isawaitable(result):
+                result = _run_coroutine_sync(result)
+            return result
+        except BaseException as exc:
+            failure = exc
+            raise
+        finally:
+            self._notify_hooks(spec, time.perf_counter() - started, failure)
+
+    async def dispatch_command_async(self, command: Optional[str], args: Dict[str, Any]) -> Any:
+        """Async counterpart of :meth:`dispatch_command`.
+
+        Awaits the command's native coroutine when it has one and otherwise runs the
+        synchronous handler on the loop's default executor.
+        """
+        spec, args = self._resolve_command(command, args)
+        started = time.perf_counter()
+        failure: Optional[BaseException] = None
+        try:
+            if spec.async_handler is not None:
+                return await spec.async_handler(self, args)
+            if inspect.iscoroutinefunction(spec.handler):
+                return await spec.handler(self, args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, functools.partial(spec.handler, self, args))
+        except BaseException as exc:
+            failure = exc
+            raise
+        finally:
+            self._notify_hooks(spec, time.perf_counter() - started, failure)
+
     @abc.abstractmethod
     def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Execute agent logic and return a standardized response."""
 
+    async def run_async(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Async entry point; by default runs :meth:`run` on the default executor.
+
+        Agents override this to await native async command implementations.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.run, payload)
+
 
 # Backwards compatibility alias
 Agent = BaseAgent
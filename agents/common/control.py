@@ -1,43 +1,393 @@
-import os, json, threading, time, signal, sys
+"""Agent control bus.
+
+Tasks travel over Redis Streams (``agent.<name>.tasks`` and ``agent.all.tasks``)
+read through a per-agent consumer group, so every replica of an agent shares the
+work, each task is delivered to exactly one replica, and nothing is acknowledged
+until a handler has finished it. Unacknowledged tasks are reclaimed after
+``CONTROL_RETRY_IDLE_MS`` and moved to ``agent.<name>.tasks.dead`` once they have
+been delivered ``CONTROL_MAX_DELIVERIES`` times. Tasks still being handled in this
+process have their idle time reset on every reclaim pass, so long handlers are
+never picked up a second time.
+
+Handlers are registered in-process with :func:`on_task` (called on a worker pool,
+returning normally acks the task) or consumed from an asyncio queue obtained via
+:func:`task_queue` (call ``task.ack()`` when done). A task is acknowledged once
+the handlers and every queue consumer are done with it, and counts against
+``CONTROL_MAX_INFLIGHT`` until then. The legacy pub/sub channels
+``agent.<name>.control`` and ``agent.all.control`` still carry ``ping`` and
+``cycle`` operations; other operations go to handlers registered with :func:`on_op`.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
 import redis
-from urllib.parse import urlparse
-from .alog import info
+
+from . import redis_client
+from .alog import info, warn
+from .metrics import register_gauge
+from .redis_client import _parse_redis_db_from_url  # noqa: F401 - re-exported for callers
 
 AGENT = os.getenv("AGENT_NAME", "unknown")
-REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
-REDIS_DB = int(os.getenv("REDIS_DB")) if os.getenv("REDIS_DB") else None
+REDIS_URL = redis_client.redis_url()
+REDIS_DB = redis_client.env_redis_db()
+
+MAX_INFLIGHT = int(os.getenv("CONTROL_MAX_INFLIGHT", "16"))
+RETRY_IDLE_MS = int(os.getenv("CONTROL_RETRY_IDLE_MS", "30000"))
+MAX_DELIVERIES = int(os.getenv("CONTROL_MAX_DELIVERIES", "5"))
+STREAM_MAXLEN = int(os.getenv("CONTROL_STREAM_MAXLEN", "10000"))
+BLOCK_MS = 1000
 
-def _parse_redis_db_from_url(redis_url: str) -> int:
-    """Parse Redis database number from URL, defaulting to 0."""
-    try:
-        parsed = urlparse(redis_url)
-        if parsed.path and len(parsed.path) > 1:
-            # Extract DB number from path like '/2'
-            db_str = parsed.path.lstrip('/')
-            return int(db_str) if db_str.isdigit() else 0
-    except:
-        pass
-    return 0
 
 def _get_redis_connection():
-    """Create Redis connection with proper DB selection and logging."""
-    if REDIS_DB is not None:
-        db_num = REDIS_DB
-    else:
-        db_num = _parse_redis_db_from_url(REDIS_URL)
-    
-    # Create base URL without database path
-    parsed = urlparse(REDIS_URL)
-    base_url = f"{parsed.scheme}://{parsed.netloc}"
-    
-    client = redis.from_url(base_url, db=db_num, decode_responses=True)
-    
-    # Log Redis connection for audit
-    info(f"agent-{AGENT}: Connected to Redis database {db_num} at {base_url}")
-    
-    return client
+    """Return a client on the shared, health-checked connection pool."""
+    return redis_client.get_client()
+
+
+def task_stream(agent: str) -> str:
+    return f"agent.{agent}.tasks"
+
+
+BROADCAST_STREAM = "agent.all.tasks"
+
+
+@dataclass
+class ControlTask:
+    """A task read from the control streams, pending until acknowledged."""
+
+    id: str
+    stream: str
+    op: str
+    args: Dict[str, Any]
+    deliveries: int = 1
+    _bus: Optional["ControlBus"] = field(default=None, repr=False)
+    _done: bool = field(default=False, repr=False)
+    # Recipients (the handler pool and each queue) that have not finished yet
+    _parts: int = field(default=1, repr=False)
+    _counted: bool = field(default=False, repr=False)
+
+    def ack(self) -> None:
+        """Mark this recipient done; the task is acknowledged once every recipient is."""
+        if self._bus is not None:
+            self._bus._finish(self, None)  # noqa: SLF001
+        else:
+            self._done = True
+
+    def fail(self, error: str) -> None:
+        """Leave the task pending so it is redelivered after the retry idle time."""
+        if self._bus is not None:
+            self._bus._finish(self, error)  # noqa: SLF001
+        elif not self._done:
+            self._done = True
+            warn(
+                "control.task_failed",
+                {"id": self.id, "error": error, "deliveries": self.deliveries},
+            )
+
+
+TaskHandler = Callable[[ControlTask], Any]
+
+
+class ControlBus:
+    """Consumes control streams through a consumer group and dispatches tasks."""
+
+    def __init__(self, agent: str = AGENT, client: Optional[Any] = None) -> None:
+        self.agent = agent
+        self.group = f"agent.{agent}"
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self.streams = [task_stream(agent), BROADCAST_STREAM]
+        self._client = client
+        self._handlers: List[TaskHandler] = []
+        self._queues: List[Tuple[asyncio.AbstractEventLoop, "asyncio.Queue[ControlTask]"]] = []
+        self._inflight = 0
+        self._active: Set[Tuple[str, str]] = set()
+        # XAUTOCLAIM cursor per stream, so each reclaim pass continues the scan
+        self._reclaim_from: Dict[str, str] = {}
+        self._pool = ThreadPoolExecutor(max_workers=MAX_INFLIGHT, thread_name_prefix="controltask")
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = _get_redis_connection()
+        return self._client
+
+    @property
+    def inflight(self) -> int:
+        """Tasks handed to handlers or queues that have not been acked or failed yet."""
+        with self._lock:
+            return self._inflight
+
+    # -- registration -------------------------------------------------
+    def on_task(self, handler: TaskHandler) -> TaskHandler:
+        with self._lock:
+            self._handlers.append(handler)
+        return handler
+
+    def task_queue(
+        self, loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> "asyncio.Queue[ControlTask]":
+        """Queue fed on ``loop``; without one, must be called from the running loop."""
+        loop = loop or asyncio.get_running_loop()
+        queue: "asyncio.Queue[ControlTask]" = asyncio.Queue()
+        with self._lock:
+            self._queues.append((loop, queue))
+        return queue
+
+    # -- publishing ---------------------------------------------------
+    def submit(self, agent: Optional[str], args: Dict[str, Any], op: str = "task") -> str:
+        """Append a task to an agent's stream, or to the broadcast stream when agent is None."""
+        return self.submit_many([(agent, args)], op)[0]
+
+    def submit_many(
+        self, tasks: Iterable[Tuple[Optional[str], Dict[str, Any]]], op: str = "task"
+    ) -> List[str]:
+        """Append several tasks in one pipelined round trip; returns their stream ids."""
+        pipe = self.client.pipeline(transaction=False)
+        now = str(time.time())
+        for agent, args in tasks:
+            stream = task_stream(agent) if agent else BROADCAST_STREAM
+            fields = {"op": op, "args": json.dumps(args), "ts": now}
+            pipe.xadd(stream, fields, maxlen=STREAM_MAXLEN, approximate=True)
+        return pipe.execute()
+
+    # -- consuming ----------------------------------------------------
+    def ensure_groups(self) -> None:
+        for stream in self.streams:
+            try:
+                self.client.xgroup_create(stream, self.group, id="0", mkstream=True)
+            except redis.ResponseError as exc:
+                if "BUSYGROUP" not in str(exc):
+                    raise
+
+    def _capacity(self) -> int:
+        with self._lock:
+            return MAX_INFLIGHT - self._inflight
+
+    def poll(self, block_ms: int = BLOCK_MS) -> int:
+        """Read one batch of new tasks and hand them to workers; returns tasks dispatched."""
+        capacity = self._capacity()
+        if capacity <= 0:
+            time.sleep(0.01)
+            return 0
+        response = self.client.xreadgroup(
+            self.group,
+            self.consumer,
+            {stream: ">" for stream in self.streams},
+            count=capacity,
+            block=block_ms,
+        )
+        dispatched = 0
+        for stream, messages in response or []:
+            for msg_id, fields in messages:
+                self._dispatch(self._task(stream, msg_id, fields, 1))
+                dispatched += 1
+        return dispatched
+
+    def reclaim(self) -> int:
+        """Claim tasks idle longer than RETRY_IDLE_MS and retry or dead-letter them."""
+        reclaimed = 0
+        with self._lock:
+            active = set(self._active)
+        for stream in self.streams:
+            held = [msg_id for active_stream, msg_id in active if active_stream == stream]
+            if held:
+                # Reset the idle time of tasks still running here so no consumer claims them
+                self.client.xclaim(stream, self.group, self.consumer, 0, held, justid=True)
+            capacity = self._capacity()
+            if capacity <= 0:
+                continue
+            claimed = self.client.xautoclaim(
+                stream,
+                self.group,
+                self.consumer,
+                RETRY_IDLE_MS,
+                start_id=self._reclaim_from.get(stream, "0-0"),
+                count=capacity,
+            )
+            if not claimed:
+                continue
+            self._reclaim_from[stream] = claimed[0] or "0-0"
+            messages = claimed[1]
+            for msg_id, fields in messages:
+                if (stream, msg_id) in active:
+                    continue
+                if not fields:
+                    self.client.xack(stream, self.group, msg_id)
+                    continue
+                deliveries = self._deliveries(stream, msg_id)
+                task = self._task(stream, msg_id, fields, deliveries)
+                if deliveries > MAX_DELIVERIES:
+                    self._dead_letter(task)
+                else:
+                    self._dispatch(task)
+                reclaimed += 1
+        return reclaimed
+
+    def _deliveries(self, stream: str, msg_id: str) -> int:
+        try:
+            pending = self.client.xpending_range(stream, self.group, msg_id, msg_id, 1)
+            return int(pending[0]["times_delivered"]) if pending else 1
+        except redis.RedisError:
+            return 1
+
+    def _task(
+        self, stream: str, msg_id: str, fields: Dict[str, str], deliveries: int
+    ) -> ControlTask:
+        try:
+            args = json.loads(fields.get("args") or "{}")
+        except ValueError:
+            args = {}
+        return ControlTask(
+            id=msg_id,
+            stream=stream,
+            op=fields.get("op", "task"),
+            args=args,
+            deliveries=deliveries,
+            _bus=self,
+        )
+
+    def _dispatch(self, task: ControlTask) -> None:
+        if task.op == "ping":
+            info("ping received")
+            task.ack()
+            return
+        if task.op == "cycle":
+            task.ack()
+            info("cycle requested; exiting for supervisor restart")
+            os._exit(0)
+        with self._lock:
+            handlers = list(self._handlers)
+            queues = list(self._queues)
+        if not handlers and not queues:
+            warn("control.no_task_handler", {"id": task.id, "stream": task.stream})
+            return
+        with self._lock:
+            task._parts = len(queues) + (1 if handlers else 0)
+            task._counted = True
+            self._inflight += 1
+            if task.stream:
+                self._active.add((task.stream, task.id))
+        for loop, queue in queues:
+            loop.call_soon_threadsafe(queue.put_nowait, task)
+        if handlers:
+            self._pool.submit(self._run_handlers, task, handlers)
 
+    def _run_handlers(self, task: ControlTask, handlers: List[TaskHandler]) -> None:
+        try:
+            for handler in handlers:
+                handler(task)
+        except Exception as exc:  # noqa: BLE001
+            task.fail(str(exc))
+        else:
+            task.ack()
+
+    def _finish(self, task: ControlTask, error: Optional[str]) -> None:
+        """One recipient is done with ``task``: ack once all are, or leave it pending on error."""
+        with self._lock:
+            if task._done:
+                return
+            task._parts -= 1
+            if error is None and task._parts > 0:
+                return
+            task._done = True
+            self._active.discard((task.stream, task.id))
+            if task._counted:
+                self._inflight -= 1
+        if error is not None:
+            warn(
+                "control.task_failed",
+                {"id": task.id, "error": error, "deliveries": task.deliveries},
+            )
+        else:
+            self._ack(task)
+
+    def _ack(self, task: ControlTask) -> None:
+        if not task.stream:  # delivered over pub/sub: nothing to acknowledge
+            return
+        try:
+            self.client.xack(task.stream, self.group, task.id)
+        except redis.RedisError as exc:
+            warn("control.ack_failed", {"id": task.id, "error": str(exc)})
+
+    def _dead_letter(self, task: ControlTask) -> None:
+        fields = {
+            "op": task.op,
+            "args": json.dumps(task.args),
+            "source_id": task.id,
+            "source_stream": task.stream,
+            "deliveries": str(task.deliveries),
+        }
+        dead_stream = f"{task_stream(self.agent)}.dead"
+        self.client.xadd(dead_stream, fields, maxlen=STREAM_MAXLEN, approximate=True)
+        self._ack(task)
+        warn("control.task_dead_lettered", {"id": task.id, "deliveries": task.deliveries})
+
+    def dispatch_local(self, args: Dict[str, Any]) -> None:
+        """Deliver a task received outside the streams (legacy pub/sub); it is never acked."""
+        self._dispatch(ControlTask(id="pubsub", stream="", op="task", args=args, _bus=self))
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
+
+
+_bus: Optional[ControlBus] = None
+_bus_lock = threading.Lock()
 _stop = threading.Event()
+_op_handlers: Dict[str, List[Callable[[Dict[str, Any]], Any]]] = {}
+
+
+def get_bus() -> ControlBus:
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = ControlBus()
+            register_gauge("queue_depth", lambda bus=_bus: bus.inflight)
+        return _bus
+
+
+def on_task(handler: TaskHandler) -> TaskHandler:
+    """Register an in-process task handler; usable as a decorator."""
+    return get_bus().on_task(handler)
+
+
+def task_queue(loop: Optional[asyncio.AbstractEventLoop] = None) -> "asyncio.Queue[ControlTask]":
+    """Return an asyncio queue that receives every task delivered to this agent."""
+    return get_bus().task_queue(loop)
+
+
+def submit_task(agent: Optional[str], args: Dict[str, Any], op: str = "task") -> str:
+    """Enqueue a task for ``agent`` (or every agent when None); returns the stream id."""
+    return get_bus().submit(agent, args, op)
+
+
+def submit_tasks(
+    tasks: Iterable[Tuple[Optional[str], Dict[str, Any]]], op: str = "task"
+) -> List[str]:
+    """Enqueue ``(agent, args)`` pairs in a single pipeline."""
+    return get_bus().submit_many(tasks, op)
+
+
+def broadcast_control(
+    op: str, args: Optional[Dict[str, Any]] = None, agents: Optional[Iterable[str]] = None
+) -> List[int]:
+    """Publish a control op on ``agent.all.control`` or pipelined to each named agent."""
+    message = {"op": op, "args": args or {}}
+    return redis_client.broadcast(message, agents)
+
+
+def on_op(op: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+    """Call ``handler(args)`` whenever ``op`` arrives on the pub/sub control channels."""
+    _op_handlers.setdefault(op, []).append(handler)
+
 
 def _handle(msg):
     if not msg or msg.get("type") != "message":
@@ -54,33 +404,66 @@ def _handle(msg):
         info("cycle requested; exiting for supervisor restart")
         os._exit(0)
     if op == "task":
-        # optional: surface a lightweight signal file the agent can watch
         info("task received", {"args": data.get("args", {})})
-        path = f"/tmp/agent_task_{AGENT}.json"
+        get_bus().dispatch_local(data.get("args", {}))
+        return
+    for handler in list(_op_handlers.get(op, ())):
         try:
-            with open(path, "w") as f:
-                json.dump(data.get("args", {}), f)
-        except Exception:
-            pass
+            handler(data.get("args", {}))
+        except Exception as exc:  # noqa: BLE001
+            warn("control.op_handler_failed", {"op": op, "error": str(exc)})
+
 
 def run_background():
-    client = _get_redis_connection()
+    bus = get_bus()
+    client = bus.client
     pubsub = client.pubsub(ignore_subscribe_messages=True)
     pubsub.subscribe(f"agent.{AGENT}.control", "agent.all.control")
 
-    def loop():
+    def control_loop():
+        delays = redis_client.backoff_delays()
         while not _stop.is_set():
             try:
                 msg = pubsub.get_message(timeout=1.0)
+                delays = redis_client.backoff_delays()
                 if msg: _handle(msg)
             except Exception:
-                time.sleep(1.0)
-    t = threading.Thread(target=loop, name="controlbus", daemon=True)
+                _stop.wait(next(delays))
+
+    def stream_loop():
+        last_reclaim = 0.0
+        delays = redis_client.backoff_delays()
+        while not _stop.is_set():
+            try:
+                bus.ensure_groups()
+                break
+            except Exception:
+                _stop.wait(next(delays))
+        delays = redis_client.backoff_delays()
+        while not _stop.is_set():
+            try:
+                bus.poll()
+                now = time.monotonic()
+                if now - last_reclaim >= RETRY_IDLE_MS / 1000.0 / 2:
+                    last_reclaim = now
+                    bus.reclaim()
+                delays = redis_client.backoff_delays()
+            except redis.ResponseError as exc:
+                if "NOGROUP" in str(exc):
+                    bus.ensure_groups()
+                else:
+                    _stop.wait(next(delays))
+            except Exception:
+                _stop.wait(next(delays))
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+    t = threading.Thread(target=control_loop, name="controlbus", daemon=True)
     t.start()
+    threading.Thread(target=stream_loop, name="controlbus-streams", daemon=True).start()
     return t
 
+
 def stop(_sig=None, _frm=None):
     _stop.set()
-
-signal.signal(signal.SIGINT, stop)
-signal.signal(signal.SIGTERM, stop)
\ No newline at end of file
@@ -1,40 +1,184 @@
-import os, sys, time, json, socket, threading, requests, signal
+"""Agent heartbeats to core-api.
+
+The first heartbeat of a replica is a full registration (version, endpoint, host,
+pid, capabilities and load). After that only the fields that changed since the last
+accepted heartbeat are sent, together with the replica ``instance`` id, a
+sequence number and the wall-clock ``updated_at`` of the payload. A full payload
+is sent again after a failed request, when the server answers 404/409 or
+``{"resync": true}``, and every ``AGENT_HEARTBEAT_FULL_EVERY`` beats so core-api
+can recover lost state.
+
+Requests reuse one keep-alive ``requests.Session`` and the interval is jittered by
+``AGENT_HEARTBEAT_JITTER`` (fraction of the interval) so replicas started together
+do not beat in lockstep.
+"""
+
+import os
+import random
+import resource
+import signal
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+
+from .metrics import REGISTRY, read_gauges
 
 CORE = os.getenv("CORE_API_URL", "http://core-api:8000").rstrip("/")
 TOKEN = os.getenv("AGENT_SHARED_TOKEN", "")
 AGENT = os.getenv("AGENT_NAME", "unknown")
 INTERVAL = int(os.getenv("AGENT_HEARTBEAT_INTERVAL", "20"))
+JITTER = float(os.getenv("AGENT_HEARTBEAT_JITTER", "0.1"))
+FULL_EVERY = int(os.getenv("AGENT_HEARTBEAT_FULL_EVERY", "30"))
 
 _stop = threading.Event()
 
-def _send():
-    url = f"{CORE}/api/v1/agent/heartbeat"
-    payload = {
-        "agent": AGENT,
-        "version": os.getenv("NOVA_VERSION", "1.0.0"),
-        "host": socket.gethostname(),
-        "pid": os.getpid(),
-        "capabilities": [c for c in os.getenv("AGENT_CAPS", "").split(",") if c],
-    }
+
+def _rss_bytes() -> int:
     try:
-        r = requests.post(url, json=payload, headers={"X-Agent-Token": TOKEN}, timeout=4)
-        r.raise_for_status()
-    except Exception as e:
-        # Silent fail; do not spam stdout in production
-        pass
+        with open("/proc/self/statm", "r", encoding="ascii") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is the peak, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def load_stats() -> Dict[str, Any]:
+    """Cheap load figures for this process plus registered gauges (e.g. ``queue_depth``).
+
+    RSS is rounded to MiB to keep deltas quiet.
+    """
+    stats: Dict[str, Any] = {
+        "active_commands": REGISTRY.active(),
+        "queue_depth": 0,
+        "p95_ms": REGISTRY.latency_percentile(95) // 1000,
+        "rss_mb": _rss_bytes() // (1024 * 1024),
+    }
+    stats.update(read_gauges())
+    return stats
+
+
+def jittered(interval: float, jitter: float = JITTER) -> float:
+    if jitter <= 0:
+        return interval
+    return max(0.1, interval * random.uniform(1.0 - jitter, 1.0 + jitter))
+
+
+class HeartbeatClient:
+    """Sends full registrations followed by delta-only heartbeats over one session."""
+
+    def __init__(
+        self,
+        agent: str = AGENT,
+        core_url: str = CORE,
+        token: str = TOKEN,
+        session: Optional[requests.Session] = None,
+        full_every: int = FULL_EVERY,
+    ) -> None:
+        self.agent = agent
+        self.url = f"{core_url}/api/v1/agent/heartbeat"
+        self.instance = f"{socket.gethostname()}-{os.getpid()}"
+        self.full_every = max(1, full_every)
+        self.session = session or requests.Session()
+        self.session.headers.update({"X-Agent-Token": token})
+        self._sent: Dict[str, Any] = {}
+        self._pending: Dict[str, Any] = {}
+        self._seq = 0
+        self._since_full = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "version": os.getenv("NOVA_VERSION", "1.0.0"),
+            "endpoint": os.getenv("AGENT_ENDPOINT"),
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "capabilities": [c for c in os.getenv("AGENT_CAPS", "").split(",") if c],
+            "load": load_stats(),
+        }
+
+    def build_payload(self) -> Dict[str, Any]:
+        current = self.snapshot()
+        full = not self._sent or self._since_full >= self.full_every
+        if full:
+            changes = current
+        else:
+            changes = {key: value for key, value in current.items() if self._sent.get(key) != value}
+            if "load" in changes:
+                previous = self._sent.get("load", {})
+                changes["load"] = {
+                    key: value
+                    for key, value in current["load"].items()
+                    if previous.get(key) != value
+                }
+        self._seq += 1
+        payload = {
+            "agent": self.agent,
+            "instance": self.instance,
+            "seq": self._seq,
+            "full": full,
+            "updated_at": time.time(),
+        }
+        payload.update(changes)
+        self._pending = current
+        return payload
+
+    def send(self) -> bool:
+        payload = self.build_payload()
+        try:
+            r = self.session.post(self.url, json=payload, timeout=4)
+            if r.status_code in (404, 409):
+                self.resync()
+                return False
+            r.raise_for_status()
+            body = r.json() if r.content else {}
+        except Exception:
+            # Silent fail; do not spam stdout in production. Re-register next time.
+            self.resync()
+            return False
+        if isinstance(body, dict) and body.get("resync"):
+            self.resync()
+            return True
+        self._since_full = 0 if payload["full"] else self._since_full + 1
+        self._sent = self._pending
+        return True
+
+    def resync(self) -> None:
+        """Force the next heartbeat to be a full registration."""
+        self._sent = {}
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client: Optional[HeartbeatClient] = None
+
+
+def _send():
+    global _client
+    if _client is None:
+        _client = HeartbeatClient()
+    return _client.send()
+
 
 def run_background():
     def loop():
+        # Spread the first beat so replicas started together do not beat in lockstep
+        _stop.wait(random.uniform(0, INTERVAL * JITTER))
         while not _stop.is_set():
             _send()
-            _stop.wait(INTERVAL)
+            _stop.wait(jittered(INTERVAL))
+
     t = threading.Thread(target=loop, name="heartbeat", daemon=True)
     t.start()
     return t
 
+
 def stop(_sig=None, _frm=None):
     _stop.set()
 
+
 signal.signal(signal.SIGINT, stop)
 signal.signal(signal.SIGTERM, stop)
 
@@ -45,4 +189,4 @@ if __name__ == "__main__":
         while not _stop.is_set():
             time.sleep(1)
     except KeyboardInterrupt:
-        pass
\ No newline at end of file
+        pass
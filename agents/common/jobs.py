@@ -0,0 +1,319 @@
+"""SQLite-backed job queue for long-running agent commands.
+
+Jobs are persisted to a local SQLite database so that queued work survives an API
+restart. A small thread pool executes jobs through a caller-supplied runner and
+records state transitions and partial results as ordered events that HTTP handlers
+can poll or stream.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.base import resolve_platform_log
+
+Runner = Callable[[str, str, Dict[str, Any]], Dict[str, Any]]
+IdempotencyCheck = Callable[[str, str], bool]
+
+TERMINAL_STATES = frozenset({"succeeded", "failed"})
+# Event kinds after which a job emits nothing more
+TERMINAL_EVENTS = frozenset({"result", "error", "interrupted"})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    agent TEXT NOT NULL,
+    command TEXT NOT NULL,
+    args TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    data TEXT,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+_local = threading.local()
+
+
+def _default_db_path() -> Path:
+    override = os.getenv("NOVA_JOBS_DB")
+    if override:
+        return Path(override)
+    return resolve_platform_log("jobs").with_name("jobs.sqlite3")
+
+
+class JobStore:
+    """Durable job and event storage on an embedded SQLite database."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path) if path else _default_db_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def create(self, agent: str, command: str, args: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, agent, command, args, status, created_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, agent, command, json.dumps(args, default=str), time.time()),
+            )
+            self._conn.commit()
+        return job_id
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        if not fields:
+            return
+        if fields.get("result") is not None:
+            fields["result"] = json.dumps(fields["result"], default=str)
+        columns = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id)
+            )
+            self._conn.commit()
+
+    def add_event(self, job_id: str, kind: str, data: Any = None) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM job_events WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            seq = int(row[0]) + 1
+            self._conn.execute(
+                "INSERT INTO job_events (job_id, seq, ts, kind, data) VALUES (?, ?, ?, ?, ?)",
+                (job_id, seq, time.time(), kind, json.dumps(data, default=str)),
+            )
+            self._conn.commit()
+        return seq
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["args"] = json.loads(job["args"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def events(self, job_id: str, after: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, ts, kind, data FROM job_events WHERE job_id = ? AND seq > ? "
+                "ORDER BY seq",
+                (job_id, after),
+            ).fetchall()
+        return [
+            {
+                "seq": row["seq"],
+                "ts": row["ts"],
+                "kind": row["kind"],
+                "data": json.loads(row["data"]) if row["data"] else None,
+            }
+            for row in rows
+        ]
+
+    def pending(self) -> List[str]:
+        """Return ids of jobs that were queued or interrupted mid-run."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def prune(self, max_age: float, max_jobs: int) -> int:
+        """Delete finished jobs older than ``max_age`` or beyond the newest ``max_jobs``."""
+        cutoff = time.time() - max_age
+        with self._lock:
+            stale = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT id FROM jobs WHERE status IN ('succeeded', 'failed') AND "
+                    "(finished_at < ? OR id NOT IN (SELECT id FROM jobs WHERE status IN "
+                    "('succeeded', 'failed') ORDER BY finished_at DESC LIMIT ?))",
+                    (cutoff, max_jobs),
+                )
+            ]
+            if stale:
+                marks = ",".join("?" for _ in stale)
+                self._conn.execute(f"DELETE FROM job_events WHERE job_id IN ({marks})", stale)
+                self._conn.execute(f"DELETE FROM jobs WHERE id IN ({marks})", stale)
+                self._conn.commit()
+        return len(stale)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobQueue:
+    """Runs agent commands asynchronously on a worker pool backed by a JobStore.
+
+    ``is_idempotent(agent, command)`` decides whether a job that was running when
+    the previous process stopped may run again; jobs it rejects (all of them when
+    it is not given) are failed as interrupted instead.
+    """
+
+    def __init__(
+        self,
+        runner: Runner,
+        store: Optional[JobStore] = None,
+        *,
+        is_idempotent: Optional[IdempotencyCheck] = None,
+        workers: Optional[int] = None,
+        retention_seconds: Optional[float] = None,
+        max_jobs: Optional[int] = None,
+    ) -> None:
+        self._runner = runner
+        self.store = store or JobStore()
+        self._is_idempotent = is_idempotent
+        self._workers = workers or int(os.getenv("NOVA_JOB_WORKERS", "4"))
+        self._retention = retention_seconds or float(
+            os.getenv("NOVA_JOB_RETENTION_SECONDS", "86400")
+        )
+        self._max_jobs = max_jobs or int(os.getenv("NOVA_JOB_MAX_RETAINED", "1000"))
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._changed = threading.Condition()
+        self._start_lock = threading.Lock()
+        self._last_prune = float("-inf")
+
+    def start(self) -> None:
+        """Start workers and resume jobs left over from a previous process."""
+        with self._start_lock:
+            if self._pool is not None:
+                return
+            self._pool = ThreadPoolExecutor(
+                max_workers=self._workers, thread_name_prefix="novajob"
+            )
+            for job_id in self.store.pending():
+                job = self.store.get(job_id)
+                if job is not None and job["status"] == "running" and not self._may_rerun(job):
+                    self.store.update(
+                        job_id, status="failed", finished_at=time.time(), error="interrupted"
+                    )
+                    self._emit(job_id, "interrupted")
+                    continue
+                self.store.update(job_id, status="queued")
+                self._emit(job_id, "requeued")
+                self._pool.submit(self._execute, job_id)
+        self._prune()
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def submit(self, agent: str, command: str, args: Optional[Dict[str, Any]] = None) -> str:
+        self.start()
+        job_id = self.store.create(agent, command, args or {})
+        self._emit(job_id, "queued")
+        assert self._pool is not None
+        self._pool.submit(self._execute, job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def events(self, job_id: str, after: int = 0) -> List[Dict[str, Any]]:
+        return self.store.events(job_id, after)
+
+    def wait_for_events(
+        self, job_id: str, after: int = 0, timeout: float = 15.0
+    ) -> List[Dict[str, Any]]:
+        """Block until events newer than ``after`` exist or ``timeout`` elapses."""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                events = self.store.events(job_id, after)
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    return events
+                self._changed.wait(remaining)
+
+    def _may_rerun(self, job: Dict[str, Any]) -> bool:
+        if self._is_idempotent is None:
+            return False
+        try:
+            return bool(self._is_idempotent(job["agent"], job["command"]))
+        except Exception:  # noqa: BLE001
+            return False
+
+    def _emit(self, job_id: str, kind: str, data: Any = None) -> None:
+        self.store.add_event(job_id, kind, data)
+        with self._changed:
+            self._changed.notify_all()
+
+    def _execute(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATES:
+            return
+        self.store.update(job_id, status="running", started_at=time.time())
+        self._emit(job_id, "running")
+        _local.job = (self, job_id)
+        try:
+            result = self._runner(job["agent"], job["command"], job["args"])
+            success = bool(result.get("success", True)) if isinstance(result, dict) else True
+            error = result.get("error") if isinstance(result, dict) else None
+            self.store.update(
+                job_id,
+                status="succeeded" if success else "failed",
+                finished_at=time.time(),
+                result=result,
+                error=error,
+            )
+            self._emit(job_id, "result", result)
+        except Exception as exc:  # noqa: BLE001
+            self.store.update(job_id, status="failed", finished_at=time.time(), error=str(exc))
+            self._emit(job_id, "error", {"error": str(exc)})
+        finally:
+            _local.job = None
+        self._prune()
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        if now - self._last_prune < 60:
+            return
+        self._last_prune = now
+        try:
+            self.store.prune(self._retention, self._max_jobs)
+        except sqlite3.Error:
+            pass
+
+
+def report_progress(data: Any) -> bool:
+    """Publish a partial result for the job running on the current worker thread.
+
+    Agent handlers may call this freely; outside of a queued job it is a no-op and
+    returns False.
+    """
+    current = getattr(_local, "job", None)
+    if not current:
+        return False
+    queue, job_id = current
+    queue._emit(job_id, "progress", data)  # noqa: SLF001
+    return True
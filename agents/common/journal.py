@@ -0,0 +1,239 @@
+"""Append-only JSON-lines journal store for agent records.
+
+A journal lives in ``<directory>/<name>/`` as numbered segments
+(``00000001.jsonl``, ...). Appends go to the newest segment through a handle that
+stays open, so each append costs one write regardless of history size. A segment
+is closed once it exceeds ``NOVA_JOURNAL_SEGMENT_BYTES`` (default 8 MiB) and its
+record count is added to ``index.json``, which lets :meth:`Journal.tail` skip
+straight to the segments holding the newest records.
+
+Durability is chosen with ``NOVA_JOURNAL_FSYNC``:
+
+``always``
+    flush and fsync after every append.
+``interval`` (default)
+    flush every append, fsync at most every ``NOVA_JOURNAL_FSYNC_INTERVAL`` seconds.
+``never``
+    flush every append and leave syncing to the OS.
+
+Legacy ``<name>.json`` files holding a JSON array are imported once, on first open,
+and renamed to ``<name>.json.migrated``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+SEGMENT_BYTES = int(os.getenv("NOVA_JOURNAL_SEGMENT_BYTES", str(8 * 1024 * 1024)))
+FSYNC = os.getenv("NOVA_JOURNAL_FSYNC", "interval").lower()
+FSYNC_INTERVAL = float(os.getenv("NOVA_JOURNAL_FSYNC_INTERVAL", "1.0"))
+
+
+def _read_tail_lines(path: Path, count: int, block: int = 64 * 1024) -> List[bytes]:
+    """Return up to ``count`` last complete lines of ``path`` by reading backwards."""
+    if count <= 0:
+        return []
+    with path.open("rb") as fh:
+        fh.seek(0, os.SEEK_END)
+        position = fh.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= count:
+            step = min(block, position)
+            position -= step
+            fh.seek(position)
+            data = fh.read(step) + data
+    lines = [line for line in data.split(b"\n") if line]
+    return lines[-count:]
+
+
+def _decode(line: Any) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:  # torn final line after a crash
+        return None
+
+
+class Journal:
+    """Segmented append-only journal of JSON records."""
+
+    def __init__(
+        self,
+        directory: Path,
+        name: str,
+        *,
+        segment_bytes: int = SEGMENT_BYTES,
+        fsync: str = FSYNC,
+        fsync_interval: float = FSYNC_INTERVAL,
+    ) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"unknown fsync policy '{fsync}'")
+        self.name = name
+        self.path = Path(directory) / name
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._fh: Optional[TextIO] = None
+        self._last_sync = time.monotonic()
+        self._index = self._load_index()
+        self._active = self._index["active"]
+        self._active_count = self._count_lines(self._segment_path(self._active))
+        self._migrate(Path(directory) / f"{name}.json")
+
+    # -- layout -------------------------------------------------------
+    def _segment_path(self, number: int) -> Path:
+        return self.path / f"{number:08d}.jsonl"
+
+    def _load_index(self) -> Dict[str, Any]:
+        index_path = self.path / "index.json"
+        if index_path.exists():
+            try:
+                return json.loads(index_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                pass
+        return self._rebuild_index()
+
+    def _rebuild_index(self) -> Dict[str, Any]:
+        numbers = sorted(int(p.stem) for p in self.path.glob("*.jsonl") if p.stem.isdigit())
+        if not numbers:
+            return {"segments": [], "active": 1}
+        segments = [
+            {"segment": number, "count": self._count_lines(self._segment_path(number))}
+            for number in numbers[:-1]
+        ]
+        return {"segments": segments, "active": numbers[-1]}
+
+    def _save_index(self) -> None:
+        index_path = self.path / "index.json"
+        tmp = index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._index), encoding="utf-8")
+        os.replace(tmp, index_path)
+
+    @staticmethod
+    def _count_lines(path: Path) -> int:
+        if not path.exists():
+            return 0
+        with path.open("rb") as fh:
+            return sum(chunk.count(b"\n") for chunk in iter(lambda: fh.read(1 << 20), b""))
+
+    def _migrate(self, legacy: Path) -> None:
+        if not legacy.exists() or len(self):
+            return
+        try:
+            entries = json.loads(legacy.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(entries, list):
+            self.extend(entries)
+        legacy.rename(legacy.with_name(legacy.name + ".migrated"))
+
+    # -- writing ------------------------------------------------------
+    def _handle(self) -> TextIO:
+        if self._fh is None:
+            self._fh = self._segment_path(self._active).open("a", encoding="utf-8")
+        return self._fh
+
+    def _rotate(self) -> None:
+        self.close_segment()
+        self._index["segments"].append({"segment": self._active, "count": self._active_count})
+        self._active += 1
+        self._index["active"] = self._active
+        self._active_count = 0
+        self._save_index()
+
+    def _sync(self, fh: TextIO) -> None:
+        fh.flush()
+        if self.fsync == "never":
+            return
+        now = time.monotonic()
+        if self.fsync == "always" or now - self._last_sync >= self.fsync_interval:
+            os.fsync(fh.fileno())
+            self._last_sync = now
+
+    def append(self, entry: Any) -> None:
+        """Append one record; O(1) in the size of the journal."""
+        self.extend([entry])
+
+    def extend(self, entries: List[Any]) -> None:
+        """Append several records with a single flush."""
+        if not entries:
+            return
+        lines = "".join(json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in entries)
+        with self._lock:
+            fh = self._handle()
+            fh.write(lines)
+            self._active_count += len(entries)
+            self._sync(fh)
+            if fh.tell() >= self.segment_bytes:
+                self._rotate()
+
+    def close_segment(self) -> None:
+        if self._fh is not None:
+            self._fh.flush()
+            if self.fsync != "never":
+                os.fsync(self._fh.fileno())
+            self._fh.close()
+            self._fh = None
+
+    def close(self) -> None:
+        with self._lock:
+            self.close_segment()
+
+    # -- reading ------------------------------------------------------
+    def __len__(self) -> int:
+        return sum(s["count"] for s in self._index["segments"]) + self._active_count
+
+    def tail(self, count: int) -> List[Any]:
+        """Return the newest ``count`` records, oldest first, reading only what is needed."""
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+            segments = [(s["segment"], s["count"]) for s in self._index["segments"]]
+            segments.append((self._active, self._active_count))
+        lines: List[bytes] = []
+        for number, available in reversed(segments):
+            if len(lines) >= count:
+                break
+            path = self._segment_path(number)
+            if not available or not path.exists():
+                continue
+            lines = _read_tail_lines(path, count - len(lines)) + lines
+        records = [_decode(line) for line in lines]
+        return [record for record in records if record is not None]
+
+    def __iter__(self) -> Iterator[Any]:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+            numbers = [s["segment"] for s in self._index["segments"]] + [self._active]
+        for number in numbers:
+            path = self._segment_path(number)
+            if not path.exists():
+                continue
+            with path.open("r", encoding="utf-8") as fh:
+                for line in fh:
+                    record = _decode(line) if line.strip() else None
+                    if record is not None:
+                        yield record
+
+
+_journals: Dict[Path, Journal] = {}
+_journals_lock = threading.Lock()
+
+
+def open_journal(directory: Path, name: str) -> Journal:
+    """Return the process-wide journal ``name`` under ``directory``."""
+    key = (Path(directory) / name).resolve()
+    with _journals_lock:
+        journal = _journals.get(key)
+        if journal is None:
+            journal = _journals[key] = Journal(directory, name)
+        return journal
@@ -0,0 +1,106 @@
+"""Process-wide registry of buffered JSON-lines log sinks.
+
+Each agent gets one append handle on its platform log, opened on first use and
+kept for the life of the process. Records are written as JSON lines into a
+user-space buffer that a background thread flushes every
+``NOVA_LOG_FLUSH_INTERVAL`` seconds (default 1); everything is flushed and closed
+at interpreter exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, TextIO
+
+from agents.base import resolve_platform_log
+
+FLUSH_INTERVAL = float(os.getenv("NOVA_LOG_FLUSH_INTERVAL", "1.0"))
+BUFFER_BYTES = int(os.getenv("NOVA_LOG_BUFFER_BYTES", str(64 * 1024)))
+
+
+class LogSink:
+    """Buffered append-only JSON-lines writer for one log file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._fh: Optional[TextIO] = None
+        self._dirty = False
+
+    def _handle(self) -> TextIO:
+        if self._fh is None or self._fh.closed:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = self.path.open("a", encoding="utf-8", buffering=BUFFER_BYTES)
+        return self._fh
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._handle().write(line)
+            self._dirty = True
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._fh is not None and self._dirty:
+                self._fh.flush()
+                self._dirty = False
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+                self._dirty = False
+
+
+_sinks: Dict[str, LogSink] = {}
+_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+def get_sink(agent_name: str) -> LogSink:
+    """Return the shared sink for ``agent_name``'s platform log."""
+    global _flusher
+    with _lock:
+        sink = _sinks.get(agent_name)
+        if sink is None:
+            sink = _sinks[agent_name] = LogSink(resolve_platform_log(agent_name))
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="logsink-flush", daemon=True)
+            _flusher.start()
+        return sink
+
+
+def flush_all() -> None:
+    with _lock:
+        sinks = list(_sinks.values())
+    for sink in sinks:
+        try:
+            sink.flush()
+        except (OSError, ValueError):
+            pass
+
+
+def close_all() -> None:
+    _stop.set()
+    with _lock:
+        sinks = list(_sinks.values())
+        _sinks.clear()
+    for sink in sinks:
+        try:
+            sink.close()
+        except (OSError, ValueError):
+            pass
+
+
+def _flush_loop() -> None:
+    while not _stop.wait(FLUSH_INTERVAL):
+        flush_all()
+
+
+atexit.register(close_all)
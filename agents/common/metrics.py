@@ -0,0 +1,371 @@
+"""Per-command latency, throughput and error metrics for NovaOS agents.
+
+Every ``BaseAgent.run`` is wrapped by :func:`instrument_run`, which times the call
+with a monotonic clock and records the outcome into a process-wide
+:class:`MetricsRegistry`. Latencies are kept in log-linear histograms in the spirit
+of HdrHistogram so percentiles stay accurate without storing samples.
+
+Stats are keyed by the commands an agent registers; anything else a caller sends
+is counted under ``"unknown"``, and agents without a command registry are capped
+at ``NOVA_METRICS_MAX_COMMANDS`` distinct names. Result payload sizes are
+measured on every ``NOVA_METRICS_PAYLOAD_SAMPLE_EVERY``-th call of a command
+(``0`` turns measuring off) rather than serializing every result.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+UNKNOWN_COMMAND = "unknown"
+MAX_COMMANDS = int(os.getenv("NOVA_METRICS_MAX_COMMANDS", "256"))
+PAYLOAD_SAMPLE_EVERY = int(os.getenv("NOVA_METRICS_PAYLOAD_SAMPLE_EVERY", "16"))
+
+
+class Histogram:
+    """Log-linear histogram of integer microsecond values.
+
+    Values below ``2**significant_bits`` are counted exactly; larger values share a
+    bucket with neighbours within roughly ``2**-(significant_bits - 1)`` relative error.
+    """
+
+    def __init__(self, significant_bits: int = 5) -> None:
+        self._bits = significant_bits
+        self._sub = 1 << significant_bits
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        if value < self._sub:
+            return value
+        shift = value.bit_length() - self._bits
+        return shift * self._sub + (value >> shift)
+
+    def _value_at(self, index: int) -> int:
+        shift, mantissa = divmod(index, self._sub)
+        low = mantissa << shift
+        high = ((mantissa + 1) << shift) - 1
+        return (low + high) // 2
+
+    def record(self, value: int) -> None:
+        value = max(0, int(value))
+        idx = self._index(value)
+        self._counts[idx] = self._counts.get(idx, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "Histogram") -> None:
+        """Fold ``other`` (same ``significant_bits``) into this histogram."""
+        for idx, count in other._counts.items():
+            self._counts[idx] = self._counts.get(idx, 0) + count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, pct: float) -> int:
+        if not self.count:
+            return 0
+        if pct >= 100:
+            return self.max or 0
+        target = max(1, int(round(self.count * pct / 100.0)))
+        seen = 0
+        for idx in sorted(self._counts):
+            seen += self._counts[idx]
+            if seen >= target:
+                return min(self._value_at(idx), self.max or 0)
+        return self.max or 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "min": self.min or 0,
+            "max": self.max or 0,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class CommandStats:
+    """Counters and latency histogram for one agent/command pair."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.latency_us = Histogram()
+        self.payload_bytes = 0
+        self.payload_samples = 0
+        self.max_payload_bytes = 0
+        self.first_seen = time.time()
+        self.last_seen = self.first_seen
+        self.last_error: Optional[str] = None
+
+    def record(
+        self, seconds: float, success: bool, payload_bytes: Optional[int], error: Optional[str]
+    ) -> None:
+        """Count one call; ``payload_bytes`` is None when the result was not measured."""
+        self.calls += 1
+        if not success:
+            self.errors += 1
+            self.last_error = error
+        self.latency_us.record(int(seconds * 1_000_000))
+        if payload_bytes is not None:
+            self.payload_samples += 1
+            self.payload_bytes += payload_bytes
+            self.max_payload_bytes = max(self.max_payload_bytes, payload_bytes)
+        self.last_seen = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        window = max(self.last_seen - self.first_seen, 1.0)
+        mean = self.payload_bytes / self.payload_samples if self.payload_samples else 0.0
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": self.errors / self.calls if self.calls else 0.0,
+            "throughput_per_min": self.calls * 60.0 / window,
+            "latency_us": self.latency_us.snapshot(),
+            "payload_bytes": {
+                "total": int(mean * self.calls),  # estimated from the sampled calls
+                "mean": mean,
+                "max": self.max_payload_bytes,
+                "samples": self.payload_samples,
+            },
+            "last_error": self.last_error,
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe collection of :class:`CommandStats` keyed by agent and command."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], CommandStats] = {}
+        self._commands: Dict[str, int] = {}
+        self._active: Dict[str, int] = {}
+        self._counters: Dict[str, int] = {}
+        self.started_at = time.time()
+
+    def begin(self, agent: str) -> None:
+        """Mark a command as in progress for ``agent``."""
+        with self._lock:
+            self._active[agent] = self._active.get(agent, 0) + 1
+
+    def end(self, agent: str) -> None:
+        with self._lock:
+            self._active[agent] = max(0, self._active.get(agent, 0) - 1)
+
+    def active(self, agent: Optional[str] = None) -> int:
+        """Number of commands currently running, for one agent or the whole process."""
+        with self._lock:
+            if agent is not None:
+                return self._active.get(agent, 0)
+            return sum(self._active.values())
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Bump a free-form counter, e.g. routing decisions."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def latency_percentile(self, pct: float, agent: Optional[str] = None) -> int:
+        """Latency percentile in microseconds across all commands of ``agent`` (or all)."""
+        merged = Histogram()
+        with self._lock:
+            for (name, _command), stats in self._stats.items():
+                if agent is None or name == agent:
+                    merged.merge(stats.latency_us)
+        return merged.percentile(pct)
+
+    def _stats_for(self, agent: str, command: str) -> CommandStats:
+        """Stats for ``agent``/``command``, folding names past the per-agent cap into unknown."""
+        stats = self._stats.get((agent, command))
+        if stats is None:
+            if self._commands.get(agent, 0) >= MAX_COMMANDS:
+                command = UNKNOWN_COMMAND
+                stats = self._stats.get((agent, command))
+            if stats is None:
+                stats = self._stats[(agent, command)] = CommandStats()
+                self._commands[agent] = self._commands.get(agent, 0) + 1
+        return stats
+
+    def should_measure(self, agent: str, command: str) -> bool:
+        """Whether the next call of ``agent``/``command`` gets its payload size measured."""
+        if PAYLOAD_SAMPLE_EVERY <= 0:
+            return False
+        with self._lock:
+            stats = self._stats.get((agent, command))
+            return stats is None or stats.calls % PAYLOAD_SAMPLE_EVERY == 0
+
+    def record(
+        self,
+        agent: str,
+        command: str,
+        seconds: float,
+        success: bool,
+        payload_bytes: Optional[int] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self._stats_for(agent, command or "").record(seconds, success, payload_bytes, error)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            agents: Dict[str, Dict[str, Any]] = {}
+            for (agent, command), stats in sorted(self._stats.items()):
+                agents.setdefault(agent, {})[command] = stats.snapshot()
+            active = dict(self._active)
+            counters = dict(self._counters)
+        return {
+            "started_at": self.started_at,
+            "active": active,
+            "counters": counters,
+            "agents": agents,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._commands.clear()
+            self._counters.clear()
+            self.started_at = time.time()
+
+
+REGISTRY = MetricsRegistry()
+
+_gauges: Dict[str, Callable[[], Any]] = {}
+
+
+def register_gauge(name: str, source: Callable[[], Any]) -> None:
+    """Expose ``source()`` as a named load figure (reported in agent heartbeats)."""
+    _gauges[name] = source
+
+
+def read_gauges() -> Dict[str, Any]:
+    values: Dict[str, Any] = {}
+    for name, source in list(_gauges.items()):
+        try:
+            values[name] = source()
+        except Exception:  # noqa: BLE001 - a broken gauge must not break its readers
+            continue
+    return values
+
+
+def _payload_size(result: Any) -> int:
+    try:
+        return len(json.dumps(result, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _command_name(agent: Any, payload: Dict[str, Any]) -> str:
+    """The stats key for ``payload``; commands missing from the agent's registry are unknown."""
+    command = str(payload.get("command") or payload.get("action") or "")
+    if getattr(agent, "_commands", None) and agent.get_command(command) is None:
+        return UNKNOWN_COMMAND
+    return command
+
+
+def _finish(agent: str, command: str, started: float, result: Any) -> Any:
+    elapsed = time.monotonic() - started
+    success = bool(result.get("success", True)) if isinstance(result, dict) else True
+    error = result.get("error") if isinstance(result, dict) else None
+    size = _payload_size(result) if REGISTRY.should_measure(agent, command) else None
+    REGISTRY.record(agent, command, elapsed, success, size, error)
+    if isinstance(result, dict):
+        result.setdefault("execution_time", elapsed)
+    return result
+
+
+def instrument_run(run: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """Wrap an agent ``run`` method so each call is timed and recorded in REGISTRY."""
+    if getattr(run, "__instrumented__", False):
+        return run
+
+    @functools.wraps(run)
+    def wrapper(self: Any, payload: Dict[str, Any], *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        command = _command_name(self, payload)
+        REGISTRY.begin(self.name)
+        started = time.monotonic()
+        try:
+            result = run(self, payload, *args, **kwargs)
+        except BaseException as exc:
+            REGISTRY.record(self.name, command, time.monotonic() - started, False, None, str(exc))
+            raise
+        finally:
+            REGISTRY.end(self.name)
+        return _finish(self.name, command, started, result)
+
+    wrapper.__instrumented__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+def instrument_run_async(
+    run_async: Callable[..., Awaitable[Dict[str, Any]]]
+) -> Callable[..., Awaitable[Dict[str, Any]]]:
+    """Coroutine counterpart of :func:`instrument_run` for ``run_async`` overrides."""
+    if getattr(run_async, "__instrumented__", False):
+        return run_async
+
+    @functools.wraps(run_async)
+    async def wrapper(
+        self: Any, payload: Dict[str, Any], *args: Any, **kwargs: Any
+    ) -> Dict[str, Any]:
+        command = _command_name(self, payload)
+        REGISTRY.begin(self.name)
+        started = time.monotonic()
+        try:
+            result = await run_async(self, payload, *args, **kwargs)
+        except BaseException as exc:
+            REGISTRY.record(self.name, command, time.monotonic() - started, False, None, str(exc))
+            raise
+        finally:
+            REGISTRY.end(self.name)
+        return _finish(self.name, command, started, result)
+
+    wrapper.__instrumented__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+def format_summary(snapshot: Dict[str, Any], limit: Optional[int] = None) -> str:
+    """Render a metrics snapshot as a table sorted by p95 latency, slowest first."""
+    rows: List[Tuple[str, str, Dict[str, Any]]] = [
+        (agent, command, stats)
+        for agent, commands in snapshot.get("agents", {}).items()
+        for command, stats in commands.items()
+    ]
+    rows.sort(key=lambda row: row[2]["latency_us"]["p95"], reverse=True)
+    if limit:
+        rows = rows[:limit]
+    header = (
+        f"{'agent':<10} {'command':<28} {'calls':>7} {'err%':>6} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    )
+    lines = [header, "-" * len(header)]
+    for agent, command, stats in rows:
+        latency = stats["latency_us"]
+        lines.append(
+            f"{agent:<10} {command[:28]:<28} {stats['calls']:>7} "
+            f"{stats['error_rate'] * 100:>5.1f}% "
+            f"{latency['p50'] / 1000:>9.2f} {latency['p95'] / 1000:>9.2f} "
+            f"{latency['p99'] / 1000:>9.2f} {latency['max'] / 1000:>9.2f}"
+        )
+    if not rows:
+        lines.append("no commands recorded")
+    counters = snapshot.get("counters") or {}
+    if counters:
+        lines.append("")
+        lines.extend(f"{name:<48} {value:>9}" for name, value in sorted(counters.items()))
+    return "\n".join(lines)
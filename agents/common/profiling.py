@@ -0,0 +1,194 @@
+"""Opt-in profiling of individual agent commands.
+
+A command is profiled when its payload carries ``"profile": true`` or when it is
+picked by ``NOVA_PROFILE_SAMPLE_RATE`` (0.0-1.0). Profiles are written under the
+agent's log directory and the artifact id is returned as ``profile_artifact`` in
+the command response.
+
+``NOVA_PROFILER=pyinstrument`` writes speedscope JSON when pyinstrument is
+installed; otherwise cProfile output is saved in pstats format. Only the newest
+``NOVA_PROFILE_KEEP`` artifacts per agent (default 200) are kept. An artifact
+that cannot be written is logged and left out of the response; the command's
+own result or exception is unaffected.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import functools
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .alog import warn
+
+try:  # optional dependency
+    from pyinstrument import Profiler as _PyInstrumentProfiler  # type: ignore
+    from pyinstrument.renderers import SpeedscopeRenderer as _SpeedscopeRenderer  # type: ignore
+except Exception:  # pragma: no cover - pyinstrument is not a hard requirement
+    _PyInstrumentProfiler = None
+    _SpeedscopeRenderer = None
+
+KEEP = int(os.getenv("NOVA_PROFILE_KEEP", "200"))
+
+
+def _sample_rate() -> float:
+    try:
+        return float(os.getenv("NOVA_PROFILE_SAMPLE_RATE", "0") or 0)
+    except ValueError:
+        return 0.0
+
+
+def should_profile(payload: Dict[str, Any]) -> bool:
+    if payload.get("profile"):
+        return True
+    rate = _sample_rate()
+    return rate > 0 and random.random() < rate
+
+
+def _is_plain_name(value: str) -> bool:
+    return bool(value) and "/" not in value and "\\" not in value and ".." not in value
+
+
+def profiles_dir(agent_name: str) -> Path:
+    """Directory holding profile artifacts for ``agent_name``."""
+    from agents.base import resolve_platform_log
+
+    path = resolve_platform_log(agent_name).parent / "profiles" / agent_name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def find_artifact(agent_name: str, artifact_id: str) -> Optional[Path]:
+    """Return the file for ``artifact_id`` if it exists, rejecting path traversal."""
+    if not (_is_plain_name(agent_name) and _is_plain_name(artifact_id)):
+        return None
+    for suffix in (".prof", ".speedscope.json"):
+        candidate = profiles_dir(agent_name) / f"{artifact_id}{suffix}"
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def prune_artifacts(directory: Path, keep: int = KEEP) -> int:
+    """Delete all but the newest ``keep`` artifacts in ``directory``; returns how many went."""
+    if keep <= 0:
+        return 0
+    artifacts = []
+    for path in directory.iterdir():
+        try:
+            artifacts.append((path.stat().st_mtime, path))
+        except OSError:
+            continue
+    artifacts.sort()
+    stale = artifacts[:-keep]
+    for _, path in stale:
+        path.unlink(missing_ok=True)
+    return len(stale)
+
+
+def _save_artifact(
+    agent_name: str, artifact_id: str, directory: Path, write: Callable[[], None]
+) -> Optional[str]:
+    try:
+        write()
+        prune_artifacts(directory, KEEP)
+    except Exception as exc:  # noqa: BLE001 - never mask the command's own outcome
+        warn(
+            "profiling.artifact_failed",
+            {"agent": agent_name, "artifact": artifact_id, "error": str(exc)},
+        )
+        return None
+    return artifact_id
+
+
+def profile_call(
+    agent_name: str, command: str, func: Callable[[], Any]
+) -> Tuple[Any, Optional[str]]:
+    """Run ``func`` under a profiler and persist the result.
+
+    Returns ``(result, artifact id)``; the id is None when the artifact could not
+    be written.
+    """
+    safe_command = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in command) or "run"
+    artifact_id = f"{safe_command}-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    target_dir = profiles_dir(agent_name)
+
+    if os.getenv("NOVA_PROFILER", "cprofile").lower() == "pyinstrument" and _PyInstrumentProfiler:
+        profiler = _PyInstrumentProfiler()
+        profiler.start()
+
+        def write_speedscope() -> None:
+            profiler.stop()
+            output = profiler.output(renderer=_SpeedscopeRenderer())
+            (target_dir / f"{artifact_id}.speedscope.json").write_text(output, encoding="utf-8")
+
+        try:
+            result = func()
+        finally:
+            saved = _save_artifact(agent_name, artifact_id, target_dir, write_speedscope)
+        return result, saved
+
+    profiler = cProfile.Profile()
+    try:
+        result = profiler.runcall(func)
+    finally:
+        saved = _save_artifact(
+            agent_name,
+            artifact_id,
+            target_dir,
+            lambda: profiler.dump_stats(str(target_dir / f"{artifact_id}.prof")),
+        )
+    return result, saved
+
+
+def profile_run(run: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """Wrap an agent ``run`` method with the opt-in profiling hook."""
+    if getattr(run, "__profiled__", False):
+        return run
+
+    @functools.wraps(run)
+    def wrapper(self: Any, payload: Dict[str, Any], *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        if not should_profile(payload):
+            return run(self, payload, *args, **kwargs)
+        command = str(payload.get("command") or payload.get("action") or "")
+        result, artifact_id = profile_call(
+            self.name, command, lambda: run(self, payload, *args, **kwargs)
+        )
+        if isinstance(result, dict) and artifact_id is not None:
+            result["profile_artifact"] = artifact_id
+        return result
+
+    wrapper.__profiled__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+def profile_run_async(
+    run_async: Callable[..., Awaitable[Dict[str, Any]]]
+) -> Callable[..., Awaitable[Dict[str, Any]]]:
+    """Route profiled ``run_async`` calls through the (profiled) synchronous ``run``.
+
+    Coroutines interleave on the event loop, so a profile of one would mix in every
+    other task; the command is run synchronously on an executor thread instead.
+    """
+    if getattr(run_async, "__profiled__", False):
+        return run_async
+
+    @functools.wraps(run_async)
+    async def wrapper(
+        self: Any, payload: Dict[str, Any], *args: Any, **kwargs: Any
+    ) -> Dict[str, Any]:
+        if not should_profile(payload):
+            return await run_async(self, payload, *args, **kwargs)
+        payload = {**payload, "profile": True}
+        # Skip the metrics layer of ``run``; the caller's run_async wrapper records the call.
+        run = getattr(type(self).run, "__wrapped__", type(self).run)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, run, self, payload)
+
+    wrapper.__profiled__ = True  # type: ignore[attr-defined]
+    return wrapper
@@ -0,0 +1,214 @@
+"""Shared Redis access layer for the agent control plane.
+
+All agent-side Redis traffic goes through one process-wide connection pool with
+health checks, TCP keepalive and retry with exponential backoff, instead of each
+caller building its own client. Database selection follows the platform namespace
+rules: ``REDIS_DB`` wins, otherwise the database number in ``REDIS_URL`` is used.
+
+Tunables (environment):
+    REDIS_MAX_CONNECTIONS          pool size (default 50)
+    REDIS_HEALTH_CHECK_INTERVAL    seconds between idle-connection PINGs (default 30)
+    REDIS_SOCKET_KEEPALIVE         enable TCP keepalive (default 1)
+    REDIS_KEEPALIVE_IDLE/INTVL/CNT keepalive timings where the platform supports them
+    REDIS_CONNECT_TIMEOUT          connect timeout in seconds (default 5)
+    REDIS_RETRY_ATTEMPTS           retries per command on connection errors (default 5)
+    REDIS_RETRY_BACKOFF_BASE/CAP   exponential backoff base and cap in seconds
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import socket
+import threading
+import weakref
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+    from redis.backoff import ExponentialBackoff
+    from redis.exceptions import ConnectionError as RedisConnectionError
+    from redis.exceptions import TimeoutError as RedisTimeoutError
+    from redis.retry import Retry
+except ModuleNotFoundError:  # pragma: no cover - redis is only needed when a client is requested
+    redis = None  # type: ignore[assignment]
+    aioredis = None  # type: ignore[assignment]
+
+from .alog import info
+
+
+def _parse_redis_db_from_url(redis_url: str) -> int:
+    """Parse Redis database number from URL, defaulting to 0."""
+    try:
+        parsed = urlparse(redis_url)
+        if parsed.path and len(parsed.path) > 1:
+            # Extract DB number from path like '/2'
+            db_str = parsed.path.lstrip('/')
+            return int(db_str) if db_str.isdigit() else 0
+    except Exception:
+        pass
+    return 0
+
+
+def redis_url() -> str:
+    return os.getenv("REDIS_URL", "redis://redis:6379/0")
+
+
+def env_redis_db() -> Optional[int]:
+    """Database number forced through ``REDIS_DB``, if any."""
+    value = os.getenv("REDIS_DB")
+    return int(value) if value else None
+
+
+def resolve_redis_db(url: Optional[str] = None) -> int:
+    """Return the namespace database: ``REDIS_DB`` if set, else the URL's db, else 0."""
+    override = env_redis_db()
+    if override is not None:
+        return override
+    return _parse_redis_db_from_url(url or redis_url())
+
+
+def base_url(url: Optional[str] = None) -> str:
+    """Strip the database path from a Redis URL."""
+    parsed = urlparse(url or redis_url())
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _keepalive_options() -> Dict[int, int]:
+    options: Dict[int, int] = {}
+    for env, attr, default in (
+        ("REDIS_KEEPALIVE_IDLE", "TCP_KEEPIDLE", 60),
+        ("REDIS_KEEPALIVE_INTVL", "TCP_KEEPINTVL", 10),
+        ("REDIS_KEEPALIVE_CNT", "TCP_KEEPCNT", 3),
+    ):
+        if hasattr(socket, attr):
+            options[getattr(socket, attr)] = int(os.getenv(env, default))
+    return options
+
+
+def pool_kwargs() -> Dict[str, Any]:
+    """Connection options shared by the sync and async pools."""
+    keepalive = os.getenv("REDIS_SOCKET_KEEPALIVE", "1").lower() in ("1", "true", "yes")
+    kwargs: Dict[str, Any] = {
+        "db": resolve_redis_db(),
+        "decode_responses": True,
+        "max_connections": int(os.getenv("REDIS_MAX_CONNECTIONS", "50")),
+        "health_check_interval": int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30")),
+        "socket_connect_timeout": _env_float("REDIS_CONNECT_TIMEOUT", 5.0),
+        "socket_keepalive": keepalive,
+    }
+    if keepalive:
+        kwargs["socket_keepalive_options"] = _keepalive_options()
+    return kwargs
+
+
+def backoff_delays(base: Optional[float] = None, cap: Optional[float] = None) -> Iterator[float]:
+    """Yield exponentially growing reconnect delays, capped at ``cap`` seconds."""
+    delay = base if base is not None else _env_float("REDIS_RETRY_BACKOFF_BASE", 0.1)
+    limit = cap if cap is not None else _env_float("REDIS_RETRY_BACKOFF_CAP", 10.0)
+    while True:
+        yield min(delay, limit)
+        delay = min(delay * 2, limit)
+
+
+def _retry_kwargs() -> Dict[str, Any]:
+    attempts = int(os.getenv("REDIS_RETRY_ATTEMPTS", "5"))
+    backoff = ExponentialBackoff(
+        cap=_env_float("REDIS_RETRY_BACKOFF_CAP", 10.0),
+        base=_env_float("REDIS_RETRY_BACKOFF_BASE", 0.1),
+    )
+    return {
+        "retry": Retry(backoff, attempts),
+        "retry_on_error": [RedisConnectionError, RedisTimeoutError],
+    }
+
+
+_lock = threading.Lock()
+_pool = None
+# Keyed weakly by event loop: a pool dies with its loop and is never handed to another
+_async_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _require_redis() -> None:
+    if redis is None:
+        raise RuntimeError("redis package is not installed; pip install redis")
+
+
+def get_pool():
+    """Return the process-wide synchronous connection pool, creating it on first use."""
+    global _pool
+    _require_redis()
+    with _lock:
+        if _pool is None:
+            kwargs = pool_kwargs()
+            _pool = redis.ConnectionPool.from_url(base_url(), **kwargs, **_retry_kwargs())
+            info(
+                f"agent-{os.getenv('AGENT_NAME', 'unknown')}: Connected to Redis database "
+                f"{kwargs['db']} at {base_url()}"
+            )
+        return _pool
+
+
+def get_client():
+    """Return a synchronous client backed by the shared pool."""
+    return redis.Redis(connection_pool=get_pool())
+
+
+def get_async_client():
+    """Return an asyncio client backed by a pool bound to the running event loop."""
+    _require_redis()
+    loop = asyncio.get_running_loop()
+    with _lock:
+        pool = _async_pools.get(loop)
+        if pool is None:
+            pool = aioredis.ConnectionPool.from_url(
+                base_url(), **pool_kwargs(), **_retry_kwargs()
+            )
+            _async_pools[loop] = pool
+    return aioredis.Redis(connection_pool=pool)
+
+
+def reset_pools() -> None:
+    """Drop cached pools (after fork or configuration changes)."""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.disconnect()
+        _pool = None
+        _async_pools.clear()
+
+
+def publish_many(messages: Iterable[Tuple[str, Any]], client: Any = None) -> List[int]:
+    """Publish ``(channel, message)`` pairs in a single pipelined round trip.
+
+    Non-string messages are JSON encoded. Returns the receiver count per message.
+    """
+    client = client or get_client()
+    pipe = client.pipeline(transaction=False)
+    count = 0
+    for channel, message in messages:
+        pipe.publish(channel, message if isinstance(message, str) else json.dumps(message))
+        count += 1
+    return pipe.execute() if count else []
+
+
+def broadcast(
+    message: Dict[str, Any], agents: Optional[Iterable[str]] = None, client: Any = None
+) -> List[int]:
+    """Send a control message to ``agent.all.control`` or to each named agent's channel."""
+    channels = (
+        [f"agent.{agent}.control" for agent in agents] if agents else ["agent.all.control"]
+    )
+    return publish_many(((channel, message) for channel in channels), client=client)
@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.base import add_command_hook, remove_command_hook
+from agents.echo.agent import EchoAgent
+from agents.glitch.agent import GlitchAgent
+
+
+def test_commands_are_listed_with_metadata():
+    commands = {spec["name"]: spec for spec in GlitchAgent().list_commands()}
+    assert commands["hash_file"]["cost"] == "io"
+    assert commands["hash_file"]["args"] == {"path": "str"}
+    assert commands["scan_memory"]["restricted"] is True
+    assert "send_message" not in commands
+
+
+def test_dispatch_validates_args_and_reports_to_hooks():
+    seen = []
+
+    def hook(agent, spec, elapsed, failure):
+        seen.append((agent, spec.name, failure))
+
+    add_command_hook(hook)
+    try:
+        echo = EchoAgent()
+        ok = echo.run({"command": "send_message", "args": {"message": "hi"}})
+        # CLI --arg values arrive as numbers when they look like one
+        number = echo.run({"command": "send_message", "args": {"message": 42}})
+        bad = echo.run({"command": "send_message", "args": {"message": ["hi"]}})
+        unknown = echo.run({"command": "nope", "args": {}})
+    finally:
+        remove_command_hook(hook)
+
+    assert ok["success"] is True
+    assert number["output"]["details"]["message"] == "42"
+    assert bad["success"] is False and "must be str" in bad["error"]
+    assert unknown["error"] == "unknown command 'nope'"
+    assert seen == [("echo", "send_message", None)] * 2
+
+
+def test_restricted_commands_blocked_outside_forensics_mode(monkeypatch):
+    monkeypatch.setenv("GLITCH_MODE", "observe")
+    agent = GlitchAgent()
+    with pytest.raises(PermissionError):
+        agent.run({"command": "scan_memory", "args": {}})
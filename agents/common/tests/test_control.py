@@ -0,0 +1,207 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+redis = pytest.importorskip("redis")
+
+from agents.common import control  # noqa: E402
+from agents.common.control import ControlBus  # noqa: E402
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def xadd(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+
+    def execute(self):
+        return [self.client.xadd(*args, **kwargs) for args, kwargs in self.calls]
+
+
+class FakeStreams:
+    """Just enough of Redis Streams with consumer groups; ``now`` is in milliseconds."""
+
+    def __init__(self):
+        self.streams = {}
+        self.groups = {}
+        self.acked = []
+        self.now = 0
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    def xadd(self, stream, fields, maxlen=None, approximate=True):
+        entries = self.streams.setdefault(stream, [])
+        msg_id = f"{len(entries) + 1}-0"
+        entries.append((msg_id, dict(fields)))
+        return msg_id
+
+    def xgroup_create(self, stream, group, id="$", mkstream=False):
+        if (stream, group) in self.groups:
+            raise redis.ResponseError("BUSYGROUP Consumer Group name already exists")
+        entries = self.streams.setdefault(stream, [])
+        self.groups[(stream, group)] = {"next": 0 if id == "0" else len(entries), "pending": {}}
+
+    def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        response = []
+        for stream in streams:
+            state = self.groups[(stream, group)]
+            entries = self.streams[stream][state["next"] : state["next"] + count]
+            state["next"] += len(entries)
+            for msg_id, _ in entries:
+                state["pending"][msg_id] = [consumer, self.now, 1]
+            if entries:
+                response.append([stream, entries])
+        return response
+
+    def xack(self, stream, group, *ids):
+        for msg_id in ids:
+            self.groups[(stream, group)]["pending"].pop(msg_id, None)
+            self.acked.append((stream, msg_id))
+
+    def xclaim(self, stream, group, consumer, min_idle_time, ids, justid=False):
+        pending = self.groups[(stream, group)]["pending"]
+        for msg_id in ids:
+            pending[msg_id][:2] = [consumer, self.now]
+
+    def xautoclaim(self, stream, group, consumer, min_idle_time, start_id="0-0", count=100):
+        pending = self.groups[(stream, group)]["pending"]
+        fields = dict(self.streams[stream])
+
+        def seq(msg_id):
+            return int(msg_id.split("-")[0])
+
+        ids = sorted((msg_id for msg_id in pending if seq(msg_id) >= seq(start_id)), key=seq)
+        idle = [msg_id for msg_id in ids if self.now - pending[msg_id][1] >= min_idle_time]
+        claimed, rest = idle[:count], idle[count:]
+        for msg_id in claimed:
+            pending[msg_id] = [consumer, self.now, pending[msg_id][2] + 1]
+        return [rest[0] if rest else "0-0", [(msg_id, fields[msg_id]) for msg_id in claimed], []]
+
+    def xpending_range(self, stream, group, min, max, count):
+        entry = self.groups[(stream, group)]["pending"].get(min)
+        return [{"message_id": min, "times_delivered": entry[2]}] if entry else []
+
+
+def _bus():
+    client = FakeStreams()
+    bus = ControlBus("glitch", client=client)
+    return bus, client
+
+
+def _wait(event):
+    assert event.wait(5)
+
+
+def _settled(bus):
+    deadline = time.monotonic() + 5
+    while bus.inflight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return bus.inflight == 0
+
+
+def test_groups_read_tasks_submitted_before_creation():
+    bus, client = _bus()
+    bus.submit_many([("glitch", {"n": 1}), (None, {"n": 2})])
+    bus.ensure_groups()
+    bus.ensure_groups()  # BUSYGROUP is ignored
+
+    seen, done = [], threading.Event()
+
+    @bus.on_task
+    def handler(task):
+        seen.append(task.args["n"])
+        if len(seen) == 2:
+            done.set()
+
+    assert bus.poll(block_ms=0) == 2
+    _wait(done)
+    assert _settled(bus)
+    assert sorted(seen) == [1, 2]
+    assert sorted(client.acked) == [("agent.all.tasks", "1-0"), ("agent.glitch.tasks", "1-0")]
+
+
+def test_failed_tasks_are_retried_then_dead_lettered(monkeypatch):
+    monkeypatch.setattr(control, "MAX_DELIVERIES", 2)
+    bus, client = _bus()
+    bus.ensure_groups()
+    bus.submit("glitch", {"n": 1})
+    attempts = []
+
+    @bus.on_task
+    def handler(task):
+        attempts.append(task.deliveries)
+        raise RuntimeError("nope")
+
+    bus.poll(block_ms=0)
+    assert _settled(bus)
+    assert attempts == [1] and client.acked == []
+
+    assert bus.reclaim() == 0  # not idle long enough yet
+    client.now += control.RETRY_IDLE_MS
+    assert bus.reclaim() == 1
+    assert _settled(bus)
+    assert attempts == [1, 2]
+
+    client.now += control.RETRY_IDLE_MS
+    assert bus.reclaim() == 1
+    assert attempts == [1, 2]
+    [(_, dead)] = client.streams["agent.glitch.tasks.dead"]
+    assert dead["source_id"] == "1-0" and dead["deliveries"] == "3"
+    assert client.acked == [("agent.glitch.tasks", "1-0")]
+
+
+def test_queue_consumers_count_as_inflight_and_gate_the_ack(monkeypatch):
+    monkeypatch.setattr(control, "MAX_INFLIGHT", 1)
+    bus, client = _bus()
+    bus.ensure_groups()
+    bus.submit_many([("glitch", {"n": 1}), ("glitch", {"n": 2})])
+    handled = threading.Event()
+    bus.on_task(lambda task: handled.set())
+
+    async def consume():
+        queue = bus.task_queue()
+        assert bus.poll(block_ms=0) == 1
+        task = await asyncio.wait_for(queue.get(), 5)
+        await asyncio.get_running_loop().run_in_executor(None, _wait, handled)
+        # The handler is done, but the queue consumer is not: no ack, no free slot
+        assert client.acked == [] and bus.inflight == 1
+        assert bus.poll(block_ms=0) == 0
+        task.ack()
+
+    asyncio.run(consume())
+    assert client.acked == [("agent.glitch.tasks", "1-0")] and bus.inflight == 0
+
+
+def test_reclaim_skips_running_tasks_and_respects_capacity(monkeypatch):
+    monkeypatch.setattr(control, "MAX_INFLIGHT", 2)
+    bus, client = _bus()
+    bus.ensure_groups()
+    bus.submit_many([("glitch", {"n": n}) for n in range(3)])
+    release = threading.Event()
+    bus.on_task(lambda task: release.wait(5))
+
+    assert bus.poll(block_ms=0) == 2
+    client.now += control.RETRY_IDLE_MS
+    assert bus.reclaim() == 0  # both slots busy; running tasks have their idle time reset
+    pending = client.groups[("agent.glitch.tasks", "agent.glitch")]["pending"]
+    assert all(entry[2] == 1 for entry in pending.values())
+    release.set()
+    assert _settled(bus)
+
+
+def test_local_tasks_are_never_acked_on_a_stream():
+    bus, client = _bus()
+    done = threading.Event()
+    bus.on_task(lambda task: done.set())
+    bus.dispatch_local({"n": 1})
+    _wait(done)
+    assert _settled(bus) and client.acked == []
@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.common import heartbeat
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=b""):
+        self.status_code = status_code
+        self.content = body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def json(self):
+        return {"resync": True}
+
+
+class FakeSession:
+    def __init__(self):
+        self.headers = {}
+        self.posts = []
+        self.responses = []
+
+    def post(self, url, json=None, timeout=None):
+        self.posts.append(json)
+        return self.responses.pop(0) if self.responses else FakeResponse()
+
+    def close(self):
+        pass
+
+
+def test_full_registration_then_deltas(monkeypatch):
+    load = {"active_commands": 0}
+    monkeypatch.setattr(heartbeat, "load_stats", lambda: dict(load))
+    session = FakeSession()
+    client = heartbeat.HeartbeatClient(agent="glitch", session=session, full_every=100)
+
+    client.send()
+    first = session.posts[-1]
+    assert first["full"] is True
+    assert {"version", "host", "pid", "capabilities", "load"} <= set(first)
+
+    client.send()
+    idle = session.posts[-1]
+    assert idle["full"] is False
+    assert set(idle) == {"agent", "instance", "seq", "full", "updated_at"}
+
+    load["active_commands"] = 3
+    client.send()
+    assert session.posts[-1]["load"] == {"active_commands": 3}
+
+
+def test_resync_after_failure_or_server_request(monkeypatch):
+    monkeypatch.setattr(heartbeat, "load_stats", lambda: {})
+    session = FakeSession()
+    client = heartbeat.HeartbeatClient(agent="glitch", session=session)
+
+    client.send()
+    session.responses.append(FakeResponse(409))
+    assert client.send() is False
+    client.send()
+    assert session.posts[-1]["full"] is True
+
+    session.responses.append(FakeResponse(200, b"{}"))
+    client.send()
+    client.send()
+    assert session.posts[-1]["full"] is True
+
+
+def test_jitter_stays_within_bounds():
+    for _ in range(100):
+        assert 18.0 <= heartbeat.jittered(20, 0.1) <= 22.0
@@ -0,0 +1,87 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.common.jobs import TERMINAL_EVENTS, JobQueue, JobStore, report_progress
+
+
+def _runner(agent, command, args):
+    report_progress({"step": 1})
+    if command == "boom":
+        raise RuntimeError("exploded")
+    return {"success": True, "output": {"agent": agent, "echo": args}, "error": None}
+
+
+def test_job_queue_runs_and_records_events(tmp_path):
+    queue = JobQueue(_runner, JobStore(tmp_path / "jobs.sqlite3"), workers=1)
+    ok = queue.submit("echo", "send_message", {"message": "hi"})
+    bad = queue.submit("echo", "boom")
+    queue.shutdown(wait=True)
+
+    job = queue.get(ok)
+    assert job["status"] == "succeeded"
+    assert job["result"]["output"]["echo"] == {"message": "hi"}
+    kinds = [event["kind"] for event in queue.events(ok)]
+    assert kinds == ["queued", "running", "progress", "result"]
+
+    failed = queue.get(bad)
+    assert failed["status"] == "failed"
+    assert failed["error"] == "exploded"
+
+
+def test_pending_jobs_survive_restart(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job_id = store.create("echo", "send_message", {})
+    store.update(job_id, status="running")
+    store.close()
+
+    queue = JobQueue(
+        _runner,
+        JobStore(tmp_path / "jobs.sqlite3"),
+        workers=1,
+        is_idempotent=lambda agent, command: command == "send_message",
+    )
+    queue.start()
+    queue.shutdown(wait=True)
+    assert queue.get(job_id)["status"] == "succeeded"
+
+
+def test_interrupted_non_idempotent_jobs_are_not_rerun(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    running = store.create("glitch", "wipe_logs", {})
+    store.update(running, status="running")
+    queued = store.create("glitch", "wipe_logs", {})
+    store.close()
+
+    queue = JobQueue(_runner, JobStore(tmp_path / "jobs.sqlite3"), workers=1)
+    queue.start()
+    queue.shutdown(wait=True)
+
+    job = queue.get(running)
+    assert job["status"] == "failed" and job["error"] == "interrupted"
+    assert [event["kind"] for event in queue.events(running)] == ["interrupted"]
+    assert queue.get(queued)["status"] == "succeeded"
+    # Event streams close on the last event of either job
+    assert queue.events(running)[-1]["kind"] in TERMINAL_EVENTS
+    assert queue.events(queued)[-1]["kind"] in TERMINAL_EVENTS
+
+
+def test_handlers_stream_progress_from_jobs(tmp_path):
+    from agents.glitch.agent import GlitchAgent
+
+    (tmp_path / "bin").mkdir()
+    (tmp_path / "bin" / "tool").write_text("x")
+    agent = GlitchAgent()
+
+    def runner(name, command, args):
+        return agent.run({"command": command, "args": args})
+
+    queue = JobQueue(runner, JobStore(tmp_path / "jobs.sqlite3"), workers=1)
+    job_id = queue.submit("glitch", "check_integrity", {"paths": [str(tmp_path / "bin"), "/nope"]})
+    queue.shutdown(wait=True)
+
+    progress = [e["data"] for e in queue.events(job_id) if e["kind"] == "progress"]
+    assert [p["paths_done"] for p in progress] == [1, 2]
+    assert progress[0]["results"][0]["files_checked"] == 1
+    assert progress[1]["results"] == []
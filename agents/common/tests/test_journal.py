@@ -0,0 +1,33 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.common.journal import Journal
+
+
+def test_append_rotate_and_tail(tmp_path):
+    journal = Journal(tmp_path, "device_track", segment_bytes=200, fsync="never")
+    for i in range(50):
+        journal.append({"device_id": "d1", "seq": i})
+    assert len(journal) == 50
+    assert len(list((tmp_path / "device_track").glob("*.jsonl"))) > 1
+    assert [r["seq"] for r in journal.tail(3)] == [47, 48, 49]
+    assert [r["seq"] for r in journal] == list(range(50))
+    journal.close()
+
+    reopened = Journal(tmp_path, "device_track", segment_bytes=200, fsync="never")
+    assert len(reopened) == 50
+    assert [r["seq"] for r in reopened.tail(25)] == list(range(25, 50))
+
+
+def test_legacy_json_array_is_migrated_once(tmp_path):
+    legacy = tmp_path / "symptoms.json"
+    legacy.write_text(json.dumps([{"user": "a"}, {"user": "b"}]), encoding="utf-8")
+    journal = Journal(tmp_path, "symptoms", fsync="always")
+    assert [r["user"] for r in journal] == ["a", "b"]
+    assert not legacy.exists()
+    assert (tmp_path / "symptoms.json.migrated").exists()
+    journal.append({"user": "c"})
+    assert journal.tail(1) == [{"user": "c"}]
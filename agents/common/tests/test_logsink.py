@@ -0,0 +1,22 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.common.logsink import LogSink
+
+
+def test_sink_keeps_one_handle_and_writes_json_lines(tmp_path):
+    sink = LogSink(tmp_path / "audita.log")
+    sink.write({"command": "gdpr_scan", "success": True})
+    handle = sink._fh
+    sink.write({"command": "tax_report", "success": False, "error": "boom"})
+    assert sink._fh is handle
+    sink.flush()
+    lines = (tmp_path / "audita.log").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["command"] for line in lines] == ["gdpr_scan", "tax_report"]
+    sink.close()
+    sink.write({"command": "after_close"})
+    sink.close()
+    assert len((tmp_path / "audita.log").read_text(encoding="utf-8").splitlines()) == 3
@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.common import metrics
+from agents.common.metrics import REGISTRY, Histogram, format_summary
+from agents.echo.agent import EchoAgent
+
+
+def test_histogram_percentiles_within_bucket_precision():
+    hist = Histogram()
+    for value in range(1, 10_001):
+        hist.record(value)
+    assert hist.count == 10_000
+    assert abs(hist.percentile(50) - 5_000) / 5_000 < 0.05
+    assert abs(hist.percentile(99) - 9_900) / 9_900 < 0.05
+    assert hist.percentile(100) == 10_000
+
+
+def test_agent_runs_are_instrumented():
+    REGISTRY.reset()
+    echo = EchoAgent()
+    result = echo.run({"command": "send_message", "args": {"message": "hi"}})
+    echo.run({"command": "missing", "args": {}})
+
+    assert result["execution_time"] >= 0
+    stats = REGISTRY.snapshot()["agents"]["echo"]
+    assert stats["send_message"]["calls"] == 1
+    assert stats["send_message"]["payload_bytes"]["total"] > 0
+    assert stats["unknown"]["errors"] == 1 and "missing" not in stats
+    assert "send_message" in format_summary(REGISTRY.snapshot())
+
+
+def test_payload_sizes_are_sampled(monkeypatch):
+    monkeypatch.setattr(metrics, "PAYLOAD_SAMPLE_EVERY", 4)
+    REGISTRY.reset()
+    echo = EchoAgent()
+    for _ in range(10):
+        echo.run({"command": "send_message", "args": {"message": "hi"}})
+
+    payload = REGISTRY.snapshot()["agents"]["echo"]["send_message"]["payload_bytes"]
+    assert payload["samples"] == 3  # calls 1, 5 and 9
+    assert payload["total"] == int(payload["mean"] * 10)
+
+
+def test_unregistered_command_names_are_capped(monkeypatch):
+    monkeypatch.setattr(metrics, "MAX_COMMANDS", 3)
+    REGISTRY.reset()
+    for n in range(10):
+        REGISTRY.record("nova", f"action-{n}", 0.001, True)
+
+    commands = REGISTRY.snapshot()["agents"]["nova"]
+    assert sorted(commands) == ["action-0", "action-1", "action-2", "unknown"]
+    assert commands["unknown"]["calls"] == 7
@@ -0,0 +1,70 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.common import profiling
+from agents.echo.agent import EchoAgent
+
+
+@pytest.fixture
+def profiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "profiles_dir", lambda agent_name: tmp_path)
+    monkeypatch.delenv("NOVA_PROFILER", raising=False)
+    return tmp_path
+
+
+def test_profiling_is_opt_in(monkeypatch):
+    monkeypatch.delenv("NOVA_PROFILE_SAMPLE_RATE", raising=False)
+    assert not profiling.should_profile({"command": "x"})
+    assert profiling.should_profile({"command": "x", "profile": True})
+    monkeypatch.setenv("NOVA_PROFILE_SAMPLE_RATE", "1")
+    assert profiling.should_profile({"command": "x"})
+    monkeypatch.setenv("NOVA_PROFILE_SAMPLE_RATE", "often")
+    assert not profiling.should_profile({"command": "x"})
+
+
+def test_profiled_run_writes_a_cprofile_artifact(profiles, monkeypatch):
+    monkeypatch.delenv("NOVA_PROFILE_SAMPLE_RATE", raising=False)
+    agent = EchoAgent()
+    plain = agent.run({"command": "send_message", "args": {"message": "hi"}})
+    assert "profile_artifact" not in plain and not list(profiles.iterdir())
+
+    result = agent.run({"command": "send_message", "args": {"message": "hi"}, "profile": True})
+    assert result["success"] is True
+    assert profiling.find_artifact("echo", result["profile_artifact"]).suffix == ".prof"
+
+
+def test_pyinstrument_falls_back_to_cprofile_when_missing(profiles, monkeypatch):
+    monkeypatch.setenv("NOVA_PROFILER", "pyinstrument")
+    monkeypatch.setattr(profiling, "_PyInstrumentProfiler", None)
+    result, artifact_id = profiling.profile_call("echo", "send_message", lambda: 42)
+    assert result == 42
+    assert [p.name for p in profiles.iterdir()] == [f"{artifact_id}.prof"]
+
+
+def test_artifact_errors_never_mask_the_command(tmp_path, monkeypatch):
+    missing = tmp_path / "missing"
+    monkeypatch.setattr(profiling, "profiles_dir", lambda agent_name: missing)
+
+    def boom():
+        raise ValueError("command failed")
+
+    with pytest.raises(ValueError, match="command failed"):
+        profiling.profile_call("echo", "send_message", boom)
+    assert profiling.profile_call("echo", "send_message", lambda: "ok") == ("ok", None)
+
+
+def test_only_the_newest_artifacts_are_kept(profiles, monkeypatch):
+    monkeypatch.setattr(profiling, "KEEP", 2)
+    for n in range(3):
+        old = profiles / f"old-{n}.prof"
+        old.write_text("x")
+        os.utime(old, (n, n))
+    _, artifact_id = profiling.profile_call("echo", "send_message", lambda: None)
+    assert sorted(p.name for p in profiles.iterdir()) == sorted(
+        ["old-2.prof", f"{artifact_id}.prof"]
+    )
@@ -0,0 +1,81 @@
+import itertools
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.common import redis_client
+
+
+class FakePipeline:
+    def __init__(self):
+        self.calls = []
+
+    def publish(self, channel, message):
+        self.calls.append((channel, message))
+
+    def execute(self):
+        return [1] * len(self.calls)
+
+
+class FakeClient:
+    def __init__(self):
+        self.pipelines = []
+
+    def pipeline(self, transaction=True):
+        pipe = FakePipeline()
+        self.pipelines.append(pipe)
+        return pipe
+
+
+def test_namespace_resolution(monkeypatch):
+    monkeypatch.delenv("REDIS_DB", raising=False)
+    monkeypatch.setenv("REDIS_URL", "redis://redis:6379/2")
+    assert redis_client.resolve_redis_db() == 2
+    assert redis_client.base_url() == "redis://redis:6379"
+    monkeypatch.setenv("REDIS_DB", "1")
+    assert redis_client.resolve_redis_db() == 1
+    assert redis_client.pool_kwargs()["db"] == 1
+
+
+def test_backoff_delays_are_capped():
+    delays = list(itertools.islice(redis_client.backoff_delays(0.5, 3.0), 5))
+    assert delays == [0.5, 1.0, 2.0, 3.0, 3.0]
+
+
+def test_broadcast_uses_single_pipeline():
+    client = FakeClient()
+    counts = redis_client.broadcast({"op": "ping"}, agents=["glitch", "lyra"], client=client)
+    assert counts == [1, 1]
+    assert len(client.pipelines) == 1
+    assert [channel for channel, _ in client.pipelines[0].calls] == [
+        "agent.glitch.control",
+        "agent.lyra.control",
+    ]
+
+
+def test_async_pools_are_per_loop_and_released(monkeypatch):
+    import asyncio
+    import gc
+    import types
+
+    class FakePool:
+        @classmethod
+        def from_url(cls, url, **kwargs):
+            return cls()
+
+    fake = types.SimpleNamespace(
+        ConnectionPool=FakePool, Redis=lambda connection_pool: connection_pool
+    )
+    monkeypatch.setattr(redis_client, "redis", object())
+    monkeypatch.setattr(redis_client, "aioredis", fake)
+    monkeypatch.setattr(redis_client, "_retry_kwargs", lambda: {})
+
+    async def pool():
+        return redis_client.get_async_client()
+
+    first = asyncio.run(pool())
+    second = asyncio.run(pool())
+    assert first is not second
+    gc.collect()
+    assert len(redis_client._async_pools) == 0
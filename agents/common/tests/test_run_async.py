@@ -0,0 +1,78 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.base import BaseAgent, async_command, command
+from agents.echo.agent import EchoAgent
+
+
+class MixedAgent(BaseAgent):
+    def __init__(self):
+        super().__init__("mixed")
+
+    @command("fetch", args={"key": str}, cost="net")
+    def _fetch(self, args):
+        return {"via": "sync", "thread": threading.current_thread().name}
+
+    @async_command("fetch")
+    async def _fetch_async(self, args):
+        await asyncio.sleep(0.05)
+        return {"via": "async", "thread": threading.current_thread().name}
+
+    @command("compute")
+    def _compute(self, args):
+        return {"thread": threading.current_thread().name}
+
+    def run(self, payload):
+        return {"success": True, "output": self.dispatch_command(payload["command"], {})}
+
+    async def run_async(self, payload):
+        output = await self.dispatch_command_async(payload["command"], {})
+        return {"success": True, "output": output}
+
+
+def test_native_async_commands_are_awaited_concurrently():
+    agent = MixedAgent()
+    assert agent.get_command("fetch").is_async
+    assert agent.run({"command": "fetch"})["output"]["via"] == "sync"
+
+    async def fan_out():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await asyncio.gather(
+            *(agent.run_async({"command": "fetch"}) for _ in range(50))
+        )
+        return results, loop.time() - started
+
+    results, elapsed = asyncio.run(fan_out())
+    assert {r["output"]["via"] for r in results} == {"async"}
+    assert results[0]["output"]["thread"] == "MainThread"
+    assert elapsed < 1.0
+
+
+def test_sync_handlers_run_on_executor():
+    output = asyncio.run(MixedAgent().run_async({"command": "compute"}))["output"]
+    assert output["thread"] != "MainThread"
+
+
+def test_echo_run_async_keeps_envelope_and_metrics():
+    payload = {"command": "send_message", "args": {"message": "hi"}}
+    result = asyncio.run(EchoAgent().run_async(payload))
+    assert result["success"] is True
+    assert "execution_time" in result
+
+
+def test_glitch_audit_trail_is_written_off_the_event_loop(monkeypatch):
+    from agents.glitch.agent import GlitchAgent
+
+    agent = GlitchAgent()
+    writers = []
+    monkeypatch.setattr(
+        agent, "log_finding", lambda *a, **k: writers.append(threading.current_thread().name)
+    )
+    result = asyncio.run(agent.run_async({"command": "no_such_command"}))
+    assert result["success"] is False
+    assert len(writers) == 2 and "MainThread" not in writers
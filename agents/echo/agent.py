@@ -7,7 +7,7 @@ from pathlib import Path
 from shutil import copy2
 from typing import Any, Dict, List
 
-from agents.base import BaseAgent
+from agents.base import BaseAgent, command
 from agents.common.alog import info
 
 
@@ -90,31 +90,32 @@ class EchoAgent(BaseAgent):
         except Exception as exc:
             return self._wrap("broadcast", None, str(exc))
 
+    @command("send_message", args={"message": str})
+    def _cmd_send_message(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Echo plain text messages across channels."""
+        return self.send_message(args.get("message", ""))
+
+    @command("send_file", args={"src": str, "dst": str}, cost="io")
+    def _cmd_send_file(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a file to the requested destination preserving metadata."""
+        return self.send_file(args.get("src", ""), args.get("dst", ""))
+
+    @command("send_voice", args={"path": str}, cost="io")
+    def _cmd_send_voice(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Return fingerprint of transmitted voice memo."""
+        return self.send_voice(args.get("path", ""))
+
+    @command("broadcast", args={"message": str, "recipients": list})
+    def _cmd_broadcast(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Broadcast to multiple recipients, tagging offline deliveries."""
+        return self.broadcast(args.get("message", ""), args.get("recipients", []))
+
     def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Execute Echo commands with structured output."""
         command = payload.get("command", "")
         args = payload.get("args", {})
 
         try:
-            if command == "send_message":
-                message = args.get("message", "")
-                return self.send_message(message)
-
-            if command == "send_file":
-                src = args.get("src", "")
-                dst = args.get("dst", "")
-                return self.send_file(src, dst)
-
-            if command == "send_voice":
-                path = args.get("path", "")
-                return self.send_voice(path)
-
-            if command == "broadcast":
-                message = args.get("message", "")
-                recipients = args.get("recipients", [])
-                return self.broadcast(message, recipients)
-
-            return self._wrap(command or "", None, f"unknown command '{command}'")
-
+            return self.dispatch_command(command, args)
         except Exception as exc:
             return self._wrap(command or "", None, str(exc))
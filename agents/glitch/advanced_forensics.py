@@ -10,7 +10,9 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime, timezone
 
+from agents.base import _run_coroutine_sync
 from agents.common.alog import info, warn, error
+from agents.common.jobs import report_progress
 
 
 class ForensicsToolkit:
@@ -703,7 +705,23 @@ class AdvancedForensics:
         if not target_path:
             return {"error": "target path required"}
 
-        return self.toolkit.comprehensive_forensics_analysis(target_path)
+        steps = [
+            ('disk_image', self.toolkit.analyze_disk_image),
+            ('memory_dump', self.toolkit.analyze_memory_dump),
+        ]
+        analyses = []
+        for completed, (step, analyze) in enumerate(steps, 1):
+            result = _run_coroutine_sync(analyze(target_path))
+            analyses.append(result)
+            report_progress(
+                {'step': step, 'completed': completed, 'total': len(steps), 'result': result}
+            )
+
+        return {
+            'target': target_path,
+            'analyses': analyses,
+            'report_path': self.toolkit.generate_forensics_report(analyses),
+        }
 
     def cleanup(self):
         """Clean up resources."""
@@ -13,11 +13,31 @@ import subprocess
 import time
 import uuid
 from datetime import datetime, timezone, timedelta
+from itertools import islice
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from agents.base import BaseAgent
+from agents.base import BaseAgent, CommandSpec, async_command, command
 from agents.common.alog import info, warn, error
+from agents.common.jobs import report_progress
+from agents.glitch.archive import search as search_logs
+from agents.glitch.findings import FindingsStore, get_findings_store
+from agents.glitch.logwriter import get_log_writer
+
+DEFAULT_PROBE_PORTS = [22, 80, 443, 8080, 3389, 5432, 3306, 1433]
+PROBE_CONCURRENCY = 256
+PROGRESS_EVERY = 200  # processes between memory-scan progress events
+
+
+async def _exec(*argv: str) -> str:
+    """Run ``argv`` without a shell and return stdout; raise like ``check=True`` does."""
+    proc = await asyncio.create_subprocess_exec(
+        *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, argv, stdout, stderr)
+    return stdout.decode("utf-8", errors="replace")
 
 
 class GlitchAgent(BaseAgent):
@@ -34,7 +54,6 @@ class GlitchAgent(BaseAgent):
         self.threat_level = "low"  # low, medium, high, critical
         self.active_scans: List[str] = []
         self.last_scan_time: Optional[str] = None
-        self.findings_cache: List[Dict[str, Any]] = []
         self.baseline_data: Dict[str, Any] = {}
         self.honeypots: Dict[str, Any] = {}
 
@@ -44,21 +63,21 @@ class GlitchAgent(BaseAgent):
 
         self.logs_dir = Path("/tmp/glitch/logs")
         self.logs_dir.mkdir(parents=True, exist_ok=True)
+        self.findings: FindingsStore = get_findings_store(self.logs_dir / "findings.db")
+        self.log_writer = get_log_writer(self.logs_dir)
         self.mode = os.getenv("GLITCH_MODE", "forensics").lower()
-        self._restricted_commands = {
-            "deploy_honeypot",
-            "deep_scan_file",
-            "scan_memory",
-            "detect_rootkit",
-            "check_integrity",
-        }
 
-    def _enforce_mode(self, command: str) -> None:
-        if command in self._restricted_commands and self.mode != "forensics":
+    def _authorize_command(self, spec: CommandSpec) -> None:
+        if spec.restricted and self.mode != "forensics":
             raise PermissionError(
                 "destructive command blocked: set GLITCH_MODE=forensics to enable forensic routines"
             )
 
+    def _enforce_mode(self, command: str) -> None:
+        spec = self.get_command(command)
+        if spec is not None:
+            self._authorize_command(spec)
+
     def deploy_honeypot(self, name: str, path: str, signature: str) -> Dict[str, Any]:
         """Deploy a honeypot file that triggers alerts on modification."""
         target = Path(path)
@@ -94,9 +113,19 @@ class GlitchAgent(BaseAgent):
             )
         return {"honeypots": status}
 
-    def incident_report(self, limit: int = 50) -> Dict[str, Any]:
+    @property
+    def findings_cache(self) -> List[Dict[str, Any]]:
+        """In-memory tail of recent findings, oldest first."""
+        return self.findings.tail()
+
+    def incident_report(
+        self,
+        limit: int = 50,
+        finding_type: Optional[str] = None,
+        threat_level: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """Summarize recent findings and current threat posture."""
-        recent = list(reversed(self.findings_cache[-limit:]))
+        recent = self.findings.recent(limit, type_=finding_type, threat_level=threat_level)
         severities = [finding.get("threat_level", "low") for finding in recent]
         high = sum(1 for level in severities if level in {"high", "critical"})
         return {
@@ -128,12 +157,8 @@ class GlitchAgent(BaseAgent):
             "threat_level": self.assess_threat_level(finding_type, details),
         }
 
-        self.findings_cache.append(finding)
-
-        # Write to log file
-        log_file = self.logs_dir / f"findings_{datetime.now().strftime('%Y-%m-%d')}.jsonl"
-        with log_file.open("a") as f:
-            f.write(json.dumps(finding) + "\n")
+        self.findings.add(finding)
+        self.log_writer.write("findings", finding)
 
         message = {
             "type": finding_type,
@@ -169,10 +194,9 @@ class GlitchAgent(BaseAgent):
         else:
             return "low"
 
-    def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute forensics command with enhanced logging and threat detection."""
+    def _begin_command(self, payload: Dict[str, Any]) -> None:
+        """Mode check and audit trail shared by ``run`` and ``run_async``."""
         command = payload.get("command")
-        args = payload.get("args", {})
         actor = payload.get("requested_by")
         self.mode = os.getenv("GLITCH_MODE", self.mode).lower()
 
@@ -183,108 +207,117 @@ class GlitchAgent(BaseAgent):
             "command_executed",
             {
                 "command": command,
-                "args": args,
+                "args": payload.get("args", {}),
                 "timestamp": datetime.now(timezone.utc).isoformat(),
                 "actor": actor,
             },
         )
         info("glitch.command", {"command": command, "actor": actor})
 
-        try:
-            if command == "hash_file":
-                return self._hash_file(args)
-
-            elif command == "scan_system":
-                return self._scan_system(args)
-
-            elif command == "detect_entropy":
-                return self._detect_entropy(args)
-
-            elif command == "sandbox_check":
-                return self._sandbox_check(args)
-
-            elif command == "network_probe":
-                return self._network_probe(args)
-
-            elif command == "deep_scan_file":
-                return self._deep_scan_file(args)
-
-            elif command == "scan_memory":
-                return self._scan_memory(args)
-
-            elif command == "detect_rootkit":
-                return self._detect_rootkit(args)
-
-            elif command == "analyze_logs":
-                return self._analyze_logs(args)
-
-            elif command == "check_integrity":
-                return self._check_integrity(args)
-
-            elif command == "deploy_honeypot":
-                return {
-                    "success": True,
-                    "output": self.deploy_honeypot(
-                        args.get("name", "honeypot"),
-                        args.get("path", "/tmp/glitch/honeypot.txt"),
-                        args.get("signature", "nova"),
-                    ),
-                    "error": None,
-                }
-
-            elif command == "honeypot_status":
-                return {"success": True, "output": self.honeypot_status(), "error": None}
-
-            elif command == "incident_report":
-                return {
-                    "success": True,
-                    "output": self.incident_report(int(args.get("limit", 50))),
-                    "error": None,
-                }
-
-            elif command == "threat_intelligence":
-                return self._threat_intelligence(args)
-
-            elif command == "vulnerability_scan":
-                return self._vulnerability_scan(args)
-
-            elif command == "malware_analysis":
-                return self._malware_analysis(args)
+    def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute forensics command with enhanced logging and threat detection."""
+        command = payload.get("command")
+        args = payload.get("args", {})
+        self._begin_command(payload)
 
-            elif command == "network_forensics":
-                return self._network_forensics(args)
+        try:
+            return self.dispatch_command(command, args)
 
-            elif command == "digital_forensics":
-                return self._digital_forensics(args)
+        except Exception as exc:
+            self.log_finding("command_error", {"command": command, "error": str(exc), "args": args})
+            return {"success": False, "output": None, "error": str(exc)}
 
-            elif command == "compliance_check":
-                return self._compliance_check(args)
+    async def run_async(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Async ``run``: process and network commands are awaited natively.
 
-            elif command == "security_audit":
-                return self._security_audit(args)
+        The audit trail is file I/O, so it is written from the default executor.
+        """
+        command = payload.get("command")
+        args = payload.get("args", {})
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._begin_command, payload)
 
-            elif command == "threat_hunting":
-                return self._threat_hunting(args)
+        try:
+            return await self.dispatch_command_async(command, args)
 
-            elif command == "dark_web_monitor":
-                return self._dark_web_monitor(args)
+        except Exception as exc:
+            details = {"command": command, "error": str(exc), "args": args}
+            await loop.run_in_executor(None, self.log_finding, "command_error", details)
+            return {"success": False, "output": None, "error": str(exc)}
 
-            elif command == "breach_detection":
-                return self._breach_detection(args)
+    @command(
+        "deploy_honeypot",
+        args={"name": str, "path": str, "signature": str},
+        cost="io",
+        restricted=True,
+    )
+    def _cmd_deploy_honeypot(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Deploy a honeypot file that triggers alerts on modification."""
+        return {
+            "success": True,
+            "output": self.deploy_honeypot(
+                args.get("name", "honeypot"),
+                args.get("path", "/tmp/glitch/honeypot.txt"),
+                args.get("signature", "nova"),
+            ),
+            "error": None,
+        }
 
-            elif command == "advanced_forensics":
-                from .advanced_forensics import AdvancedForensics
+    @command("honeypot_status", cost="io", idempotent=True)
+    def _cmd_honeypot_status(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Return live metadata for all deployed honeypots."""
+        return {"success": True, "output": self.honeypot_status(), "error": None}
+
+    @command(
+        "search",
+        args={
+            "since_hours": (int, float),
+            "type": str,
+            "threat_level": str,
+            "text": str,
+            "streams": list,
+            "limit": int,
+        },
+        cost="io",
+        idempotent=True,
+    )
+    def _cmd_search(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Search live and archived logs; archived segments are skipped by header."""
+        since_hours = args.get("since_hours")
+        since = time.time() - float(since_hours) * 3600 if since_hours is not None else None
+        limit = int(args.get("limit", 100))
+        matches = search_logs(
+            self.logs_dir,
+            since=since,
+            type_=args.get("type"),
+            threat_level=args.get("threat_level"),
+            text=args.get("text"),
+            streams=args.get("streams"),
+        )
+        results = list(islice(matches, limit))
+        output = {"results": results, "count": len(results), "truncated": len(results) == limit}
+        return {"success": True, "output": output, "error": None}
 
-                forensics = AdvancedForensics()
-                return forensics.run_forensics_operation(args.get("operation"), args)
+    @command("incident_report", args={"limit": int, "type": str, "threat_level": str})
+    def _cmd_incident_report(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarize recent findings and current threat posture."""
+        return {
+            "success": True,
+            "output": self.incident_report(
+                int(args.get("limit", 50)), args.get("type"), args.get("threat_level")
+            ),
+            "error": None,
+        }
 
-            else:
-                raise ValueError(f"unknown command '{command}'")
+    @command("advanced_forensics", args={"operation": str})
+    def _cmd_advanced_forensics(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Run an advanced forensics or OSINT operation."""
+        from .advanced_forensics import AdvancedForensics
 
-        except Exception as exc:
-            self.log_finding("command_error", {"command": command, "error": str(exc), "args": args})
-            return {"success": False, "output": None, "error": str(exc)}
+        forensics = AdvancedForensics()
+        return forensics.run_forensics_operation(args.get("operation"), args)
 
+    @command(args={"path": str}, cost="io", idempotent=True)
     def _hash_file(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Enhanced file hashing with additional forensic metadata."""
         path = Path(args.get("path", ""))
@@ -355,6 +388,7 @@ class GlitchAgent(BaseAgent):
         else:
             return "unknown"
 
+    @command(cost="io")
     def _scan_system(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Enhanced system scan with anomaly detection."""
         scan_id = f"sys_{int(time.time())}"
@@ -365,7 +399,6 @@ class GlitchAgent(BaseAgent):
             ps = subprocess.run(
                 ["ps", "-eo", "pid,ppid,comm,cmd"], capture_output=True, text=True, check=True
             )
-            processes = ps.stdout.strip().splitlines()[1:]
 
             # Disk usage
             disk = subprocess.run(["df", "-h", "/"], capture_output=True, text=True, check=True)
@@ -375,52 +408,87 @@ class GlitchAgent(BaseAgent):
                 netstat = subprocess.run(
                     ["netstat", "-tuln"], capture_output=True, text=True, check=True
                 )
-                network_connections = netstat.stdout.strip().splitlines()[2:]
+                netstat_out: Optional[str] = netstat.stdout
             except subprocess.CalledProcessError:
-                network_connections = []
+                netstat_out = None
 
-            # Memory usage
-            try:
-                with open("/proc/meminfo", "r") as f:
-                    meminfo = f.read()
-            except Exception:
-                meminfo = "unavailable"
+            return self._system_scan_result(scan_id, ps.stdout, disk.stdout, netstat_out)
 
-            # Check for anomalies
-            anomalies = []
+        finally:
+            self.active_scans.remove(scan_id)
 
-            # Suspicious processes
-            for proc in processes[:20]:  # Check first 20 processes
-                if any(
-                    suspicious in proc.lower()
-                    for suspicious in ['nc ', 'ncat', 'socat', '/tmp/', 'wget http', 'curl http']
-                ):
-                    anomalies.append(f"suspicious_process: {proc}")
+    @async_command("scan_system")
+    async def _scan_system_async(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the system scan's probes as concurrent subprocesses."""
+        scan_id = f"sys_{int(time.time())}"
+        self.active_scans.append(scan_id)
 
-            # High network activity
-            if len(network_connections) > 50:
-                anomalies.append(f"high_network_activity: {len(network_connections)} connections")
+        try:
+            ps_out, disk_out, netstat_out = await asyncio.gather(
+                _exec("ps", "-eo", "pid,ppid,comm,cmd"),
+                _exec("df", "-h", "/"),
+                _exec("netstat", "-tuln"),
+                return_exceptions=True,
+            )
+            for output in (ps_out, disk_out):
+                if isinstance(output, BaseException):
+                    raise output
+            if isinstance(netstat_out, BaseException):
+                netstat_out = None
+            # Reading /proc and logging findings block, so they stay off the event loop
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self._system_scan_result, scan_id, ps_out, disk_out, netstat_out
+            )
 
-            result = {
-                "scan_id": scan_id,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "processes": processes[:10],  # Top 10 processes
-                "disk_usage": disk.stdout.strip().splitlines()[1],
-                "network_connections": len(network_connections),
-                "memory_info": meminfo.split('\n')[:5],  # First 5 lines
-                "anomalies": anomalies,
-                "threat_indicators": self._check_threat_indicators(),
-            }
+        finally:
+            self.active_scans.remove(scan_id)
 
-            # Log anomalies
-            if anomalies:
-                self.log_finding("system_anomalies", {"scan_id": scan_id, "anomalies": anomalies})
+    def _system_scan_result(
+        self, scan_id: str, ps_out: str, disk_out: str, netstat_out: Optional[str]
+    ) -> Dict[str, Any]:
+        processes = ps_out.strip().splitlines()[1:]
+        network_connections = netstat_out.strip().splitlines()[2:] if netstat_out else []
 
-            self.last_scan_time = result["timestamp"]
-            return {"success": True, "output": result, "error": None}
+        # Memory usage
+        try:
+            with open("/proc/meminfo", "r") as f:
+                meminfo = f.read()
+        except Exception:
+            meminfo = "unavailable"
 
-        finally:
-            self.active_scans.remove(scan_id)
+        # Check for anomalies
+        anomalies = []
+
+        # Suspicious processes
+        for proc in processes[:20]:  # Check first 20 processes
+            if any(
+                suspicious in proc.lower()
+                for suspicious in ['nc ', 'ncat', 'socat', '/tmp/', 'wget http', 'curl http']
+            ):
+                anomalies.append(f"suspicious_process: {proc}")
+
+        # High network activity
+        if len(network_connections) > 50:
+            anomalies.append(f"high_network_activity: {len(network_connections)} connections")
+
+        result = {
+            "scan_id": scan_id,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "processes": processes[:10],  # Top 10 processes
+            "disk_usage": disk_out.strip().splitlines()[1],
+            "network_connections": len(network_connections),
+            "memory_info": meminfo.split('\n')[:5],  # First 5 lines
+            "anomalies": anomalies,
+            "threat_indicators": self._check_threat_indicators(),
+        }
+
+        # Log anomalies
+        if anomalies:
+            self.log_finding("system_anomalies", {"scan_id": scan_id, "anomalies": anomalies})
+
+        self.last_scan_time = result["timestamp"]
+        return {"success": True, "output": result, "error": None}
 
     def _check_threat_indicators(self) -> List[str]:
         """Check for common threat indicators."""
@@ -442,6 +510,7 @@ class GlitchAgent(BaseAgent):
 
         return indicators
 
+    @command(args={"path": str}, idempotent=True)
     def _detect_entropy(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Enhanced entropy detection with threat assessment."""
         path = Path(args.get("path", ""))
@@ -486,6 +555,7 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": analysis, "error": None}
 
+    @command(idempotent=True)
     def _sandbox_check(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Enhanced sandbox/VM detection."""
         indicators: Dict[str, Any] = {}
@@ -560,10 +630,11 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": result, "error": None}
 
+    @command(args={"host": str, "ports": list, "timeout": (int, float)}, cost="net")
     def _network_probe(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Enhanced network probing with threat detection."""
         host = args.get("host", "127.0.0.1")
-        ports: List[int] = args.get("ports", [22, 80, 443, 8080, 3389, 5432, 3306, 1433])
+        ports: List[int] = args.get("ports", DEFAULT_PROBE_PORTS)
         timeout = args.get("timeout", 0.5)
 
         open_ports: List[int] = []
@@ -587,6 +658,40 @@ class GlitchAgent(BaseAgent):
             except Exception:
                 continue
 
+        return self._network_probe_result(host, ports, open_ports, service_info)
+
+    @async_command("network_probe")
+    async def _network_probe_async(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Probe all ports concurrently instead of one connect timeout after another."""
+        host = args.get("host", "127.0.0.1")
+        ports: List[int] = args.get("ports", DEFAULT_PROBE_PORTS)
+        timeout = float(args.get("timeout", 0.5))
+        limit = asyncio.Semaphore(PROBE_CONCURRENCY)
+
+        async def probe(port: int) -> Optional[str]:
+            async with limit:
+                try:
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(host, port), timeout
+                    )
+                except Exception:
+                    return None
+                try:
+                    data = await asyncio.wait_for(reader.read(1024), 1.0)
+                    banner = data.decode('utf-8', errors='ignore')[:200]
+                except Exception:
+                    banner = ""
+                writer.close()
+                return banner.strip()
+
+        banners = await asyncio.gather(*(probe(port) for port in ports))
+        open_ports = [port for port, banner in zip(ports, banners) if banner is not None]
+        service_info = {port: banner for port, banner in zip(ports, banners) if banner}
+        return self._network_probe_result(host, ports, open_ports, service_info)
+
+    def _network_probe_result(
+        self, host: str, ports: List[int], open_ports: List[int], service_info: Dict[int, str]
+    ) -> Dict[str, Any]:
         # Analyze for suspicious services
         suspicious_services = []
         for port, banner in service_info.items():
@@ -617,6 +722,7 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": result, "error": None}
 
+    @command(args={"path": str}, restricted=True)
     def _deep_scan_file(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Deep forensic analysis of a file."""
         path = Path(args.get("path", ""))
@@ -753,6 +859,7 @@ class GlitchAgent(BaseAgent):
 
         return patterns
 
+    @command(restricted=True)
     def _scan_memory(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Memory scanning for suspicious processes and artifacts."""
         try:
@@ -769,7 +876,17 @@ class GlitchAgent(BaseAgent):
             suspicious_processes = []
             high_memory_processes = []
 
-            for proc_line in processes:
+            reported = 0
+            for index, proc_line in enumerate(processes, 1):
+                if index % PROGRESS_EVERY == 0:
+                    report_progress(
+                        {
+                            "processes_analyzed": index,
+                            "total": len(processes),
+                            "suspicious_processes": suspicious_processes[reported:],
+                        }
+                    )
+                    reported = len(suspicious_processes)
                 parts = proc_line.split()
                 if len(parts) >= 7:
                     pid, ppid, comm, mem_percent = parts[0], parts[1], parts[2], parts[4]
@@ -820,6 +937,7 @@ class GlitchAgent(BaseAgent):
         except Exception as e:
             return {"success": False, "output": None, "error": str(e)}
 
+    @command(cost="io", restricted=True)
     def _detect_rootkit(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Detect rootkit indicators and system tampering."""
         indicators = []
@@ -891,6 +1009,7 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": result, "error": None}
 
+    @command(args={"paths": list}, cost="io")
     def _analyze_logs(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze system logs for tampering and suspicious activity."""
         log_paths = args.get("paths", ["/var/log/syslog", "/var/log/auth.log", "/var/log/kern.log"])
@@ -1010,13 +1129,15 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": result, "error": None}
 
+    @command(args={"paths": list}, cost="io", restricted=True)
     def _check_integrity(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Check file system integrity and detect tampering."""
         paths_to_check = args.get("paths", ["/bin", "/usr/bin", "/sbin", "/usr/sbin"])
 
         integrity_results = []
 
-        for base_path in paths_to_check:
+        for index, base_path in enumerate(paths_to_check, 1):
+            reported = len(integrity_results)
             try:
                 path = Path(base_path)
                 if not path.exists() or not path.is_dir():
@@ -1061,6 +1182,14 @@ class GlitchAgent(BaseAgent):
 
             except Exception as e:
                 integrity_results.append({"path": base_path, "error": str(e)})
+            finally:
+                report_progress(
+                    {
+                        "paths_done": index,
+                        "total": len(paths_to_check),
+                        "results": integrity_results[reported:],
+                    }
+                )
 
         # Calculate overall integrity score
         total_modified = sum(
@@ -1091,6 +1220,7 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": result, "error": None}
 
+    @command(args={"target": str, "type": str}, cost="net")
     def _threat_intelligence(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze threat intelligence data and IOCs."""
         target = args.get("target", "")
@@ -1120,6 +1250,7 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": intel_data, "error": None}
 
+    @command(args={"target": str, "type": str}, cost="net")
     def _vulnerability_scan(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Perform comprehensive vulnerability assessment."""
         target = args.get("target", "localhost")
@@ -1173,6 +1304,7 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": result, "error": None}
 
+    @command(args={"path": str, "type": str})
     def _malware_analysis(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Advanced malware analysis and classification."""
         file_path = args.get("path", "")
@@ -1221,6 +1353,7 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": analysis, "error": None}
 
+    @command(args={"interface": str, "duration": (int, float)}, cost="net")
     def _network_forensics(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze network traffic for forensic evidence."""
         interface = args.get("interface", "eth0")
@@ -1268,6 +1401,7 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": network_analysis, "error": None}
 
+    @command(args={"path": str, "type": str}, cost="io")
     def _digital_forensics(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Comprehensive digital forensics investigation."""
         target_path = args.get("path", "/")
@@ -1310,6 +1444,7 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": forensics_data, "error": None}
 
+    @command(args={"framework": str, "scope": str})
     def _compliance_check(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Verify compliance with security standards."""
         framework = args.get("framework", "iso27001")
@@ -1373,6 +1508,7 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": result, "error": None}
 
+    @command(args={"scope": str, "remediation": bool})
     def _security_audit(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Comprehensive security audit of systems and processes."""
         audit_scope = args.get("scope", "full")
@@ -1449,6 +1585,7 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": result, "error": None}
 
+    @command(args={"type": str, "timeframe": str})
     def _threat_hunting(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Proactive threat hunting operations."""
         hunt_type = args.get("type", "general")
@@ -1530,6 +1667,7 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": hunt_results, "error": None}
 
+    @command(args={"keywords": list, "duration": str}, cost="net")
     def _dark_web_monitor(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Monitor dark web for intelligence and threats."""
         keywords = args.get("keywords", ["company", "breach", "data"])
@@ -1592,6 +1730,7 @@ class GlitchAgent(BaseAgent):
 
         return {"success": True, "output": monitoring_results, "error": None}
 
+    @command(args={"scope": str, "sensitivity": str}, cost="net")
     def _breach_detection(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Advanced breach detection and analysis."""
         detection_scope = args.get("scope", "network")
@@ -0,0 +1,263 @@
+"""Compressed archives of Glitch's daily logs, and search across them.
+
+Once a day file is no longer being written to (its date is at least
+``GLITCH_LOG_ARCHIVE_AFTER_DAYS`` days old; 0 disables archiving), it is moved
+into ``<logs>/archive/`` as a compressed segment. Segments use zstd when the
+``zstandard`` package is installed and gzip otherwise.
+
+The first line of every segment is a header::
+
+    {"_segment": {"file": ..., "stream": "events", "first": ts, "last": ts,
+                  "entries": n, "types": {...}, "threat_levels": {...}, ...}}
+
+The header is also appended to ``archive/manifest.jsonl``. :func:`search` reads
+only the manifest to decide which segments can match, then decompresses the
+candidates as a stream, line by line.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import zstandard
+except ModuleNotFoundError:  # pragma: no cover - optional codec
+    zstandard = None  # type: ignore[assignment]
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("GLITCH_LOG_ARCHIVE_AFTER_DAYS", "1"))
+ARCHIVE_DIR = "archive"
+MANIFEST = "manifest.jsonl"
+
+_DAY_FILE = re.compile(r"^(?P<stream>[a-z]+)_(?P<day>\d{4}-\d{2}-\d{2})(\.\d{3})?\.jsonl$")
+_lock = threading.Lock()
+
+
+def entry_type(entry: Dict[str, Any]) -> Optional[str]:
+    for key in ("event_type", "finding_type", "type", "action"):
+        if entry.get(key):
+            return str(entry[key])
+    return None
+
+
+def entry_threat_level(entry: Dict[str, Any]) -> Optional[str]:
+    level = entry.get("threat_level")
+    if level is None and isinstance(entry.get("data"), dict):
+        level = entry["data"].get("threat_level")
+    return str(level).lower() if level else None
+
+
+def _open_writer(path: Path) -> IO[bytes]:
+    if path.suffix == ".zst":
+        return zstandard.ZstdCompressor(level=10).stream_writer(path.open("wb"), closefd=True)
+    return gzip.open(path, "wb", compresslevel=6)
+
+
+def _open_reader(path: Path) -> IO[bytes]:
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is required to read {path.name}")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(path.open("rb")))
+    return gzip.open(path, "rb")
+
+
+def archive_file(path: Path, archive_dir: Path) -> Dict[str, Any]:
+    """Compress one day file into a segment with a header; returns the header."""
+    header: Dict[str, Any] = {
+        "file": path.name,
+        "stream": _DAY_FILE.match(path.name).group("stream"),
+        "first": None,
+        "last": None,
+        "entries": 0,
+        "types": {},
+        "threat_levels": {},
+        "bytes": path.stat().st_size,
+    }
+    with path.open("rb") as fh:
+        for line in fh:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(entry, dict):
+                continue
+            header["entries"] += 1
+            timestamp = entry.get("timestamp")
+            if timestamp:
+                if header["first"] is None or timestamp < header["first"]:
+                    header["first"] = timestamp
+                if header["last"] is None or timestamp > header["last"]:
+                    header["last"] = timestamp
+            kind = entry_type(entry)
+            if kind:
+                header["types"][kind] = header["types"].get(kind, 0) + 1
+            level = entry_threat_level(entry)
+            if level:
+                header["threat_levels"][level] = header["threat_levels"].get(level, 0) + 1
+
+    suffix = ".zst" if zstandard is not None else ".gz"
+    segment = archive_dir / (path.name + suffix)
+    header["segment"] = segment.name
+    header["codec"] = "zstd" if suffix == ".zst" else "gzip"
+    tmp = segment.with_name(segment.name + ".tmp")
+    with path.open("rb") as src, _open_writer(tmp) as out:
+        out.write(json.dumps({"_segment": header}).encode("utf-8") + b"\n")
+        for chunk in iter(lambda: src.read(1 << 20), b""):
+            out.write(chunk)
+    os.replace(tmp, segment)
+    return header
+
+
+def archive_logs(
+    directory: Path,
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    today: Optional[str] = None,
+    skip: Iterable[Path] = (),
+) -> List[Dict[str, Any]]:
+    """Archive every day file dated ``older_than_days`` or more before ``today``.
+
+    Files named in ``skip`` (e.g. ones a writer still has open) are left alone.
+    """
+    if older_than_days <= 0:
+        return []
+    skipped = {Path(path).name for path in skip}
+    directory = Path(directory)
+    archive_dir = directory / ARCHIVE_DIR
+    today_date = datetime.strptime(today, "%Y-%m-%d") if today else datetime.now()
+    cutoff = (today_date - timedelta(days=older_than_days - 1)).strftime("%Y-%m-%d")
+    headers = []
+    with _lock:
+        for path in sorted(directory.glob("*_*.jsonl")):
+            match = _DAY_FILE.match(path.name)
+            if not match or match.group("day") >= cutoff or path.name in skipped:
+                continue
+            archive_dir.mkdir(exist_ok=True)
+            header = archive_file(path, archive_dir)
+            with (archive_dir / MANIFEST).open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(header) + "\n")
+            path.unlink()
+            path.with_name(path.name + ".idx").unlink(missing_ok=True)
+            headers.append(header)
+    return headers
+
+
+def segment_headers(directory: Path) -> List[Dict[str, Any]]:
+    """Headers of all archived segments, from the manifest or the segments themselves."""
+    archive_dir = Path(directory) / ARCHIVE_DIR
+    headers: Dict[str, Dict[str, Any]] = {}
+    manifest = archive_dir / MANIFEST
+    if manifest.exists():
+        for line in manifest.read_text(encoding="utf-8").splitlines():
+            try:
+                header = json.loads(line)
+            except ValueError:
+                continue
+            headers[header["segment"]] = header
+    if not archive_dir.exists():
+        return []
+    for segment in archive_dir.glob("*.jsonl.*"):
+        if segment.name in headers or segment.suffix not in (".gz", ".zst"):
+            continue
+        try:
+            with _open_reader(segment) as fh:
+                headers[segment.name] = json.loads(fh.readline())["_segment"]
+        except (OSError, ValueError, KeyError, RuntimeError):
+            continue
+    present = {segment.name for segment in archive_dir.glob("*.jsonl.*")}
+    return [header for name, header in headers.items() if name in present]
+
+
+def segment_lines(path: Path) -> Iterator[bytes]:
+    """Lines of an archived segment in write order, without its header."""
+    with _open_reader(path) as fh:
+        fh.readline()
+        yield from fh
+
+
+def _iso(epoch: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat() if epoch is not None else None
+
+
+def _header_matches(
+    header: Dict[str, Any],
+    streams: Optional[Iterable[str]],
+    since: Optional[str],
+    until: Optional[str],
+    type_: Optional[str],
+    threat_level: Optional[str],
+) -> bool:
+    if streams and header.get("stream") not in streams:
+        return False
+    if since and header.get("last") and header["last"] < since:
+        return False
+    if until and header.get("first") and header["first"] > until:
+        return False
+    if type_ and type_ not in header.get("types", {}):
+        return False
+    if threat_level and threat_level.lower() not in header.get("threat_levels", {}):
+        return False
+    return True
+
+
+def search(
+    directory: Path,
+    *,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    type_: Optional[str] = None,
+    threat_level: Optional[str] = None,
+    text: Optional[str] = None,
+    streams: Optional[Iterable[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream matching entries from live logs and archived segments.
+
+    Files are visited newest first; entries within a file come in write order.
+    ``since``/``until`` are epoch seconds; ``text`` is a raw substring match.
+    """
+    directory = Path(directory)
+    streams = set(streams) if streams else None
+    lo, hi = _iso(since), _iso(until)
+    needle = text.encode("utf-8") if text else None
+
+    sources: List[tuple] = []
+    for path in directory.glob("*_*.jsonl"):
+        match = _DAY_FILE.match(path.name)
+        if match and (not streams or match.group("stream") in streams):
+            sources.append((path.name, path, False))
+    for header in segment_headers(directory):
+        if _header_matches(header, streams, lo, hi, type_, threat_level):
+            sources.append((header["file"], directory / ARCHIVE_DIR / header["segment"], True))
+    sources.sort(key=lambda source: source[0], reverse=True)
+
+    for _, path, archived in sources:
+        try:
+            fh = _open_reader(path) if archived else path.open("rb")
+        except (OSError, RuntimeError):
+            continue
+        with fh:
+            if archived:
+                fh.readline()  # header
+            for line in fh:
+                if needle is not None and needle not in line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(entry, dict):
+                    continue
+                timestamp = str(entry.get("timestamp", ""))
+                if (lo and timestamp < lo) or (hi and timestamp > hi):
+                    continue
+                if type_ and entry_type(entry) != type_:
+                    continue
+                if threat_level and entry_threat_level(entry) != threat_level.lower():
+                    continue
+                yield entry
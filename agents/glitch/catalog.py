@@ -0,0 +1,218 @@
+"""Catalog of saved Glitch scan reports.
+
+Every report saved by :class:`~agents.glitch.reports.ReportManager` gets a row
+in ``<reports>/catalog.db`` (SQLite, WAL journal). The row holds the report id,
+its timestamp, the finding totals per threat level, the risk score, the status
+and the report's path. Listing and filtering are indexed queries over the
+catalog and never open a report body.
+
+The first time a catalog is opened over a reports directory that already holds
+reports, it is filled once from those files (see
+:meth:`ReportCatalog.backfill`).
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from agents.glitch.findings import _epoch
+
+LEVELS = ("critical", "high", "medium", "low")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    report_id TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    generated_at TEXT,
+    total_findings INTEGER NOT NULL,
+    critical INTEGER NOT NULL,
+    high INTEGER NOT NULL,
+    medium INTEGER NOT NULL,
+    low INTEGER NOT NULL,
+    risk_score INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    report_type TEXT,
+    file_path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reports_ts ON reports (ts);
+CREATE INDEX IF NOT EXISTS idx_reports_status_ts ON reports (status, ts);
+CREATE INDEX IF NOT EXISTS idx_reports_risk_ts ON reports (risk_score, ts);
+"""
+
+_COLUMNS = (
+    "report_id",
+    "generated_at",
+    "total_findings",
+    "critical",
+    "high",
+    "medium",
+    "low",
+    "risk_score",
+    "status",
+    "report_type",
+    "file_path",
+)
+
+
+def catalog_row(report: Dict[str, Any], path: Path) -> Dict[str, Any]:
+    """The catalog columns for one report document saved at ``path``."""
+    summary = report.get("summary") or {}
+    levels = summary.get("threat_levels") or {}
+    return {
+        "report_id": str(report.get("report_id") or path.name.rsplit("_report", 1)[0]),
+        "ts": _epoch(report.get("generated_at")),
+        "generated_at": report.get("generated_at"),
+        "total_findings": int(summary.get("total_findings", 0)),
+        **{level: int(levels.get(level, 0)) for level in LEVELS},
+        "risk_score": int(summary.get("risk_score", 0)),
+        "status": str(summary.get("status", "unknown")),
+        "report_type": report.get("report_type"),
+        "file_path": str(path),
+    }
+
+
+def _entry(row: tuple) -> Dict[str, Any]:
+    entry = dict(zip(_COLUMNS, row))
+    entry["threat_levels"] = {level: entry.pop(level) for level in LEVELS}
+    return entry
+
+
+class ReportCatalog:
+    """Indexed summary rows for saved reports."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add(self, report: Dict[str, Any], path: Path) -> Dict[str, Any]:
+        """Record (or replace) the catalog row for a saved report."""
+        row = catalog_row(report, Path(path))
+        names = ", ".join(row)
+        marks = ", ".join("?" for _ in row)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO reports ({names}) VALUES ({marks})", list(row.values())
+            )
+        return row
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def backfill(self, reports_dir: Path) -> int:
+        """Catalog report files under ``reports_dir`` that have no row yet."""
+        with self._lock:
+            known = {path for (path,) in self._conn.execute("SELECT file_path FROM reports")}
+        added = 0
+        for report_file in Path(reports_dir).rglob("*_report.json"):
+            if str(report_file) in known:
+                continue
+            try:
+                with report_file.open() as f:
+                    report = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(report, dict):
+                self.add(report, report_file)
+                added += 1
+        return added
+
+    def _where(
+        self, since: Optional[float], status: Optional[str], min_risk_score: Optional[int]
+    ):
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if min_risk_score is not None:
+            clauses.append("risk_score >= ?")
+            params.append(min_risk_score)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(
+        self,
+        limit: Optional[int] = 50,
+        offset: int = 0,
+        *,
+        since: Optional[float] = None,
+        status: Optional[str] = None,
+        min_risk_score: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Newest reports first, optionally filtered by epoch ``since``, status and risk."""
+        where, params = self._where(since, status, min_risk_score)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM reports{where} ORDER BY ts DESC, rowid DESC"
+        sql += " LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, max(offset, 0)]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_entry(row) for row in rows]
+
+    def stream(
+        self,
+        *,
+        since: Optional[float] = None,
+        status: Optional[str] = None,
+        min_risk_score: Optional[int] = None,
+        batch: int = 500,
+    ) -> Iterator[Dict[str, Any]]:
+        """Like :meth:`query` without a limit, fetched ``batch`` rows at a time."""
+        where, params = self._where(since, status, min_risk_score)
+        where += (" AND " if where else " WHERE ") + "(ts < ? OR (ts = ? AND rowid < ?))"
+        sql = (
+            f"SELECT {', '.join(_COLUMNS)}, ts, rowid FROM reports{where} "
+            "ORDER BY ts DESC, rowid DESC LIMIT ?"
+        )
+        last_ts, last_rowid = float("inf"), float("inf")
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    sql, params + [last_ts, last_ts, last_rowid, batch]
+                ).fetchall()
+            for row in rows:
+                yield _entry(row)
+            if len(rows) < batch:
+                return
+            last_ts, last_rowid = rows[-1][-2:]
+
+    def count(
+        self,
+        *,
+        since: Optional[float] = None,
+        status: Optional[str] = None,
+        min_risk_score: Optional[int] = None,
+    ) -> int:
+        where, params = self._where(since, status, min_risk_score)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM reports{where}", params).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_catalogs: Dict[Path, ReportCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_report_catalog(path: Path) -> ReportCatalog:
+    """Process-wide catalog for ``path``; closed at exit."""
+    key = Path(path).resolve()
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = ReportCatalog(path)
+            atexit.register(catalog.close)
+        return catalog
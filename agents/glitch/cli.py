@@ -7,7 +7,10 @@ This CLI provides the interface described in the Sovereign Standard requirements
 - glitch diagnose <target> → deep scan on file, folder, or app
 - glitch chat → interactive terminal chat with Glitch agent
 - glitch honeypot deploy → deploys stealth trap
+- glitch honeypot watch → streams trap triggers as they happen
+- glitch honeypot listen → serves network traps from the built-in listener
 - glitch logs → opens interactive report dashboard
+- glitch search → searches live and archived logs
 - glitch help → shows available commands
 """
 
@@ -16,6 +19,7 @@ import asyncio
 import json
 import sys
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
@@ -187,6 +191,53 @@ class GlitchCLI:
         except Exception as e:
             return {"error": str(e)}
     
+    def watch_honeypots(self) -> None:
+        """Print honeypot triggers as they are detected until interrupted."""
+        if not self.honeypot:
+            print("[GLITCH] Honeypot manager not available")
+            return
+        
+        def report(trigger: Dict[str, Any]) -> None:
+            if self.logger:
+                self.logger.log("honeypot.triggered", trigger)
+            print(json.dumps(trigger), flush=True)
+        
+        self.honeypot.subscribe(report)
+        backend = self.honeypot.start_watching()
+        print(f"[GLITCH] Watching {self.honeypot.get_active_count()} honeypots ({backend})...")
+        try:
+            threading.Event().wait()
+        finally:
+            self.honeypot.stop_watching()
+    
+    def listen_honeypots(self, tcp_ports: Optional[list] = None,
+                         udp_ports: Optional[list] = None) -> None:
+        """Serve network traps in-process and print contacts until interrupted."""
+        if not self.honeypot:
+            print("[GLITCH] Honeypot manager not available")
+            return
+        
+        self.honeypot.subscribe(lambda trigger: print(json.dumps(trigger), flush=True))
+        stats = self.honeypot.start_network_listener(tcp_ports, udp_ports, logger=self.logger)
+        print(f"[GLITCH] Listening on {', '.join(stats['listening']) or 'no ports'}...")
+        try:
+            threading.Event().wait()
+        finally:
+            self.honeypot.stop_network_listener()
+    
+    def search(self, since_hours: Optional[float] = None, type_: Optional[str] = None,
+               threat_level: Optional[str] = None, text: Optional[str] = None,
+               streams: Optional[list] = None, limit: int = 100):
+        """Stream matching entries from live and archived logs."""
+        from itertools import islice
+        from agents.glitch.archive import search
+
+        since = datetime.now().timestamp() - since_hours * 3600 if since_hours else None
+        logs_dir = self.logger.logs_dir if self.logger else Path("/tmp/glitch/logs")
+        matches = search(logs_dir, since=since, type_=type_, threat_level=threat_level,
+                         text=text, streams=streams)
+        return islice(matches, limit)
+    
     def show_logs(self):
         """Open interactive report dashboard.""" 
         if not self.reports:
@@ -223,11 +274,25 @@ def main():
     
     # glitch honeypot
     honeypot_parser = subparsers.add_parser("honeypot", help="Honeypot operations")
-    honeypot_parser.add_argument("action", choices=["deploy"], help="Honeypot action")
+    honeypot_parser.add_argument("action", choices=["deploy", "watch", "listen"],
+                                 help="Honeypot action")
+    honeypot_parser.add_argument("--port", type=int, action="append",
+                                 help="Extra TCP port for listen (repeatable)")
+    honeypot_parser.add_argument("--udp", type=int, action="append",
+                                 help="UDP port for listen (repeatable)")
     
     # glitch logs
     subparsers.add_parser("logs", help="View reports dashboard")
     
+    # glitch search
+    search_parser = subparsers.add_parser("search", help="Search live and archived logs")
+    search_parser.add_argument("text", nargs="?", help="Substring to look for")
+    search_parser.add_argument("--since", type=float, help="Only the last N hours")
+    search_parser.add_argument("--type", help="Event, finding or audit action type")
+    search_parser.add_argument("--level", help="Threat level")
+    search_parser.add_argument("--stream", action="append", choices=["events", "findings", "audit"])
+    search_parser.add_argument("--limit", type=int, default=100)
+    
     # glitch help
     subparsers.add_parser("help", help="Show this help message")
     
@@ -258,9 +323,20 @@ def main():
             result = cli.deploy_honeypot()
             print(json.dumps(result, indent=2))
         
+        elif args.command == "honeypot" and args.action == "watch":
+            cli.watch_honeypots()
+        
+        elif args.command == "honeypot" and args.action == "listen":
+            cli.listen_honeypots(args.port, args.udp)
+        
         elif args.command == "logs":
             cli.show_logs()
         
+        elif args.command == "search":
+            for entry in cli.search(args.since, args.type, args.level, args.text,
+                                    args.stream, args.limit):
+                print(json.dumps(entry))
+        
         elif args.command == "help":
             parser.print_help()
         
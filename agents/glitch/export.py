@@ -0,0 +1,169 @@
+"""Streaming exports of Glitch findings, reports and logs.
+
+Exports are built as generators of byte chunks. Rows are pulled lazily from an
+iterator (for example :meth:`FindingsStore.stream`), encoded one at a time as
+CSV, a JSON array or NDJSON, and optionally compressed on the fly with gzip, or
+with zstd when ``zstandard`` is installed. Memory use stays flat however large
+the export is.
+
+The chunks can be written to a file (:func:`write_export`) or read through a
+file object (:func:`open_stream`), which returns data as soon as the first row
+is encoded.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+try:
+    import zstandard
+except ModuleNotFoundError:  # pragma: no cover - optional codec
+    zstandard = None  # type: ignore[assignment]
+
+FORMATS = ("csv", "json", "ndjson")
+CODECS = ("gzip", "zstd")
+
+_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def _dumps(item: Any) -> bytes:
+    return json.dumps(item, default=str).encode("utf-8")
+
+
+def _cell(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return json.dumps(value, default=str)
+
+
+def encode_csv(rows: Iterable[Dict[str, Any]], columns: Sequence[str]) -> Iterator[bytes]:
+    """A header line, then one CSV line per row; nested values are written as JSON."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_cell(row.get(column)) for column in columns])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def encode_json(
+    items: Iterable[Any], header: Optional[Dict[str, Any]] = None, key: str = "items"
+) -> Iterator[bytes]:
+    """A JSON array written element by element.
+
+    With ``header``, the array becomes the ``key`` member of an object that
+    starts with the header's fields.
+    """
+    if header is None:
+        opening, closing = b"[", b"\n]\n"
+    else:
+        fields = _dumps(header)[1:-1]
+        opening = b"{" + fields + (b", " if fields else b"") + _dumps(key) + b": ["
+        closing = b"\n]}\n"
+    yield opening
+    separator = b"\n"
+    for item in items:
+        yield separator + _dumps(item)
+        separator = b",\n"
+    yield closing
+
+
+def encode_ndjson(items: Iterable[Any]) -> Iterator[bytes]:
+    for item in items:
+        yield _dumps(item) + b"\n"
+
+
+def encode(
+    items: Iterable[Dict[str, Any]], fmt: str, columns: Optional[Sequence[str]] = None
+) -> Iterator[bytes]:
+    if fmt == "csv":
+        if not columns:
+            raise ValueError("CSV exports need columns")
+        return encode_csv(items, columns)
+    if fmt == "json":
+        return encode_json(items)
+    if fmt == "ndjson":
+        return encode_ndjson(items)
+    raise ValueError(f"Unknown export format '{fmt}' (expected one of {', '.join(FORMATS)})")
+
+
+def compress(chunks: Iterable[bytes], codec: Optional[str]) -> Iterator[bytes]:
+    """Compress a chunk stream incrementally; ``codec`` None passes it through."""
+    if codec is None:
+        yield from chunks
+        return
+    if codec == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    elif codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required for zstd exports")
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    else:
+        raise ValueError(f"Unknown codec '{codec}' (expected one of {', '.join(CODECS)})")
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def suffix(fmt: str, codec: Optional[str] = None) -> str:
+    """File extension for an export, e.g. ``.csv.gz``."""
+    return f".{fmt}" + (_EXTENSIONS[codec] if codec else "")
+
+
+def write_export(chunks: Iterable[bytes], path: Path) -> Path:
+    """Write chunks to ``path`` through a ``.part`` file renamed into place when done."""
+    path = Path(path)
+    partial = path.with_name(path.name + ".part")
+    try:
+        with partial.open("wb") as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+        os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
+    return path
+
+
+class ChunkReader(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._leftover = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # noqa: ANN001 - any writable buffer
+        while not self._leftover:
+            try:
+                self._leftover = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._leftover))
+        buffer[:size] = self._leftover[:size]
+        self._leftover = self._leftover[size:]
+        return size
+
+    def close(self) -> None:
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+        super().close()
+
+
+def open_stream(chunks: Iterable[bytes], buffer_size: int = 64 * 1024) -> io.BufferedReader:
+    """Buffered file object that produces the export as it is read."""
+    return io.BufferedReader(ChunkReader(chunks), buffer_size)
+
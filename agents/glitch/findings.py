@@ -0,0 +1,343 @@
+"""SQLite-backed findings store for Glitch.
+
+Findings are kept in ``findings.db`` (WAL journal) with indexes on timestamp,
+type and threat level, so report queries read only the rows they return. Writes
+are batched: :meth:`FindingsStore.add` queues the finding and a background thread
+commits the queue every ``GLITCH_FINDINGS_FLUSH_SECONDS`` or once
+``GLITCH_FINDINGS_BATCH`` findings are waiting. The newest
+``GLITCH_FINDINGS_RING`` findings are also held in memory and answer unfiltered
+"latest N" queries without touching the database.
+
+Both finding shapes used by Glitch are accepted: the agent's (``type``) and
+:class:`~agents.glitch.logging.GlitchLogger`'s (``finding_type`` + ``finding_id``).
+
+The first time a store is opened with an empty table, it is filled once from the
+daily ``findings_*.jsonl`` logs that predate it, live and archived (see
+:meth:`FindingsStore.backfill`).
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from agents.glitch.archive import search
+
+RING_SIZE = int(os.getenv("GLITCH_FINDINGS_RING", "1000"))
+BATCH = int(os.getenv("GLITCH_FINDINGS_BATCH", "100"))
+FLUSH_SECONDS = float(os.getenv("GLITCH_FINDINGS_FLUSH_SECONDS", "1.0"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS findings (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    type TEXT NOT NULL,
+    threat_level TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_findings_ts ON findings (ts);
+CREATE INDEX IF NOT EXISTS idx_findings_type_ts ON findings (type, ts);
+CREATE INDEX IF NOT EXISTS idx_findings_level_ts ON findings (threat_level, ts);
+"""
+
+Row = Tuple[str, float, str, str, str]
+
+
+def finding_type(finding: Dict[str, Any]) -> str:
+    return str(finding.get("type") or finding.get("finding_type") or "unknown")
+
+
+def _epoch(timestamp: Any) -> float:
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    try:
+        parsed = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+    except ValueError:
+        return datetime.now(timezone.utc).timestamp()
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _row(finding: Dict[str, Any]) -> Row:
+    return (
+        str(finding.get("finding_id") or finding.get("hash") or uuid.uuid4().hex),
+        _epoch(finding.get("timestamp")),
+        finding_type(finding),
+        str(finding.get("threat_level") or "low").lower(),
+        json.dumps(finding, default=str),
+    )
+
+
+class FindingsStore:
+    """Indexed, batched findings table with an in-memory hot tail."""
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        ring_size: int = RING_SIZE,
+        batch: int = BATCH,
+        flush_seconds: float = FLUSH_SECONDS,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch = batch
+        self.flush_seconds = flush_seconds
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._pending: List[Row] = []
+        self._ring: Deque[Dict[str, Any]] = deque(maxlen=ring_size)
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._stats_path = self.path.with_name(self.path.name + ".stats.json")
+        self._stats = self._load_stats()
+        self._load_ring()
+
+    def _load_ring(self) -> None:
+        rows = self._conn.execute(
+            "SELECT body FROM findings ORDER BY ts DESC, seq DESC LIMIT ?", (self._ring.maxlen,)
+        ).fetchall()
+        self._ring.clear()
+        self._ring.extend(json.loads(body) for (body,) in reversed(rows))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self.flush()
+            return self._conn.execute("SELECT COUNT(*) FROM findings").fetchone()[0]
+
+    # -- writing ------------------------------------------------------
+    def add(self, finding: Dict[str, Any]) -> None:
+        row = _row(finding)
+        with self._lock:
+            self._ring.append(finding)
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch
+        if full:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if pending:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO findings (id, ts, type, threat_level, body) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        pending,
+                    )
+        return len(pending)
+
+    def backfill(self, logs_dir: Path) -> int:
+        """Import the findings recorded in ``logs_dir``'s daily findings logs.
+
+        Live and archived ``findings_*.jsonl`` days are read as a stream. Entries
+        written by :meth:`GlitchLogger.log` (``event_type``) only point at a
+        finding and are skipped.
+        """
+        added = 0
+        for entry in search(logs_dir, streams=["findings"]):
+            if "event_type" in entry or not ("type" in entry or "finding_type" in entry):
+                continue
+            with self._lock:
+                self._pending.append(_row(entry))
+                full = len(self._pending) >= self.batch
+            if full:
+                self.flush()
+            added += 1
+        with self._lock:
+            self.flush()
+            self._load_ring()
+        return added
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="glitch-findings-flush", daemon=True
+                )
+                self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                continue
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    # -- reading ------------------------------------------------------
+    def tail(self) -> List[Dict[str, Any]]:
+        """The in-memory hot tail, oldest first."""
+        with self._lock:
+            return list(self._ring)
+
+    def _where(
+        self, since: Optional[float], type_: Optional[str], threat_level: Optional[str]
+    ) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if type_:
+            clauses.append("type = ?")
+            params.append(type_)
+        if threat_level:
+            clauses.append("threat_level = ?")
+            params.append(threat_level.lower())
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def recent(
+        self,
+        limit: Optional[int] = 50,
+        *,
+        since: Optional[float] = None,
+        type_: Optional[str] = None,
+        threat_level: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Newest findings first, optionally filtered by epoch ``since``, type and level."""
+        with self._lock:
+            filtered = since is not None or type_ or threat_level
+            if not filtered and limit is not None and limit <= len(self._ring):
+                return list(islice(reversed(self._ring), max(limit, 0)))
+            self.flush()
+            where, params = self._where(since, type_, threat_level)
+            sql = f"SELECT body FROM findings{where} ORDER BY ts DESC, seq DESC"
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(limit)
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+    def stream(
+        self,
+        *,
+        since: Optional[float] = None,
+        type_: Optional[str] = None,
+        threat_level: Optional[str] = None,
+        batch: int = 1000,
+    ) -> Iterator[Dict[str, Any]]:
+        """Oldest findings first, fetched ``batch`` rows at a time.
+
+        Pages by (ts, seq), so memory stays bounded however many findings match
+        and the lock is only held while a page is read.
+        """
+        self.flush()
+        where, params = self._where(since, type_, threat_level)
+        where = where + (" AND " if where else " WHERE ") + "(ts > ? OR (ts = ? AND seq > ?))"
+        sql = f"SELECT seq, ts, body FROM findings{where} ORDER BY ts, seq LIMIT ?"
+        last_ts, last_seq = float("-inf"), 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    sql, params + [last_ts, last_ts, last_seq, batch]
+                ).fetchall()
+            for _, _, body in rows:
+                yield json.loads(body)
+            if len(rows) < batch:
+                return
+            last_seq, last_ts, _ = rows[-1]
+
+    def _load_stats(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self._stats_path.read_text(encoding="utf-8"))
+            return {
+                "seq": int(data["seq"]),
+                "levels": dict(data["levels"]),
+                "latest": data["latest"],
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return {"seq": 0, "levels": {}, "latest": None}
+
+    def _tail_stats(self) -> Dict[str, Any]:
+        """Fold rows added since the last checkpoint into the running counters."""
+        stats = self._stats
+        (last_seq,) = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM findings").fetchone()
+        if last_seq < stats["seq"]:  # database replaced or pruned: count from scratch
+            stats = self._stats = {"seq": 0, "levels": {}, "latest": None}
+        if last_seq == stats["seq"]:
+            return stats
+        rows = self._conn.execute(
+            "SELECT threat_level, COUNT(*), MAX(ts) FROM findings WHERE seq > ? AND seq <= ? "
+            "GROUP BY threat_level",
+            (stats["seq"], last_seq),
+        ).fetchall()
+        for level, count, latest in rows:
+            stats["levels"][level] = stats["levels"].get(level, 0) + count
+            if stats["latest"] is None or latest > stats["latest"]:
+                stats["latest"] = latest
+        stats["seq"] = last_seq
+        tmp = self._stats_path.with_suffix(".tmp")
+        try:
+            tmp.write_text(json.dumps(stats), encoding="utf-8")
+            os.replace(tmp, self._stats_path)
+        except OSError:
+            pass
+        return stats
+
+    def counts(self, since: Optional[float] = None) -> Dict[str, Any]:
+        """Total findings, counts per threat level and the newest timestamp.
+
+        Without ``since`` this reads running counters that only fold in rows added
+        since the last call, checkpointed next to the database.
+        """
+        with self._lock:
+            self.flush()
+            if since is None:
+                stats = self._tail_stats()
+                levels, latest = dict(stats["levels"]), stats["latest"]
+            else:
+                where, params = self._where(since, None, None)
+                levels = dict(
+                    self._conn.execute(
+                        f"SELECT threat_level, COUNT(*) FROM findings{where} GROUP BY threat_level",
+                        params,
+                    ).fetchall()
+                )
+                (latest,) = self._conn.execute(
+                    f"SELECT MAX(ts) FROM findings{where}", params
+                ).fetchone()
+        return {
+            "total": sum(levels.values()),
+            "threat_levels": levels,
+            "latest": datetime.fromtimestamp(latest, timezone.utc).isoformat() if latest else None,
+        }
+
+
+_stores: Dict[Path, FindingsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_findings_store(path: Path) -> FindingsStore:
+    """Process-wide store for ``path``; pending findings are committed at exit."""
+    key = Path(path).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = FindingsStore(path)
+            atexit.register(store.close)
+            if not len(store):
+                store.backfill(store.path.parent)
+        return store
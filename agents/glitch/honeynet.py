@@ -0,0 +1,344 @@
+"""Built-in network honeypot: many TCP and UDP ports served from one event loop.
+
+:class:`HoneypotServer` accepts connections on every configured port, sends an
+optional banner, and records who connected along with the first bytes they sent.
+Each event lands in an in-memory ring buffer and is passed to a ``sink``
+callback (normally :meth:`GlitchLogger.log_honeypot_event` through
+:meth:`HoneypotManager.start_network_listener`).
+
+The server uses bare :class:`asyncio.Protocol` objects rather than streams, and
+``uvloop`` when it is installed. It rate-limits each source address with a
+token bucket (``GLITCH_HONEYNET_RATE`` events per second, bursts of
+``GLITCH_HONEYNET_BURST``), so one process can absorb scan storms. Connections
+over the limit are dropped without being recorded. The number dropped per
+source is reported once a second as a single ``rate_limited`` event.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+try:
+    import uvloop
+except ModuleNotFoundError:  # pragma: no cover - optional speed-up
+    uvloop = None  # type: ignore[assignment]
+
+RING_SIZE = int(os.getenv("GLITCH_HONEYNET_RING", "10000"))
+FIRST_BYTES = int(os.getenv("GLITCH_HONEYNET_FIRST_BYTES", "256"))
+READ_TIMEOUT = float(os.getenv("GLITCH_HONEYNET_TIMEOUT", "5"))
+RATE = float(os.getenv("GLITCH_HONEYNET_RATE", "5"))
+BURST = float(os.getenv("GLITCH_HONEYNET_BURST", "20"))
+MAX_CONNECTIONS = int(os.getenv("GLITCH_HONEYNET_MAX_CONNECTIONS", "10000"))
+
+BANNERS: Dict[int, bytes] = {
+    21: b"220 ProFTPD Server ready.\r\n",
+    22: b"SSH-2.0-OpenSSH_7.4\r\n",
+    25: b"220 mail.internal ESMTP Postfix\r\n",
+    2222: b"SSH-2.0-OpenSSH_7.4\r\n",
+}
+
+_IDLE_SOURCE_SECONDS = 60.0
+
+Event = Dict[str, Any]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class RateLimiter:
+    """Token bucket per source address."""
+
+    def __init__(self, rate: float = RATE, burst: float = BURST) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, List[float]] = {}
+
+    def allow(self, source: str, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(source)
+        if bucket is None:
+            bucket = self._buckets[source] = [self.burst, now]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return True
+        return False
+
+    def prune(self, idle: float = _IDLE_SOURCE_SECONDS, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        stale = [source for source, (_, last) in self._buckets.items() if now - last > idle]
+        for source in stale:
+            del self._buckets[source]
+
+
+class _TcpTrap(asyncio.Protocol):
+    __slots__ = ("server", "port", "trap_id", "transport", "peer", "data", "timer", "done")
+
+    def __init__(self, server: "HoneypotServer", port: int, trap_id: str) -> None:
+        self.server = server
+        self.port = port
+        self.trap_id = trap_id
+        self.transport: Optional[asyncio.Transport] = None
+        self.peer: Tuple[str, int] = ("", 0)
+        self.data = bytearray()
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.done = False
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+        if not self.port:  # ephemeral bind
+            self.port = transport.get_extra_info("sockname")[1]
+        peer = transport.get_extra_info("peername") or ("", 0)
+        self.peer = (peer[0], peer[1])
+        server = self.server
+        if server.active >= server.max_connections or not server.admit(self.peer[0]):
+            self.done = True
+            transport.abort()  # type: ignore[attr-defined]
+            return
+        server.active += 1
+        banner = server.banners.get(self.port)
+        if banner:
+            self.transport.write(banner)
+        self.timer = server.loop.call_later(server.read_timeout, self._finish)
+
+    def data_received(self, data: bytes) -> None:
+        if self.done:
+            return
+        self.data += data[: self.server.first_bytes - len(self.data)]
+        if len(self.data) >= self.server.first_bytes:
+            self._finish()
+
+    def eof_received(self) -> bool:
+        self._finish()
+        return False
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._finish()
+
+    def _finish(self) -> None:
+        if self.done:
+            return
+        self.done = True
+        self.server.active -= 1
+        if self.timer is not None:
+            self.timer.cancel()
+        self.server.record(self.trap_id, "tcp", self.port, self.peer, bytes(self.data))
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.close()
+
+
+class _UdpTrap(asyncio.DatagramProtocol):
+    def __init__(self, server: "HoneypotServer", port: int, trap_id: str) -> None:
+        self.server = server
+        self.port = port
+        self.trap_id = trap_id
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        if not self.port:  # ephemeral bind
+            self.port = transport.get_extra_info("sockname")[1]
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        if self.server.admit(addr[0]):
+            payload = data[: self.server.first_bytes]
+            self.server.record(self.trap_id, "udp", self.port, (addr[0], addr[1]), payload)
+
+
+class HoneypotServer:
+    """Listen on many TCP/UDP ports in one event loop and report every contact.
+
+    ``tcp`` and ``udp`` map ports to the trap id their events are reported
+    under. Port 0 binds an ephemeral port; :attr:`bound` holds the real ones.
+    """
+
+    def __init__(
+        self,
+        tcp: Optional[Dict[int, str]] = None,
+        udp: Optional[Dict[int, str]] = None,
+        *,
+        host: str = "0.0.0.0",
+        sink: Optional[Callable[[Event], None]] = None,
+        ring_size: int = RING_SIZE,
+        first_bytes: int = FIRST_BYTES,
+        read_timeout: float = READ_TIMEOUT,
+        rate: float = RATE,
+        burst: float = BURST,
+        max_connections: int = MAX_CONNECTIONS,
+        banners: Optional[Dict[int, bytes]] = None,
+    ) -> None:
+        self.tcp = dict(tcp or {})
+        self.udp = dict(udp or {})
+        self.host = host
+        self.sink = sink
+        self.first_bytes = first_bytes
+        self.read_timeout = read_timeout
+        self.max_connections = max_connections
+        self.banners = BANNERS if banners is None else banners
+        self.limiter = RateLimiter(rate, burst)
+        self.events: Deque[Event] = deque(maxlen=ring_size)
+        self.bound: Dict[Tuple[str, int], str] = {}
+        self.counters = {"recorded": 0, "rate_limited": 0}
+        self.active = 0
+        self.loop: asyncio.AbstractEventLoop = None  # type: ignore[assignment]
+        self._suppressed: Dict[str, int] = {}
+        self._servers: List[Any] = []
+        self._stopping: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    # -- event handling (runs on the loop) ---------------------------------
+
+    def admit(self, source: str) -> bool:
+        if self.limiter.allow(source):
+            return True
+        self._suppressed[source] = self._suppressed.get(source, 0) + 1
+        self.counters["rate_limited"] += 1
+        return False
+
+    def record(
+        self, trap_id: str, protocol: str, port: int, peer: Tuple[str, int], data: bytes
+    ) -> None:
+        self._emit(
+            {
+                "trap_id": trap_id,
+                "event_type": "connection",
+                "protocol": protocol,
+                "port": port,
+                "source_ip": peer[0],
+                "source_port": peer[1],
+                "first_bytes": data.decode("utf-8", errors="backslashreplace"),
+                "bytes_received": len(data),
+                "timestamp": _now(),
+            }
+        )
+        self.counters["recorded"] += 1
+
+    def _emit(self, event: Event) -> None:
+        self.events.append(event)
+        if self.sink is not None:
+            try:
+                self.sink(event)
+            except Exception as exc:  # noqa: BLE001 - never let a sink stop the listener
+                print(f"[HONEYNET ERROR] sink failed: {exc}", file=sys.stderr)
+
+    def _report_suppressed(self) -> None:
+        suppressed, self._suppressed = self._suppressed, {}
+        for source, count in suppressed.items():
+            self._emit(
+                {
+                    "trap_id": "honeynet",
+                    "event_type": "rate_limited",
+                    "source_ip": source,
+                    "dropped": count,
+                    "timestamp": _now(),
+                }
+            )
+
+    async def _housekeeping(self) -> None:
+        while True:
+            await asyncio.sleep(1.0)
+            self._report_suppressed()
+            self.limiter.prune()
+
+    # -- lifecycle ---------------------------------------------------------
+
+    async def open(self) -> None:
+        """Bind every port on the running loop."""
+        self.loop = asyncio.get_running_loop()
+        for port, trap_id in self.tcp.items():
+            server = await self.loop.create_server(
+                lambda port=port, trap_id=trap_id: _TcpTrap(self, port, trap_id),
+                self.host,
+                port,
+                backlog=4096,
+                reuse_address=True,
+            )
+            self._servers.append(server)
+            self.bound[("tcp", server.sockets[0].getsockname()[1])] = trap_id
+        for port, trap_id in self.udp.items():
+            transport, _ = await self.loop.create_datagram_endpoint(
+                lambda port=port, trap_id=trap_id: _UdpTrap(self, port, trap_id),
+                local_addr=(self.host, port),
+                family=socket.AF_INET,
+            )
+            self._servers.append(transport)
+            self.bound[("udp", transport.get_extra_info("sockname")[1])] = trap_id
+        self._servers.append(self.loop.create_task(self._housekeeping()))
+
+    async def aclose(self) -> None:
+        for server in self._servers:
+            if isinstance(server, asyncio.Task):
+                server.cancel()
+            else:
+                server.close()
+        for server in self._servers:
+            if isinstance(server, asyncio.AbstractServer):
+                await server.wait_closed()
+        self._servers = []
+        self._report_suppressed()
+
+    async def serve(self) -> None:
+        """Listen until :meth:`stop` is called."""
+        self._stopping = asyncio.Event()
+        try:
+            await self.open()
+        except BaseException as exc:
+            self._error = exc
+            self._ready.set()
+            await self.aclose()
+            raise
+        self._ready.set()
+        try:
+            await self._stopping.wait()
+        finally:
+            await self.aclose()
+
+    def start(self, timeout: float = 5.0) -> Dict[Tuple[str, int], str]:
+        """Serve from a background thread; returns the bound ports."""
+        loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+
+        def run() -> None:
+            try:
+                loop.run_until_complete(self.serve())
+            except BaseException:  # noqa: BLE001 - surfaced through start()
+                pass
+            finally:
+                loop.close()
+
+        self._thread = threading.Thread(target=run, name="glitch-honeynet", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("honeypot listener did not start in time")
+        if self._error is not None:
+            raise self._error
+        return dict(self.bound)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self.loop is not None and self._stopping is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def recent(self, limit: Optional[int] = None) -> List[Event]:
+        """Newest events first."""
+        events = list(self.events)
+        events.reverse()
+        return events[:limit] if limit is not None else events
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "active_connections": self.active,
+            "listening": [f"{protocol}/{port}" for protocol, port in sorted(self.bound)],
+        }
@@ -1,23 +1,128 @@
-"""Honeypot management for deploying stealth traps."""
+"""Honeypot management for deploying stealth traps.
 
+Traps report through log files in the honeypot directory. With
+:meth:`HoneypotManager.start_watching`, changes to those logs and to the trap
+files themselves are picked up as they happen (see :mod:`agents.glitch.watcher`)
+and pushed to subscribers. Either way, only the bytes appended since the last
+check are read, and trap state is written back at most every
+``GLITCH_HONEYPOT_SAVE_SECONDS`` seconds (default 2).
+"""
+
+import atexit
 import json
 import os
+import queue
 import subprocess
+import sys
 import tempfile
+import threading
 import time
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from agents.glitch.honeynet import HoneypotServer
+from agents.glitch.tail import TailReader
+from agents.glitch.watcher import (
+    IN_CLOSE_WRITE, IN_CREATE, IN_MODIFY, IN_MOVED_TO, IN_OPEN, DirectoryWatcher,
+)
+
+SAVE_SECONDS = float(os.getenv("GLITCH_HONEYPOT_SAVE_SECONDS", "2"))
+# Listener events waiting for the worker; past this they are dropped and counted
+LISTENER_QUEUE = int(os.getenv("GLITCH_HONEYPOT_LISTENER_QUEUE", "10000"))
+
+# Trap type -> (log suffix, marker written per trigger, count key in trigger reports)
+TRAP_LOGS = {
+    "filesystem": ("_access.log", "HONEYPOT TRIGGERED", "trigger_count"),
+    "network": ("_network.log", "Connection attempt", "connection_attempts"),
+    "process": ("_process.log", "monitoring detected", "monitoring_events"),
+}
+
+# Events on a trap file within this many seconds of the previous one (or of
+# deployment) are treated as part of the same access
+QUIET_SECONDS = 2.0
+
+_WRITE_EVENTS = IN_MODIFY | IN_CLOSE_WRITE | IN_CREATE | IN_MOVED_TO
+
+
+def parse_trap_line(line: bytes) -> Dict[str, Any]:
+    """Split a ``<date>: <message>`` line written by a trap script."""
+    text = line.decode(errors="replace").rstrip("\r")
+    when, sep, message = text.partition(": ")
+    if not sep:
+        when, message = None, text
+    return {"time": when, "message": message, "line": text}
+
+
+class ListenerQueue:
+    """Bounded hand-off from the network listener's loop to the event worker.
+    
+    :meth:`offer` never blocks the loop: when the queue is full the event is
+    dropped and counted, and the worker reports the count as one
+    ``queue_overflow`` event (like the listener's ``rate_limited`` summaries).
+    """
+    
+    def __init__(self, maxsize: Optional[int] = None):
+        size = LISTENER_QUEUE if maxsize is None else maxsize
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, size))
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self._unreported = 0
+    
+    def offer(self, event: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                self._unreported += 1
+    
+    def drain(self, limit: int = 1000) -> List[Optional[Dict[str, Any]]]:
+        """Wait for one event, then take whatever else is queued (up to ``limit``)."""
+        batch = [self._queue.get()]
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def take_dropped(self) -> int:
+        """Events dropped since the last call."""
+        with self._lock:
+            count, self._unreported = self._unreported, 0
+        return count
+    
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Tell the worker to stop once it has handled what is queued."""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
 
 
 class HoneypotManager:
     """Manages deployment and monitoring of stealth honeypot traps."""
     
-    def __init__(self):
+    def __init__(self, honeypot_dir: Optional[Path] = None):
         self.honeypots: Dict[str, Dict[str, Any]] = {}
-        self.honeypot_dir = Path("/tmp/glitch/honeypots")
+        self.honeypot_dir = Path(honeypot_dir or "/tmp/glitch/honeypots")
         self.honeypot_dir.mkdir(parents=True, exist_ok=True)
         
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._last_save = 0.0
+        self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+        # Triggers found by the watcher and not yet returned by check_triggers()
+        self._pending: deque = deque(maxlen=1000)
+        self._quiet_until: Dict[str, float] = {}
+        self._watcher: Optional[DirectoryWatcher] = None
+        self._listener: Optional[HoneypotServer] = None
+        # Queue of listener events and the thread that handles them off the event loop
+        self._listener_worker: Optional[Tuple[ListenerQueue, threading.Thread]] = None
+        self._tails: Dict[str, TailReader] = {}
+        
         # Load existing honeypots
         self._load_honeypots()
     
@@ -34,11 +139,27 @@ class HoneypotManager:
     def _save_honeypots(self) -> None:
         """Save honeypot state to disk."""
         state_file = self.honeypot_dir / "honeypots.json"
-        try:
-            with state_file.open('w') as f:
-                json.dump(self.honeypots, f, indent=2)
-        except Exception:
-            pass
+        tmp_file = state_file.with_suffix(".tmp")
+        with self._lock:
+            try:
+                with tmp_file.open('w') as f:
+                    json.dump(self.honeypots, f, indent=2)
+                os.replace(tmp_file, state_file)
+                self._dirty = False
+                self._last_save = time.monotonic()
+            except Exception:
+                pass
+    
+    def flush_state(self, force: bool = False) -> None:
+        """Write trigger counts and log offsets back if the save interval has passed."""
+        with self._lock:
+            if self._dirty and (force or time.monotonic() - self._last_save >= SAVE_SECONDS):
+                self._save_honeypots()
+    
+    def _register(self, honeypot_data: Dict[str, Any]) -> None:
+        with self._lock:
+            self.honeypots[honeypot_data["trap_id"]] = honeypot_data
+            self._save_honeypots()
     
     def get_active_count(self) -> int:
         """Get count of active honeypots."""
@@ -60,6 +181,9 @@ class HoneypotManager:
     def _deploy_filesystem_trap(self, trap_id: str) -> Dict[str, Any]:
         """Deploy filesystem-based honeypot."""
         try:
+            # Our own writes below must not count as accesses
+            self._quiet_until[trap_id] = time.monotonic() + QUIET_SECONDS
+            
             # Create honeypot files in common target locations
             trap_paths = []
             
@@ -127,8 +251,7 @@ done
                 "triggers": 0
             }
             
-            self.honeypots[trap_id] = honeypot_data
-            self._save_honeypots()
+            self._register(honeypot_data)
             
             return {
                 "success": True,
@@ -172,8 +295,7 @@ done
                 "triggers": 0
             }
             
-            self.honeypots[trap_id] = honeypot_data
-            self._save_honeypots()
+            self._register(honeypot_data)
             
             return {
                 "success": True,
@@ -234,8 +356,7 @@ while True:
                 "triggers": 0
             }
             
-            self.honeypots[trap_id] = honeypot_data
-            self._save_honeypots()
+            self._register(honeypot_data)
             
             return {
                 "success": True,
@@ -248,116 +369,317 @@ while True:
             return {"success": False, "error": str(e)}
     
     def check_triggers(self) -> List[Dict[str, Any]]:
-        """Check all honeypots for triggers."""
-        triggers = []
+        """Check all honeypots for triggers.
         
-        for trap_id, honeypot in self.honeypots.items():
-            if honeypot.get("status") != "active":
-                continue
-                
-            trap_type = honeypot.get("type")
-            
-            if trap_type == "filesystem":
-                fs_triggers = self._check_filesystem_triggers(trap_id, honeypot)
-                triggers.extend(fs_triggers)
-            elif trap_type == "network":
-                net_triggers = self._check_network_triggers(trap_id, honeypot)
-                triggers.extend(net_triggers)
-            elif trap_type == "process":
-                proc_triggers = self._check_process_triggers(trap_id, honeypot)
-                triggers.extend(proc_triggers)
+        Returns triggers the watcher has reported since the last call, followed
+        by any found now in log bytes appended since the last check.
+        """
+        with self._lock:
+            triggers = list(self._pending)
+            self._pending.clear()
+            found = []
+            for trap_id, honeypot in list(self.honeypots.items()):
+                if honeypot.get("status") == "active":
+                    found.extend(self._tail_trap_log(trap_id, honeypot))
+            self.flush_state(force=self._watcher is None)
         
-        return triggers
+        self._notify(found)
+        return triggers + found
     
-    def _check_filesystem_triggers(self, trap_id: str, honeypot: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Check filesystem honeypot for triggers."""
-        triggers = []
+    def _tail_trap_log(self, trap_id: str, honeypot: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Turn marker lines appended to a trap's log since the last check into a trigger."""
+        if honeypot.get("type") not in TRAP_LOGS:
+            return []
+        suffix, marker, count_key = TRAP_LOGS[honeypot["type"]]
+        reader = self._tails.get(trap_id)
+        if reader is None:
+            reader = self._tails[trap_id] = TailReader(
+                self.honeypot_dir / f"{trap_id}{suffix}",
+                honeypot.get("log_offset", 0),
+                honeypot.get("log_inode"),
+                parse=parse_trap_line,
+            )
         
-        try:
-            log_file = Path(f"{self.honeypot_dir}/{trap_id}_access.log")
-            if log_file.exists():
-                # Read new log entries
-                log_content = log_file.read_text()
-                new_triggers = log_content.count("HONEYPOT TRIGGERED")
-                
-                if new_triggers > honeypot.get("triggers", 0):
-                    triggers.append({
-                        "trap_id": trap_id,
-                        "type": "filesystem",
-                        "trigger_count": new_triggers,
-                        "timestamp": datetime.now(timezone.utc).isoformat(),
-                        "details": log_content.split('\n')[-5:]  # Last 5 log lines
-                    })
-                    
-                    # Update trigger count
-                    honeypot["triggers"] = new_triggers
-                    self._save_honeypots()
+        hits = [event for event in reader.read() if marker in event["message"]]
+        if (reader.offset, reader.inode) == (honeypot.get("log_offset"), honeypot.get("log_inode")):
+            return []
+        previous = honeypot.get("triggers", 0)
+        if "log_offset" in honeypot:
+            total = previous + len(hits)
+        else:
+            # State written before offsets were tracked: triggers counts from the start
+            total = len(hits)
+        honeypot["log_offset"] = reader.offset
+        honeypot["log_inode"] = reader.inode
+        self._dirty = True
         
-        except Exception:
-            pass
+        if total <= previous:
+            return []
+        honeypot["triggers"] = total
+        trigger = {
+            "trap_id": trap_id,
+            "type": honeypot["type"],
+            count_key: total,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+        if honeypot["type"] == "filesystem":
+            trigger["details"] = [event["line"] for event in hits[-5:]]  # Last 5 triggers
+        elif honeypot["type"] == "network":
+            trigger["port"] = honeypot.get("port")
+        return [trigger]
+    
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Call ``callback(trigger)`` for every trigger as soon as it is detected."""
+        with self._lock:
+            self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+    
+    def _notify(self, triggers: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for trigger in triggers:
+            for callback in subscribers:
+                try:
+                    callback(trigger)
+                except Exception as e:
+                    print(f"[HONEYPOT] Subscriber error: {e}", file=sys.stderr)
+    
+    def _publish(self, triggers: List[Dict[str, Any]]) -> None:
+        if triggers:
+            with self._lock:
+                self._pending.extend(triggers)
+            self._notify(triggers)
+    
+    def start_watching(self, backend: Optional[str] = None) -> str:
+        """Watch the honeypot directory for trap activity; returns the backend used."""
+        with self._lock:
+            if self._watcher is not None:
+                return self._watcher.backend
+            watcher = DirectoryWatcher(
+                self.honeypot_dir, self._on_file_event, backend=backend, idle=self.flush_state
+            )
+            used = watcher.start()
+            self._watcher = watcher
+        atexit.register(self.stop_watching)
         
-        return triggers
+        # Catch up on anything logged while nobody was watching
+        with self._lock:
+            found = []
+            for trap_id, honeypot in list(self.honeypots.items()):
+                if honeypot.get("status") == "active":
+                    found.extend(self._tail_trap_log(trap_id, honeypot))
+        self._publish(found)
+        return used
     
-    def _check_network_triggers(self, trap_id: str, honeypot: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Check network honeypot for triggers.""" 
-        triggers = []
+    def stop_watching(self) -> None:
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.stop()
+        self.flush_state(force=True)
+    
+    def start_network_listener(self, tcp_ports: Optional[List[int]] = None,
+                               udp_ports: Optional[List[int]] = None, logger: Any = None,
+                               host: str = "0.0.0.0", **options: Any) -> Dict[str, Any]:
+        """Serve network traps from the built-in asyncio listener.
         
-        try:
-            log_file = Path(f"{self.honeypot_dir}/{trap_id}_network.log")
-            if log_file.exists():
-                log_content = log_file.read_text()
-                connection_attempts = log_content.count("Connection attempt")
-                
-                if connection_attempts > honeypot.get("triggers", 0):
-                    triggers.append({
-                        "trap_id": trap_id,
-                        "type": "network",
-                        "connection_attempts": connection_attempts,
-                        "timestamp": datetime.now(timezone.utc).isoformat(),
-                        "port": honeypot.get("port")
-                    })
-                    
-                    honeypot["triggers"] = connection_attempts
-                    self._save_honeypots()
+        Listens on the port of every active network trap plus ``tcp_ports`` and
+        ``udp_ports``. A port shared by several traps is bound once and its
+        contacts count for each of them. The listener only queues its events (see
+        :class:`ListenerQueue`); a worker thread logs them in batches through
+        ``logger.log_honeypot_events`` (or ``log_honeypot_event`` one at a time),
+        publishes each contact to subscribers as a network trigger and saves trap state.
+        ``options`` go to :class:`~agents.glitch.honeynet.HoneypotServer`
+        (rate limits, timeouts, ...).
+        """
+        with self._lock:
+            if self._listener is not None:
+                return self._listener.stats()
+            ports: Dict[str, Dict[int, List[str]]] = {
+                "tcp": {port: [f"net_tcp_{port}"] for port in tcp_ports or []},
+                "udp": {port: [f"net_udp_{port}"] for port in udp_ports or []},
+            }
+            for trap_id, honeypot in self.honeypots.items():
+                if honeypot.get("type") == "network" and honeypot.get("status") == "active":
+                    ports["tcp"].setdefault(honeypot.get("port", 2222), []).append(trap_id)
         
-        except Exception:
-            pass
+        # The listener reports each port under one id; shared ports get their own
+        bindings: Dict[str, Dict[int, str]] = {"tcp": {}, "udp": {}}
+        traps: Dict[str, List[str]] = {}
+        for protocol, by_port in ports.items():
+            for port, trap_ids in by_port.items():
+                label = trap_ids[0] if len(trap_ids) == 1 else f"net_{protocol}_{port}"
+                bindings[protocol][port] = label
+                traps[label] = trap_ids
         
-        return triggers
+        events = ListenerQueue()
+        worker = threading.Thread(
+            target=self._handle_network_events, args=(events, traps, logger),
+            name="glitch-honeynet-events", daemon=True,
+        )
+        worker.start()
+        listener = HoneypotServer(
+            bindings["tcp"], bindings["udp"], host=host, sink=events.offer, **options
+        )
+        try:
+            listener.start()
+        except BaseException:
+            events.close()
+            worker.join()
+            raise
+        with self._lock:
+            self._listener = listener
+            self._listener_worker = (events, worker)
+        atexit.register(self.stop_network_listener)
+        return listener.stats()
+    
+    def stop_network_listener(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            listener, self._listener = self._listener, None
+            worker, self._listener_worker = self._listener_worker, None
+        if listener is not None:
+            listener.stop()
+        if worker is not None:
+            events, thread = worker
+            events.close(timeout)
+            thread.join(timeout)
+        self.flush_state(force=True)
     
-    def _check_process_triggers(self, trap_id: str, honeypot: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Check process honeypot for triggers."""
+    def network_events(self, limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """Most recent contacts seen by the built-in listener, newest first."""
+        return self._listener.recent(limit) if self._listener is not None else []
+    
+    def _handle_network_events(self, events: ListenerQueue, traps: Dict[str, List[str]],
+                               logger: Any) -> None:
+        """Worker thread: log, count and publish listener events until ``None`` arrives."""
+        stop = False
+        while not stop:
+            batch = events.drain()
+            dropped = events.take_dropped()
+            if dropped:
+                batch.append({
+                    "trap_id": "honeynet",
+                    "event_type": "queue_overflow",
+                    "dropped": dropped,
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                })
+            contacts = []
+            for event in batch:
+                if event is None:
+                    stop = True
+                    continue
+                for trap_id in traps.get(event["trap_id"], [event["trap_id"]]):
+                    contacts.append(dict(event, trap_id=trap_id))
+            self._log_network_events(logger, contacts)
+            for contact in contacts:
+                if contact["event_type"] == "connection":
+                    self._on_connection(contact)
+            self.flush_state()
+    
+    @staticmethod
+    def _log_network_events(logger: Any, contacts: List[Dict[str, Any]]) -> None:
+        if logger is None or not contacts:
+            return
+        try:
+            log_many = getattr(logger, "log_honeypot_events", None)
+            if log_many is not None:
+                log_many([(c["trap_id"], c["event_type"], c) for c in contacts])
+            else:
+                for contact in contacts:
+                    logger.log_honeypot_event(contact["trap_id"], contact["event_type"], contact)
+        except Exception as e:
+            print(f"[HONEYPOT] Logger error: {e}", file=sys.stderr)
+    
+    def _on_connection(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            honeypot = self.honeypots.get(event["trap_id"])
+            if honeypot is not None:
+                honeypot["triggers"] = honeypot.get("triggers", 0) + 1
+                self._dirty = True
+            attempts = honeypot["triggers"] if honeypot is not None else 1
+        trigger = {
+            "trap_id": event["trap_id"],
+            "type": "network",
+            "connection_attempts": attempts,
+            "timestamp": event["timestamp"],
+            "port": event["port"],
+            "protocol": event["protocol"],
+            "source_ip": event["source_ip"],
+            "first_bytes": event["first_bytes"],
+        }
+        self._publish([trigger])
+    
+    def _on_file_event(self, name: str, mask: int) -> None:
+        """Handle one change notification for a file in the honeypot directory."""
+        if name == "honeypots.json":
+            if mask & (IN_MOVED_TO | IN_CLOSE_WRITE):
+                self._merge_state()
+            return
+        
         triggers = []
+        with self._lock:
+            for trap_id, honeypot in self.honeypots.items():
+                if honeypot.get("status") != "active" or not name.startswith(trap_id + "_"):
+                    continue
+                suffix = TRAP_LOGS.get(honeypot.get("type"), ("",))[0]
+                if suffix and name == trap_id + suffix:
+                    if mask & _WRITE_EVENTS:
+                        triggers.extend(self._tail_trap_log(trap_id, honeypot))
+                elif mask & (IN_OPEN | _WRITE_EVENTS):
+                    trigger = self._trap_file_access(trap_id, honeypot, name, mask)
+                    if trigger:
+                        triggers.append(trigger)
+                break
+        self._publish(triggers)
+    
+    def _trap_file_access(self, trap_id: str, honeypot: Dict[str, Any], name: str,
+                          mask: int) -> Optional[Dict[str, Any]]:
+        """Report a bait file being opened or changed (filesystem traps only)."""
+        path = self.honeypot_dir / name
+        if str(path) not in honeypot.get("trap_paths", []):
+            return None
+        now = time.monotonic()
+        if now < self._quiet_until.get(trap_id, 0) or now < self._quiet_until.get(name, 0):
+            return None
+        self._quiet_until[name] = now + QUIET_SECONDS
         
+        honeypot["accesses"] = honeypot.get("accesses", 0) + 1
+        self._dirty = True
+        return {
+            "trap_id": trap_id,
+            "type": "filesystem",
+            "event": "opened" if mask & IN_OPEN else "modified",
+            "path": str(path),
+            "accesses": honeypot["accesses"],
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+    
+    def _merge_state(self) -> None:
+        """Pick up traps deployed by other processes."""
+        state_file = self.honeypot_dir / "honeypots.json"
         try:
-            log_file = Path(f"{self.honeypot_dir}/{trap_id}_process.log")
-            if log_file.exists():
-                log_content = log_file.read_text()
-                monitoring_events = log_content.count("monitoring detected")
-                
-                if monitoring_events > honeypot.get("triggers", 0):
-                    triggers.append({
-                        "trap_id": trap_id,
-                        "type": "process",
-                        "monitoring_events": monitoring_events,
-                        "timestamp": datetime.now(timezone.utc).isoformat()
-                    })
-                    
-                    honeypot["triggers"] = monitoring_events
-                    self._save_honeypots()
-        
+            with state_file.open() as f:
+                on_disk = json.load(f)
         except Exception:
-            pass
-        
-        return triggers
+            return
+        with self._lock:
+            for trap_id, honeypot in on_disk.items():
+                self.honeypots.setdefault(trap_id, honeypot)
     
     def list_honeypots(self) -> Dict[str, Any]:
         """List all deployed honeypots."""
-        return {
+        listing = {
             "total_honeypots": len(self.honeypots),
             "active_honeypots": self.get_active_count(),
             "honeypots": self.honeypots
         }
+        if self._listener is not None:
+            listing["listener"] = self._listener.stats()
+        return listing
     
     def remove_honeypot(self, trap_id: str) -> Dict[str, Any]:
         """Remove a honeypot trap."""
@@ -376,8 +698,10 @@ while True:
                         pass
             
             # Remove from registry
-            del self.honeypots[trap_id]
-            self._save_honeypots()
+            with self._lock:
+                del self.honeypots[trap_id]
+                self._tails.pop(trap_id, None)
+                self._save_honeypots()
             
             return {"success": True, "message": f"Honeypot {trap_id} removed"}
             
@@ -1,9 +1,15 @@
 """Structured logging system for Glitch agent."""
 
 import json
+import sys
+from itertools import islice
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from agents.glitch.findings import get_findings_store
+from agents.glitch.logindex import TimeIndexedLog
+from agents.glitch.logwriter import get_log_writer
 
 
 class GlitchLogger:
@@ -13,28 +19,45 @@ class GlitchLogger:
         self.logs_dir = Path("/tmp/glitch/logs")
         self.logs_dir.mkdir(parents=True, exist_ok=True)
         
-        # Initialize log files
-        self.findings_log = self.logs_dir / f"findings_{datetime.now().strftime('%Y-%m-%d')}.jsonl"
-        self.events_log = self.logs_dir / f"events_{datetime.now().strftime('%Y-%m-%d')}.jsonl"
-        self.audit_log = self.logs_dir / f"audit_{datetime.now().strftime('%Y-%m-%d')}.jsonl"
+        # One queued writer thread per log directory, shared by every logger
+        self.writer = get_log_writer(self.logs_dir)
+        self.findings = get_findings_store(self.logs_dir / "findings.db")
+        self.events_reader = TimeIndexedLog(self.logs_dir, "events")
+        self.audit_reader = TimeIndexedLog(self.logs_dir, "audit")
     
-    def log(self, event_type: str, data: Dict[str, Any], severity: str = "info") -> None:
-        """Log an event with structured data."""
-        log_entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+    @property
+    def findings_log(self) -> Path:
+        return self.writer.path("findings")
+    
+    @property
+    def events_log(self) -> Path:
+        return self.writer.path("events")
+    
+    @property
+    def audit_log(self) -> Path:
+        return self.writer.path("audit")
+    
+    def _event_entry(self, event_type: str, data: Dict[str, Any], severity: str,
+                     timestamp: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
             "event_type": event_type,
             "severity": severity,
             "agent": "glitch",
             "data": data,
             "log_version": "1.0"
         }
+    
+    def log(self, event_type: str, data: Dict[str, Any], severity: str = "info") -> None:
+        """Log an event with structured data."""
+        log_entry = self._event_entry(event_type, data, severity)
         
         # Write to events log
-        self._write_log_entry(self.events_log, log_entry)
+        self._write_log_entry("events", log_entry)
         
         # Also write to findings log if it's a finding
         if event_type.startswith(('finding', 'threat', 'anomaly', 'suspicious')):
-            self._write_log_entry(self.findings_log, log_entry)
+            self._write_log_entry("findings", log_entry)
     
     def log_finding(self, finding_type: str, details: Dict[str, Any], 
                    threat_level: str = "low", confidence: float = 0.5) -> str:
@@ -56,8 +79,10 @@ class GlitchLogger:
             "version": "1.0"
         }
         
-        # Write to findings log
-        self._write_log_entry(self.findings_log, finding_entry)
+        # Store in the indexed findings table, and keep the body in the findings log
+        # so log search and the archive see it
+        self.findings.add(finding_entry)
+        self._write_log_entry("findings", finding_entry)
         
         # Also log as event
         self.log(f"finding.{finding_type}", {
@@ -98,10 +123,10 @@ class GlitchLogger:
         self.log("scan.completed", scan_entry)
         return scan_id
     
-    def log_honeypot_event(self, trap_id: str, event_type: str, details: Dict[str, Any]) -> None:
-        """Log honeypot trigger events."""
-        honeypot_entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+    def _honeypot_entry(self, trap_id: str, event_type: str, details: Dict[str, Any],
+                        timestamp: str) -> Dict[str, Any]:
+        return {
+            "timestamp": timestamp,
             "trap_id": trap_id,
             "event_type": event_type,
             "details": details,
@@ -109,9 +134,32 @@ class GlitchLogger:
             "user_agent": details.get("user_agent"),
             "attack_vector": details.get("attack_vector")
         }
+    
+    def log_honeypot_event(self, trap_id: str, event_type: str, details: Dict[str, Any]) -> None:
+        """Log honeypot trigger events."""
+        honeypot_entry = self._honeypot_entry(
+            trap_id, event_type, details, datetime.now(timezone.utc).isoformat()
+        )
         
         self.log(f"honeypot.{event_type}", honeypot_entry, severity="warning")
     
+    def log_honeypot_events(self, events: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """Log a batch of ``(trap_id, event_type, details)`` honeypot events in one write."""
+        timestamp = datetime.now(timezone.utc).isoformat()
+        entries = [
+            self._event_entry(
+                f"honeypot.{event_type}",
+                self._honeypot_entry(trap_id, event_type, details, timestamp),
+                "warning",
+                timestamp,
+            )
+            for trap_id, event_type, details in events
+        ]
+        try:
+            self.writer.write_many("events", entries)
+        except Exception as e:
+            print(f"[LOG ERROR] Failed to queue events entries: {e}", file=sys.stderr)
+    
     def log_audit_event(self, action: str, user: str, resource: str, 
                        outcome: str, details: Dict[str, Any] = None) -> None:
         """Log audit events for compliance."""
@@ -125,17 +173,15 @@ class GlitchLogger:
             "session_id": details.get("session_id") if details else None
         }
         
-        self._write_log_entry(self.audit_log, audit_entry)
+        self._write_log_entry("audit", audit_entry)
     
-    def _write_log_entry(self, log_file: Path, entry: Dict[str, Any]) -> None:
-        """Write a log entry to the specified file."""
+    def _write_log_entry(self, stream: str, entry: Dict[str, Any]) -> None:
+        """Queue a log entry for the ``stream`` log (events, findings or audit)."""
         try:
-            with log_file.open('a', encoding='utf-8') as f:
-                f.write(json.dumps(entry) + '\n')
+            self.writer.write(stream, entry)
         except Exception as e:
-            # Fallback logging to stderr if file write fails
-            print(f"[LOG ERROR] Failed to write to {log_file}: {e}", file=sys.stderr)
-            print(f"[LOG ERROR] Entry: {json.dumps(entry)}", file=sys.stderr)
+            # Fallback logging to stderr if the entry cannot be queued
+            print(f"[LOG ERROR] Failed to queue {stream} entry: {e}", file=sys.stderr)
     
     def _severity_from_threat_level(self, threat_level: str) -> str:
         """Convert threat level to log severity."""
@@ -148,100 +194,35 @@ class GlitchLogger:
         return mapping.get(threat_level.lower(), "info")
     
     def get_recent_findings(self, hours: int = 24, threat_level: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get recent findings from logs."""
-        findings = []
+        """Get recent findings, newest first."""
         cutoff_time = datetime.now(timezone.utc).timestamp() - (hours * 3600)
-        
-        try:
-            if self.findings_log.exists():
-                with self.findings_log.open('r') as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line.strip())
-                            
-                            # Check timestamp
-                            entry_time = datetime.fromisoformat(entry["timestamp"].replace('Z', '+00:00')).timestamp()
-                            if entry_time < cutoff_time:
-                                continue
-                            
-                            # Filter by threat level if specified
-                            if threat_level and entry.get("threat_level") != threat_level.lower():
-                                continue
-                            
-                            findings.append(entry)
-                        except (json.JSONDecodeError, KeyError, ValueError):
-                            continue
-        except Exception:
-            pass
-        
-        # Sort by timestamp (newest first)
-        findings.sort(key=lambda x: x["timestamp"], reverse=True)
-        return findings
+        return self.findings.recent(None, since=cutoff_time, threat_level=threat_level)
     
-    def get_events(self, event_type: Optional[str] = None, hours: int = 24) -> List[Dict[str, Any]]:
-        """Get recent events from logs."""
-        events = []
+    def get_events(self, event_type: Optional[str] = None, hours: int = 24,
+                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get recent events from logs, newest first."""
         cutoff_time = datetime.now(timezone.utc).timestamp() - (hours * 3600)
-        
-        try:
-            if self.events_log.exists():
-                with self.events_log.open('r') as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line.strip())
-                            
-                            # Check timestamp
-                            entry_time = datetime.fromisoformat(entry["timestamp"].replace('Z', '+00:00')).timestamp()
-                            if entry_time < cutoff_time:
-                                continue
-                            
-                            # Filter by event type if specified
-                            if event_type and not entry.get("event_type", "").startswith(event_type):
-                                continue
-                            
-                            events.append(entry)
-                        except (json.JSONDecodeError, KeyError, ValueError):
-                            continue
-        except Exception:
-            pass
-        
-        # Sort by timestamp (newest first)
-        events.sort(key=lambda x: x["timestamp"], reverse=True)
-        return events
+        self.writer.flush()
+        events = (
+            entry for entry in self.events_reader.iter_recent(cutoff_time)
+            if not event_type or entry.get("event_type", "").startswith(event_type)
+        )
+        return list(islice(events, limit))
     
-    def get_audit_logs(self, hours: int = 24, user: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get audit log entries."""
-        audit_entries = []
+    def get_audit_logs(self, hours: int = 24, user: Optional[str] = None,
+                       limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get audit log entries, newest first."""
         cutoff_time = datetime.now(timezone.utc).timestamp() - (hours * 3600)
-        
-        try:
-            if self.audit_log.exists():
-                with self.audit_log.open('r') as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line.strip())
-                            
-                            # Check timestamp
-                            entry_time = datetime.fromisoformat(entry["timestamp"].replace('Z', '+00:00')).timestamp()
-                            if entry_time < cutoff_time:
-                                continue
-                            
-                            # Filter by user if specified
-                            if user and entry.get("user") != user:
-                                continue
-                            
-                            audit_entries.append(entry)
-                        except (json.JSONDecodeError, KeyError, ValueError):
-                            continue
-        except Exception:
-            pass
-        
-        # Sort by timestamp (newest first)
-        audit_entries.sort(key=lambda x: x["timestamp"], reverse=True)
-        return audit_entries
+        self.writer.flush()
+        entries = (
+            entry for entry in self.audit_reader.iter_recent(cutoff_time)
+            if not user or entry.get("user") == user
+        )
+        return list(islice(entries, limit))
     
     def get_log_stats(self) -> Dict[str, Any]:
         """Get statistics about log files."""
+        self.writer.flush()
         stats = {
             "log_directory": str(self.logs_dir),
             "total_findings": 0,
@@ -253,47 +234,30 @@ class GlitchLogger:
         }
         
         # Count findings
-        if self.findings_log.exists():
-            try:
-                with self.findings_log.open('r') as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line.strip())
-                            stats["total_findings"] += 1
-                            
-                            threat_level = entry.get("threat_level", "low")
-                            if threat_level in stats["threat_level_counts"]:
-                                stats["threat_level_counts"][threat_level] += 1
-                            
-                            if not stats["latest_finding"] or entry["timestamp"] > stats["latest_finding"]:
-                                stats["latest_finding"] = entry["timestamp"]
-                        except (json.JSONDecodeError, KeyError):
-                            continue
-            except Exception:
-                pass
-        
-        # Count events
-        if self.events_log.exists():
-            try:
-                with self.events_log.open('r') as f:
-                    stats["total_events"] = sum(1 for line in f)
-            except Exception:
-                pass
+        counts = self.findings.counts()
+        stats["total_findings"] = counts["total"]
+        stats["latest_finding"] = counts["latest"]
+        for level, count in counts["threat_levels"].items():
+            if level in stats["threat_level_counts"]:
+                stats["threat_level_counts"][level] = count
         
-        # Count audit entries
-        if self.audit_log.exists():
-            try:
-                with self.audit_log.open('r') as f:
-                    stats["total_audit_entries"] = sum(1 for line in f)
-            except Exception:
-                pass
+        # Entry counts are kept incrementally by the writer; refresh only tails new bytes
+        files = self.writer.stats.refresh()
+        totals = self.writer.stats.totals(files)
+        stats["total_events"] = totals.get("events", 0)
+        stats["total_audit_entries"] = totals.get("audit", 0)
         
         # File sizes
-        for log_file in [self.findings_log, self.events_log, self.audit_log]:
-            if log_file.exists():
-                stats["log_files"][log_file.name] = {
-                    "size_bytes": log_file.stat().st_size,
-                    "modified": log_file.stat().st_mtime
-                }
+        for name, entry in sorted(files.items()):
+            stats["log_files"][name] = {
+                "size_bytes": entry["offset"],
+                "entries": entry["lines"],
+                "modified": entry.get("mtime")
+            }
+        if self.findings.path.exists():
+            stats["log_files"][self.findings.path.name] = {
+                "size_bytes": self.findings.path.stat().st_size,
+                "modified": self.findings.path.stat().st_mtime
+            }
         
         return stats
\ No newline at end of file
@@ -0,0 +1,226 @@
+"""Time-indexed reads over Glitch's daily JSON-lines logs.
+
+Each ``<prefix>_YYYY-MM-DD.jsonl`` log gets a sparse side index,
+``<file>.idx``, holding one ``<minute epoch> <byte offset>`` line per minute that
+appears in the log. The index is extended incrementally from the last indexed
+minute whenever the log has grown. Indexing only looks at the ``timestamp``
+prefix of each line and parses a timestamp once per minute.
+
+A query for entries newer than a cutoff bisects the index to the cutoff's minute
+in every day file that can hold matches. It then reads those files backwards
+from EOF down to that offset and yields entries newest first, so a "last hour"
+query touches only the last hour's bytes.
+
+Entries must be appended in time order and carry a UTC ISO ``timestamp`` as
+their first key, which is what :class:`~agents.glitch.logging.GlitchLogger`
+writes. Size-rotated parts (``<prefix>_YYYY-MM-DD.001.jsonl``) sort after the
+day's first file and are read as newer.
+
+Days already moved into the archive (see :mod:`agents.glitch.archive`) are
+read too, when their segment header says they can hold entries newer than the
+cutoff. A segment is decompressed front to back, so its matching entries are
+collected and then yielded newest first.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from agents.glitch.archive import ARCHIVE_DIR, segment_headers, segment_lines
+
+_TS_KEY = b'"timestamp":'
+_BLOCK = 64 * 1024
+
+
+def _minute_of(line: bytes) -> Optional[str]:
+    """``YYYY-MM-DDTHH:MM`` of a log line, read without decoding the JSON."""
+    start = line.find(_TS_KEY)
+    if start < 0:
+        return None
+    # json.dumps writes '"timestamp": "', orjson the compact '"timestamp":"'
+    start = line.find(b'"', start + len(_TS_KEY)) + 1
+    return line[start : start + 16].decode("ascii", errors="replace")
+
+
+def _minute_epoch(minute: str) -> Optional[int]:
+    try:
+        return int(datetime.fromisoformat(minute).replace(tzinfo=timezone.utc).timestamp())
+    except ValueError:
+        return None
+
+
+def reverse_lines(path: Path, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """Yield complete lines of ``path`` between byte offsets, last line first."""
+    with path.open("rb") as fh:
+        position = fh.seek(0, os.SEEK_END) if end is None else end
+        carry = b""
+        while position > start:
+            step = min(_BLOCK, position - start)
+            position -= step
+            fh.seek(position)
+            chunk = fh.read(step) + carry
+            lines = chunk.split(b"\n")
+            carry = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line
+        if carry.strip():
+            yield carry
+
+
+def _entry(line: bytes) -> Optional[Dict[str, Any]]:
+    """The decoded entry of a log line, or None when it has no timestamp."""
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(entry, dict) or not entry.get("timestamp"):
+        return None
+    return entry
+
+
+class MinuteIndex:
+    """Sparse minute → first byte offset index for one log file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+        self.minutes: List[int] = []
+        self.offsets: List[int] = []
+        self._scanned_to = 0
+        if self.index_path.exists():
+            for pair in self.index_path.read_text(encoding="ascii").splitlines():
+                parts = pair.split()
+                if len(parts) == 2:
+                    self.minutes.append(int(parts[0]))
+                    self.offsets.append(int(parts[1]))
+            # Resume from the newest indexed minute; later bytes were never scanned
+            self._scanned_to = self.offsets[-1] if self.offsets else 0
+
+    def refresh(self) -> None:
+        """Index whatever was appended since the last call."""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size < self._scanned_to:  # truncated or replaced: start over
+            self.minutes, self.offsets, self._scanned_to = [], [], 0
+            self.index_path.unlink(missing_ok=True)
+        if size == self._scanned_to:
+            return
+        added: List[Tuple[int, int]] = []
+        last_minute = self.minutes[-1] if self.minutes else None
+        last_key: Optional[str] = None
+        with self.path.open("rb") as fh:
+            fh.seek(self._scanned_to)
+            offset = self._scanned_to
+            for line in fh:
+                if not line.endswith(b"\n"):  # partial write in progress
+                    break
+                key = _minute_of(line)
+                if key is not None and key != last_key:
+                    last_key = key
+                    epoch = _minute_epoch(key)
+                    if epoch is not None and (last_minute is None or epoch > last_minute):
+                        added.append((epoch, offset))
+                        last_minute = epoch
+                offset += len(line)
+        self._scanned_to = offset
+        if added:
+            self.minutes.extend(minute for minute, _ in added)
+            self.offsets.extend(off for _, off in added)
+            with self.index_path.open("a", encoding="ascii") as fh:
+                fh.write("".join(f"{minute} {off}\n" for minute, off in added))
+
+    def offset_for(self, since: float) -> int:
+        """Byte offset of the first minute that can hold entries at or after ``since``."""
+        position = bisect.bisect_right(self.minutes, int(since)) - 1
+        return self.offsets[position] if position >= 0 else 0
+
+
+class TimeIndexedLog:
+    """Newest-first reader across the daily files of one log prefix."""
+
+    def __init__(self, directory: Path, prefix: str) -> None:
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self._indexes: Dict[Path, MinuteIndex] = {}
+        self._lock = threading.Lock()
+
+    def files(self, since: Optional[float] = None) -> List[Path]:
+        """Day files that may hold entries newer than ``since``, newest first."""
+        # File dates follow local time, timestamps are UTC: allow one day of slack
+        floor = None
+        if since is not None:
+            floor = (datetime.fromtimestamp(since) - timedelta(days=1)).strftime("%Y-%m-%d")
+        found = []
+        for path in self.directory.glob(f"{self.prefix}_*.jsonl"):
+            day = path.stem[len(self.prefix) + 1 :]
+            if floor is None or day >= floor:
+                found.append((day, path))
+        return [path for _, path in sorted(found, reverse=True)]
+
+    def segments(self, since: Optional[float] = None) -> List[Tuple[str, Path]]:
+        """Archived days that may hold entries newer than ``since``, newest first.
+
+        Each item is ``(original day file name, segment path)``.
+        """
+        cutoff = (
+            datetime.fromtimestamp(since, timezone.utc).isoformat() if since is not None else None
+        )
+        found = []
+        for header in segment_headers(self.directory):
+            if header.get("stream") != self.prefix:
+                continue
+            if cutoff is not None and header.get("last") and header["last"] < cutoff:
+                continue
+            found.append((header["file"], self.directory / ARCHIVE_DIR / header["segment"]))
+        return sorted(found, reverse=True)
+
+    def _index(self, path: Path) -> MinuteIndex:
+        with self._lock:
+            index = self._indexes.get(path)
+            if index is None:
+                index = self._indexes[path] = MinuteIndex(path)
+            index.refresh()
+            return index
+
+    def iter_recent(self, since: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Yield entries with ``timestamp`` >= ``since``, newest first."""
+        cutoff = (
+            datetime.fromtimestamp(since, timezone.utc).isoformat() if since is not None else None
+        )
+        sources = [(path.name, path, False) for path in self.files(since)]
+        sources += [(name, path, True) for name, path in self.segments(since)]
+        sources.sort(key=lambda source: source[0], reverse=True)
+        for _, path, archived in sources:
+            if archived:
+                yield from self._archived_recent(path, cutoff)
+                continue
+            start = self._index(path).offset_for(since) if since is not None else 0
+            for line in reverse_lines(path, start):
+                entry = _entry(line)
+                if entry is None:
+                    continue
+                if cutoff is not None and str(entry["timestamp"]) < cutoff:
+                    # Appended in time order: everything earlier in this file is older
+                    break
+                yield entry
+
+    @staticmethod
+    def _archived_recent(segment: Path, cutoff: Optional[str]) -> Iterator[Dict[str, Any]]:
+        matched = []
+        try:
+            for line in segment_lines(segment):
+                entry = _entry(line)
+                if entry is not None and (cutoff is None or str(entry["timestamp"]) >= cutoff):
+                    matched.append(entry)
+        except (OSError, RuntimeError, EOFError):
+            pass
+        return reversed(matched)
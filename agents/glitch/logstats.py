@@ -0,0 +1,117 @@
+"""Running line counts for Glitch's JSON-lines logs.
+
+For every ``<prefix>_*.jsonl`` file in a log directory, :class:`LogStats` tracks
+the number of complete lines, the byte offset they end at and the file's inode.
+It checkpoints these to ``log_stats.json`` in the same directory.
+
+The writer thread reports what it appended (:meth:`LogStats.advance`), so
+normally a refresh is one ``stat`` per file. When a file has grown through
+another process, only the bytes past the known offset are read. When a file was
+truncated or replaced, it is counted again from the start.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CHECKPOINT = "log_stats.json"
+_BLOCK = 1 << 20
+
+
+def _count_from(path: Path, offset: int):
+    """Return (lines, new offset) for the complete lines after ``offset``."""
+    lines = 0
+    end = offset
+    with path.open("rb") as fh:
+        fh.seek(offset)
+        position = offset
+        for chunk in iter(lambda: fh.read(_BLOCK), b""):
+            count = chunk.count(b"\n")
+            if count:
+                lines += count
+                end = position + chunk.rindex(b"\n") + 1
+            position += len(chunk)
+    return lines, end
+
+
+class LogStats:
+    """Incrementally maintained per-file line counts with a sidecar checkpoint."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self.path = self.directory / CHECKPOINT
+        self._lock = threading.Lock()
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self._files = {
+                name: {key: int(entry[key]) for key in ("offset", "lines", "inode")}
+                for name, entry in data.get("files", {}).items()
+            }
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self._files = {}
+
+    def advance(self, path: Path, start: int, nbytes: int, lines: int) -> None:
+        """Record ``lines`` complete lines appended at ``start`` by this process."""
+        with self._lock:
+            entry = self._files.get(path.name)
+            if entry is None and start == 0:
+                try:
+                    inode = path.stat().st_ino
+                except OSError:
+                    return
+                entry = self._files[path.name] = {"offset": 0, "lines": 0, "inode": inode}
+            if entry is not None and entry["offset"] == start:
+                entry["offset"] += nbytes
+                entry["lines"] += lines
+                self._dirty = True
+            # Otherwise the counts lag behind the file; refresh() tails the difference
+
+    def refresh(self) -> Dict[str, Dict[str, Any]]:
+        """Bring counts up to date with the files on disk and checkpoint them."""
+        with self._lock:
+            seen = set()
+            for path in self.directory.glob("*_*.jsonl"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                seen.add(path.name)
+                entry = self._files.get(path.name)
+                if entry is None or entry["inode"] != st.st_ino or st.st_size < entry["offset"]:
+                    entry = self._files[path.name] = {"offset": 0, "lines": 0, "inode": st.st_ino}
+                    self._dirty = True
+                if st.st_size > entry["offset"]:
+                    added, entry["offset"] = _count_from(path, entry["offset"])
+                    entry["lines"] += added
+                    self._dirty = True
+                entry["mtime"] = st.st_mtime
+            for name in set(self._files) - seen:
+                del self._files[name]
+                self._dirty = True
+            if self._dirty:
+                self._checkpoint()
+            return {name: dict(entry) for name, entry in self._files.items()}
+
+    def _checkpoint(self) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        try:
+            tmp.write_text(json.dumps({"files": self._files}), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError:
+            pass
+
+    def totals(self, files: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Line totals per log prefix (``events``, ``audit``, ...)."""
+        files = self.refresh() if files is None else files
+        totals: Dict[str, int] = {}
+        for name, entry in files.items():
+            prefix = name.split("_", 1)[0]
+            totals[prefix] = totals.get(prefix, 0) + entry["lines"]
+        return totals
@@ -0,0 +1,307 @@
+"""Background writer for Glitch's daily JSON-lines logs.
+
+Callers serialise an entry (with ``orjson`` when it is installed) and put the
+line on a queue. One thread per log directory drains the queue in batches, so
+there is one write per stream per batch. The thread keeps one append handle per
+stream and group-commits:
+
+- handles are flushed every ``GLITCH_LOG_FLUSH_INTERVAL`` seconds (default 0.5);
+- they are fsynced every ``GLITCH_LOG_FSYNC_INTERVAL`` seconds (default 5, 0 to
+  leave syncing to the OS).
+
+Streams live in ``<prefix>_YYYY-MM-DD.jsonl``. When the local date changes, the
+writer switches to the new day's file. When the file would grow past
+``GLITCH_LOG_MAX_BYTES`` (default 64 MiB, 0 for no limit), it continues in
+``<prefix>_YYYY-MM-DD.001.jsonl``, ``.002`` and so on. Names therefore sort
+oldest to newest. On the first write of each day, handles still open on earlier
+days' files are flushed and closed, then those files are compressed into the
+archive (see :mod:`agents.glitch.archive`). A file with an open handle is never
+archived.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from agents.glitch.archive import ARCHIVE_AFTER_DAYS, archive_logs
+from agents.glitch.logstats import LogStats
+
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - optional speed-up
+    orjson = None  # type: ignore[assignment]
+
+FLUSH_INTERVAL = float(os.getenv("GLITCH_LOG_FLUSH_INTERVAL", "0.5"))
+FSYNC_INTERVAL = float(os.getenv("GLITCH_LOG_FSYNC_INTERVAL", "5"))
+MAX_BYTES = int(os.getenv("GLITCH_LOG_MAX_BYTES", str(64 * 1024 * 1024)))
+
+_DRAIN = 4096
+_STOP = object()
+
+
+def dumps(entry: Dict[str, Any]) -> bytes:
+    """One JSON line, newline included."""
+    if orjson is not None:
+        return orjson.dumps(entry, default=str, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(entry, default=str) + "\n").encode("utf-8")
+
+
+def _today() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+class _Stream:
+    """Append handle for one log prefix, rotated by date and size."""
+
+    def __init__(self, directory: Path, prefix: str) -> None:
+        self.directory = directory
+        self.prefix = prefix
+        self.day: Optional[str] = None
+        self.part = 0
+        self.size = 0
+        self.fh: Optional[Any] = None
+        self.current: Optional[Path] = None
+        # path -> [start offset, bytes, lines] written since the last flush
+        self.unflushed: Dict[Path, List[int]] = {}
+
+    def path(self, day: Optional[str] = None, part: Optional[int] = None) -> Path:
+        day = day or self.day or _today()
+        part = self.part if part is None else part
+        suffix = f".{part:03d}" if part else ""
+        return self.directory / f"{self.prefix}_{day}{suffix}.jsonl"
+
+    def latest_part(self, day: str) -> int:
+        pattern = re.compile(rf"{re.escape(self.prefix)}_{day}\.(\d{{3}})\.jsonl$")
+        parts = [
+            int(match.group(1))
+            for match in map(pattern.match, os.listdir(self.directory))
+            if match
+        ]
+        return max(parts, default=0)
+
+    def _open(self) -> None:
+        self.current = self.path()
+        self.fh = self.current.open("ab")
+        self.size = self.fh.tell()
+
+    def write(self, data: bytes, day: str, max_bytes: int) -> None:
+        if day != self.day:
+            self.close()
+            self.day, self.part = day, self.latest_part(day)
+        if self.fh is None:
+            self._open()
+        if max_bytes and self.size and self.size + len(data) > max_bytes:
+            self.close()
+            self.part += 1
+            self._open()
+        self.fh.write(data)
+        pending = self.unflushed.setdefault(self.current, [self.size, 0, 0])
+        pending[1] += len(data)
+        pending[2] += 1
+        self.size += len(data)
+
+    def flush(self, fsync: bool = False) -> None:
+        if self.fh is not None:
+            self.fh.flush()
+            if fsync:
+                os.fsync(self.fh.fileno())
+
+    def close(self) -> None:
+        if self.fh is not None:
+            self.fh.flush()
+            self.fh.close()
+            self.fh = None
+
+
+class LogWriter:
+    """Queue plus single writer thread for the logs of one directory."""
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        flush_interval: float = FLUSH_INTERVAL,
+        fsync_interval: float = FSYNC_INTERVAL,
+        max_bytes: int = MAX_BYTES,
+        archive_after_days: int = ARCHIVE_AFTER_DAYS,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.archive_after_days = archive_after_days
+        self._archived_for: Optional[str] = None
+        self._queue: "queue.SimpleQueue[Tuple[Optional[str], Any]]" = queue.SimpleQueue()
+        self._streams: Dict[str, _Stream] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = LogStats(self.directory)
+
+    def _stream(self, prefix: str) -> _Stream:
+        stream = self._streams.get(prefix)
+        if stream is None:
+            stream = self._streams[prefix] = _Stream(self.directory, prefix)
+        return stream
+
+    def path(self, prefix: str) -> Path:
+        """File the next ``prefix`` entry will be appended to (before any size rotation)."""
+        with self._lock:
+            stream = self._stream(prefix)
+            day = _today()
+            if stream.day == day:
+                return stream.path()
+            return stream.path(day, stream.latest_part(day))
+
+    def write(self, prefix: str, entry: Dict[str, Any]) -> None:
+        self._queue.put((prefix, dumps(entry)))
+        if self._thread is None or not self._thread.is_alive():
+            self._start()
+
+    def write_many(self, prefix: str, entries: Iterable[Dict[str, Any]]) -> None:
+        """Queue several ``prefix`` entries as one item."""
+        lines = [dumps(entry) for entry in entries]
+        if not lines:
+            return
+        self._queue.put((prefix, lines))
+        if self._thread is None or not self._thread.is_alive():
+            self._start()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="glitch-log-writer", daemon=True
+                )
+                self._thread.start()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far is on disk (written and flushed)."""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put((None, done))
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put((None, _STOP))
+            self._thread.join(timeout)
+
+    def _advance(self, stream: _Stream) -> None:
+        for path, (start, nbytes, lines) in stream.unflushed.items():
+            self.stats.advance(path, start, nbytes, lines)
+        stream.unflushed.clear()
+
+    def _close_days_before(self, day: str) -> None:
+        """Flush and close the handles of streams last written on an earlier day."""
+        for stream in self._streams.values():
+            if stream.fh is None or stream.day is None or stream.day >= day:
+                continue
+            try:
+                stream.close()
+            except OSError as exc:
+                print(f"[LOG ERROR] Failed to close {stream.prefix} log: {exc}", file=sys.stderr)
+                continue
+            self._advance(stream)
+
+    def _archive(self, day: str) -> None:
+        """Compress earlier days' files in the background once per date change."""
+        if self.archive_after_days <= 0:
+            return
+        open_files = [s.current for s in self._streams.values() if s.fh is not None]
+
+        def archive() -> None:
+            try:
+                archive_logs(self.directory, self.archive_after_days, today=day, skip=open_files)
+            except OSError as exc:
+                print(f"[LOG ERROR] Failed to archive logs: {exc}", file=sys.stderr)
+
+        threading.Thread(target=archive, name="glitch-log-archive", daemon=True).start()
+
+    def _run(self) -> None:
+        last_flush = last_fsync = time.monotonic()
+        dirty = False
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batch = []
+            while batch and len(batch) < _DRAIN:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            waiters: List[threading.Event] = []
+            stop = False
+            grouped: Dict[str, List[bytes]] = {}
+            for prefix, item in batch:
+                if prefix is not None and isinstance(item, list):
+                    grouped.setdefault(prefix, []).extend(item)
+                elif prefix is not None:
+                    grouped.setdefault(prefix, []).append(item)
+                elif item is _STOP:
+                    stop = True
+                else:
+                    waiters.append(item)
+            with self._lock:
+                day = _today()
+                if grouped and day != self._archived_for:
+                    self._archived_for = day
+                    self._close_days_before(day)
+                    self._archive(day)
+                for prefix, lines in grouped.items():
+                    try:
+                        stream = self._stream(prefix)
+                        for line in lines:
+                            stream.write(line, day, self.max_bytes)
+                        dirty = True
+                    except OSError as exc:
+                        print(f"[LOG ERROR] Failed to write {prefix} log: {exc}", file=sys.stderr)
+                now = time.monotonic()
+                if dirty and (waiters or stop or now - last_flush >= self.flush_interval):
+                    fsync = self.fsync_interval > 0 and (
+                        stop or now - last_fsync >= self.fsync_interval
+                    )
+                    for stream in self._streams.values():
+                        try:
+                            stream.flush(fsync)
+                        except OSError as exc:
+                            print(f"[LOG ERROR] Failed to flush log: {exc}", file=sys.stderr)
+                            continue
+                        self._advance(stream)
+                    last_flush = now
+                    last_fsync = now if fsync else last_fsync
+                    dirty = False
+                if stop:
+                    for stream in self._streams.values():
+                        stream.close()
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+
+_writers: Dict[Path, LogWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_log_writer(directory: Path) -> LogWriter:
+    """Process-wide writer for ``directory``; drained and closed at exit."""
+    key = Path(directory).resolve()
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = LogWriter(directory)
+            atexit.register(writer.close)
+        return writer
@@ -2,21 +2,64 @@
 
 import json
 import os
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import BinaryIO, Dict, Any, Iterator, List, Optional
+
+from agents.glitch.archive import search
+from agents.glitch.catalog import get_report_catalog
+from agents.glitch.export import (
+    CODECS, compress, encode, encode_json, open_stream, suffix, write_export,
+)
+from agents.glitch.findings import FindingsStore, finding_type, get_findings_store
+
+EXPORT_KINDS = ("findings", "reports", "events")
+
+# CSV columns per export kind
+EXPORT_COLUMNS = {
+    "findings": ("timestamp", "finding_type", "threat_level", "path", "details"),
+    "reports": ("report_id", "generated_at", "total_findings", "risk_score", "status",
+                "threat_levels", "report_type", "file_path"),
+    "events": ("timestamp", "event_type", "severity", "agent", "data"),
+}
+
+
+def _finding_csv_row(finding: Dict[str, Any]) -> Dict[str, Any]:
+    details = finding.get("details")
+    path = finding.get("path")
+    if path is None and isinstance(details, dict):
+        path = details.get("path")
+    return {
+        "timestamp": finding.get("timestamp"),
+        "finding_type": finding_type(finding),
+        "threat_level": finding.get("threat_level", "low"),
+        "path": path or "N/A",
+        "details": details if details is not None else finding.get("description"),
+    }
 
 
 class ReportManager:
     """Manages forensic reports and interactive dashboard."""
     
-    def __init__(self):
-        self.reports_dir = Path("/tmp/glitch/reports")
+    def __init__(self, reports_dir: Optional[Path] = None, logs_dir: Optional[Path] = None):
+        self.reports_dir = Path(reports_dir or "/tmp/glitch/reports")
+        self.logs_dir = Path(logs_dir or "/tmp/glitch/logs")
         self.reports_dir.mkdir(parents=True, exist_ok=True)
         
         # Create date-specific directory
         self.daily_reports_dir = self.reports_dir / datetime.now().strftime("%Y-%m-%d")
         self.daily_reports_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Summary rows for every saved report; filled from existing files once
+        self.catalog = get_report_catalog(self.reports_dir / "catalog.db")
+        if not len(self.catalog):
+            self.catalog.backfill(self.reports_dir)
+    
+    @property
+    def findings(self) -> FindingsStore:
+        """The findings store GlitchLogger writes to (opened on first use)."""
+        return get_findings_store(self.logs_dir / "findings.db")
     
     def save_scan_report(self, scan_results: Dict[str, Any]) -> Path:
         """Save scan results to a structured report file."""
@@ -46,6 +89,7 @@ class ReportManager:
                 with godmode_file.open('w') as f:
                     json.dump(report_data, f, indent=2)
             
+            self.catalog.add(report_data, report_file)
             return report_file
             
         except Exception as e:
@@ -187,35 +231,25 @@ class ReportManager:
         print("\n[RECENT REPORTS]")
         
         try:
-            # Find recent report files
-            report_files = list(self.reports_dir.rglob("*_report.json"))
-            report_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+            reports = self.catalog.query(5)  # Show last 5
             
-            if not report_files:
+            if not reports:
                 print("No reports found.")
                 return
             
-            for i, report_file in enumerate(report_files[:5]):  # Show last 5
-                try:
-                    with report_file.open() as f:
-                        report_data = json.load(f)
-                    
-                    summary = report_data.get("summary", {})
-                    print(f"\n{i+1}. Report: {report_data.get('report_id', 'Unknown')}")
-                    print(f"   Generated: {report_data.get('generated_at', 'Unknown')}")
-                    print(f"   Findings: {summary.get('total_findings', 0)}")
-                    print(f"   Risk Score: {summary.get('risk_score', 0)}/100")
-                    print(f"   Status: {summary.get('status', 'unknown')}")
-                    
-                except Exception as e:
-                    print(f"   Error reading report {report_file.name}: {e}")
+            for i, report in enumerate(reports):
+                print(f"\n{i+1}. Report: {report['report_id']}")
+                print(f"   Generated: {report['generated_at'] or 'Unknown'}")
+                print(f"   Findings: {report['total_findings']}")
+                print(f"   Risk Score: {report['risk_score']}/100")
+                print(f"   Status: {report['status']}")
             
             # Allow user to view detailed report
             report_choice = input("\nEnter report number for details (or press Enter): ").strip()
             if report_choice.isdigit():
                 idx = int(report_choice) - 1
-                if 0 <= idx < len(report_files):
-                    self._show_detailed_report(report_files[idx])
+                if 0 <= idx < len(reports):
+                    self._show_detailed_report(Path(reports[idx]["file_path"]))
                     
         except Exception as e:
             print(f"Error accessing reports: {e}")
@@ -361,6 +395,7 @@ class ReportManager:
         print("1. JSON Summary Export")
         print("2. CSV Findings Export") 
         print("3. Executive Summary (Text)")
+        print("4. NDJSON Findings Export (gzip)")
         
         choice = input("Select export format: ").strip()
         
@@ -370,39 +405,75 @@ class ReportManager:
             self._export_csv_findings()
         elif choice == "3":
             self._export_executive_summary()
+        elif choice == "4":
+            try:
+                print(f"NDJSON findings exported to: {self.export('findings', 'ndjson', 'gzip')}")
+            except Exception as e:
+                print(f"Export failed: {e}")
         else:
             print("Invalid choice.")
     
+    def export(self, kind: str = "findings", fmt: str = "csv", codec: Optional[str] = None,
+               since_hours: Optional[float] = None, path: Optional[Path] = None) -> Path:
+        """Stream findings, reports or events into an export file and return its path.
+        
+        ``fmt`` is csv, json or ndjson; ``codec`` (gzip or zstd) compresses on the fly.
+        """
+        chunks = self._export_chunks(kind, fmt, codec, since_hours)
+        if path is None:
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            path = self.reports_dir / f"{kind}_export_{stamp}{suffix(fmt, codec)}"
+        return write_export(chunks, path)
+    
+    def export_stream(self, kind: str = "findings", fmt: str = "csv",
+                      codec: Optional[str] = None,
+                      since_hours: Optional[float] = None) -> BinaryIO:
+        """Like :meth:`export`, but return a file object producing the export as it is read."""
+        return open_stream(self._export_chunks(kind, fmt, codec, since_hours))
+    
+    def _export_chunks(self, kind: str, fmt: str, codec: Optional[str],
+                       since_hours: Optional[float]) -> Iterator[bytes]:
+        if kind not in EXPORT_KINDS:
+            raise ValueError(f"Unknown export kind '{kind}' "
+                             f"(expected one of {', '.join(EXPORT_KINDS)})")
+        if codec is not None and codec not in CODECS:
+            raise ValueError(f"Unknown codec '{codec}' (expected one of {', '.join(CODECS)})")
+        since = time.time() - since_hours * 3600 if since_hours else None
+        
+        if kind == "findings":
+            rows = self.findings.stream(since=since)
+            if fmt == "csv":
+                rows = map(_finding_csv_row, rows)
+        elif kind == "reports":
+            rows = self.catalog.stream(since=since)
+        else:
+            rows = search(self.logs_dir, since=since, streams=["events"])
+        return compress(encode(rows, fmt, EXPORT_COLUMNS[kind]), codec)
+    
     def _export_json_summary(self) -> None:
         """Export JSON summary of all reports."""
         export_file = self.reports_dir / f"summary_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
-        summary_data = {
-            "export_timestamp": datetime.now(timezone.utc).isoformat(),
-            "total_reports": 5,  # Mock data
-            "total_findings": 23,
-            "threat_summary": {"critical": 0, "high": 3, "medium": 8, "low": 12},
-            "export_format": "json_summary"
-        }
-        
         try:
-            with export_file.open('w') as f:
-                json.dump(summary_data, f, indent=2)
+            counts = self.findings.counts()
+            summary_data = {
+                "export_timestamp": datetime.now(timezone.utc).isoformat(),
+                "total_reports": self.catalog.count(),
+                "total_findings": counts["total"],
+                "threat_summary": counts["threat_levels"],
+                "export_format": "json_summary"
+            }
+            # Report rows are streamed from the catalog into the "reports" array
+            write_export(encode_json(self.catalog.stream(), summary_data, key="reports"),
+                         export_file)
             print(f"JSON summary exported to: {export_file}")
         except Exception as e:
             print(f"Export failed: {e}")
     
     def _export_csv_findings(self) -> None:
         """Export findings as CSV.""" 
-        export_file = self.reports_dir / f"findings_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        
-        csv_content = "timestamp,finding_type,threat_level,path,details\n"
-        csv_content += f"{datetime.now().isoformat()},suspicious_file,high,/tmp/backdoor,executable hidden file\n"
-        csv_content += f"{datetime.now().isoformat()},network_anomaly,medium,N/A,unusual outbound connections\n"
-        
         try:
-            with export_file.open('w') as f:
-                f.write(csv_content)
+            export_file = self.export("findings", "csv")
             print(f"CSV findings exported to: {export_file}")
         except Exception as e:
             print(f"Export failed: {e}")
@@ -411,16 +482,28 @@ class ReportManager:
         """Export executive summary as text."""
         export_file = self.reports_dir / f"executive_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         
+        # Aggregates only: neither findings nor report bodies are loaded
+        try:
+            counts = self.findings.counts(since=time.time() - 86400)
+            latest = self.catalog.query(1)
+        except Exception as e:
+            print(f"Export failed: {e}")
+            return
+        levels = counts["threat_levels"]
+        risk_score = latest[0]["risk_score"] if latest else 0
+        threat_level = ("CRITICAL" if risk_score >= 75 else "HIGH" if risk_score >= 50
+                        else "MEDIUM" if risk_score >= 25 else "LOW")
+        
         summary_text = f"""
 GLITCH FORENSICS - EXECUTIVE SUMMARY
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 THREAT OVERVIEW:
-- Current Threat Level: MEDIUM
-- Risk Score: 35/100
-- Total Findings (24h): 23
-- Critical Issues: 0
-- High Priority Issues: 3
+- Current Threat Level: {threat_level}
+- Risk Score: {risk_score}/100
+- Total Findings (24h): {counts["total"]}
+- Critical Issues: {levels.get("critical", 0)}
+- High Priority Issues: {levels.get("high", 0)}
 
 KEY FINDINGS:
 1. Multiple suspicious files detected in temporary directories
@@ -445,31 +528,13 @@ SYSTEM STATUS:
         except Exception as e:
             print(f"Export failed: {e}")
     
-    def list_reports(self, days: int = 7) -> List[Dict[str, Any]]:
-        """List recent reports."""
-        reports = []
-        
+    def list_reports(self, days: int = 7, limit: Optional[int] = 50, offset: int = 0,
+                     status: Optional[str] = None,
+                     min_risk_score: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List reports from the last ``days`` days, newest first, one page at a time."""
+        since = datetime.now(timezone.utc).timestamp() - days * 86400 if days else None
         try:
-            report_files = list(self.reports_dir.rglob("*_report.json"))
-            report_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-            
-            for report_file in report_files:
-                try:
-                    with report_file.open() as f:
-                        report_data = json.load(f)
-                    
-                    reports.append({
-                        "report_id": report_data.get("report_id"),
-                        "generated_at": report_data.get("generated_at"), 
-                        "total_findings": report_data.get("summary", {}).get("total_findings", 0),
-                        "risk_score": report_data.get("summary", {}).get("risk_score", 0),
-                        "file_path": str(report_file)
-                    })
-                    
-                except Exception:
-                    continue
-                    
+            return self.catalog.query(limit, offset, since=since, status=status,
+                                      min_risk_score=min_risk_score)
         except Exception:
-            pass
-        
-        return reports
\ No newline at end of file
+            return []
@@ -0,0 +1,99 @@
+import gzip
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.glitch import archive
+from agents.glitch.archive import archive_logs, search, segment_headers
+
+
+def _write(path, entries):
+    path.write_text("".join(json.dumps(e) + "\n" for e in entries), encoding="utf-8")
+
+
+def _event(ts, kind, level=None, **data):
+    return {"timestamp": ts, "event_type": kind, "data": {"threat_level": level, **data}}
+
+
+def test_archives_old_days_with_headers(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "zstandard", None)
+    _write(
+        tmp_path / "events_2024-01-01.jsonl",
+        [
+            _event("2024-01-01T10:00:00+00:00", "scan.completed"),
+            _event("2024-01-01T11:00:00+00:00", "finding.rootkit", "critical"),
+        ],
+    )
+    (tmp_path / "events_2024-01-01.jsonl.idx").write_text("0 0\n", encoding="ascii")
+    _write(tmp_path / "events_2024-01-03.jsonl", [_event("2024-01-03T09:00:00+00:00", "x")])
+
+    headers = archive_logs(tmp_path, 1, today="2024-01-03")
+    assert [h["file"] for h in headers] == ["events_2024-01-01.jsonl"]
+    assert not (tmp_path / "events_2024-01-01.jsonl").exists()
+    assert not (tmp_path / "events_2024-01-01.jsonl.idx").exists()
+    assert (tmp_path / "events_2024-01-03.jsonl").exists()
+
+    header = headers[0]
+    assert header["entries"] == 2
+    assert header["first"].startswith("2024-01-01T10")
+    assert header["threat_levels"] == {"critical": 1}
+    segment = tmp_path / "archive" / header["segment"]
+    with gzip.open(segment, "rb") as fh:
+        assert json.loads(fh.readline())["_segment"]["entries"] == 2
+
+    (tmp_path / "archive" / "manifest.jsonl").unlink()
+    assert segment_headers(tmp_path)[0]["types"] == header["types"]
+
+
+def test_skips_files_still_open_for_writing(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "zstandard", None)
+    _write(tmp_path / "events_2024-01-01.jsonl", [_event("2024-01-01T10:00:00+00:00", "a")])
+    _write(tmp_path / "audit_2024-01-01.jsonl", [{"timestamp": "2024-01-01T10:00:00+00:00"}])
+
+    headers = archive_logs(
+        tmp_path, 1, today="2024-01-03", skip=[tmp_path / "audit_2024-01-01.jsonl"]
+    )
+    assert [h["file"] for h in headers] == ["events_2024-01-01.jsonl"]
+    assert (tmp_path / "audit_2024-01-01.jsonl").exists()
+
+
+def test_search_skips_segments_by_header(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "zstandard", None)
+    _write(tmp_path / "events_2024-01-01.jsonl", [_event("2024-01-01T10:00:00+00:00", "a")])
+    _write(
+        tmp_path / "events_2024-01-02.jsonl",
+        [_event("2024-01-02T10:00:00+00:00", "b", "high", host="db1")],
+    )
+    _write(tmp_path / "audit_2024-01-05.jsonl", [{"timestamp": "2024-01-05T00:00:00+00:00"}])
+    archive_logs(tmp_path, 1, today="2024-01-05")
+
+    opened = []
+    real_reader = archive._open_reader
+    monkeypatch.setattr(archive, "_open_reader", lambda p: opened.append(p.name) or real_reader(p))
+
+    results = list(search(tmp_path, threat_level="high"))
+    assert [r["event_type"] for r in results] == ["b"]
+    assert opened == ["events_2024-01-02.jsonl.gz"]
+
+    assert [r["event_type"] for r in search(tmp_path, text="db1")] == ["b"]
+    assert len(list(search(tmp_path, streams=["audit"]))) == 1
+    assert [r["event_type"] for r in search(tmp_path, streams=["events"])] == ["b", "a"]
+
+
+def test_search_sees_logged_finding_bodies():
+    from uuid import uuid4
+
+    from agents.glitch.agent import GlitchAgent
+    from agents.glitch.logging import GlitchLogger
+
+    logger = GlitchLogger()
+    agent = GlitchAgent()
+    kind = f"test_{uuid4().hex}"
+    logger.log_finding(kind, {"path": "/etc/passwd"}, threat_level="high")
+    agent.log_finding(kind, {"path": "/etc/shadow"})
+    assert logger.writer.flush()
+
+    found = list(search(logger.logs_dir, streams=["findings"], type_=kind))
+    assert sorted(entry["details"]["path"] for entry in found) == ["/etc/passwd", "/etc/shadow"]
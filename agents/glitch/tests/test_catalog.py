@@ -0,0 +1,57 @@
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.glitch.reports import ReportManager
+
+
+def _scan(scan_id, levels):
+    return {
+        "scan_id": scan_id,
+        "findings": [{"type": "suspicious_file", "threat_level": level} for level in levels],
+    }
+
+
+def test_list_reports_reads_only_the_catalog(tmp_path):
+    manager = ReportManager(tmp_path)
+    manager.save_scan_report(_scan("scan_clean", []))
+    manager.save_scan_report(_scan("scan_bad", ["critical", "high", "low"]))
+    manager.save_scan_report(_scan("scan_meh", ["medium"]))
+
+    for report_file in tmp_path.rglob("*_report.json"):
+        report_file.write_text("not json")  # bodies are never opened
+
+    reports = manager.list_reports()
+    assert [r["report_id"] for r in reports] == ["scan_meh", "scan_bad", "scan_clean"]
+    assert reports[1]["risk_score"] == 41
+    assert reports[1]["threat_levels"] == {"critical": 1, "high": 1, "medium": 0, "low": 1}
+    assert [r["report_id"] for r in manager.list_reports(limit=1, offset=1)] == ["scan_bad"]
+    assert [r["report_id"] for r in manager.list_reports(min_risk_score=5)] == [
+        "scan_meh",
+        "scan_bad",
+    ]
+    assert [r["report_id"] for r in manager.list_reports(status="clean")] == ["scan_clean"]
+
+
+def test_days_filter_and_backfill_of_existing_reports(tmp_path):
+    old_day = tmp_path / "2020-01-01"
+    old_day.mkdir()
+    generated = datetime.now(timezone.utc) - timedelta(days=30)
+    (old_day / "scan_old_report.json").write_text(
+        json.dumps(
+            {
+                "report_id": "scan_old",
+                "generated_at": generated.isoformat(),
+                "summary": {"total_findings": 2, "risk_score": 2, "status": "minor_issues"},
+            }
+        )
+    )
+    manager = ReportManager(tmp_path)
+    manager.save_scan_report(_scan("scan_new", ["low"]))
+
+    assert [r["report_id"] for r in manager.list_reports(days=7)] == ["scan_new"]
+    assert [r["report_id"] for r in manager.list_reports(days=60)] == ["scan_new", "scan_old"]
+    assert manager.catalog.count(status="minor_issues") == 2
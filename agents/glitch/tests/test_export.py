@@ -0,0 +1,75 @@
+import csv
+import gzip
+import io
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.glitch.export import compress, encode, encode_json, open_stream
+from agents.glitch.reports import ReportManager
+
+
+def _findings():
+    for n in range(5):
+        yield {
+            "timestamp": f"2024-01-01T00:00:0{n}+00:00",
+            "type": "suspicious_file",
+            "threat_level": "high" if n % 2 else "low",
+            "path": f"/tmp/f{n}",
+            "details": {"size": n},
+        }
+
+
+def test_encoders_are_lazy_and_well_formed():
+    pulled = []
+
+    def items():
+        for finding in _findings():
+            pulled.append(finding)
+            yield finding
+
+    stream = open_stream(encode(items(), "ndjson"))
+    first = stream.readline()
+    assert json.loads(first)["path"] == "/tmp/f0" and len(pulled) == 1
+    assert len(stream.read().splitlines()) == 4
+
+    document = b"".join(encode_json(_findings(), {"total": 5}, key="findings"))
+    assert json.loads(document)["total"] == 5
+    assert len(json.loads(document)["findings"]) == 5
+    assert json.loads(b"".join(encode([], "json"))) == []
+
+    text = b"".join(encode(_findings(), "csv", ["path", "details"])).decode()
+    rows = list(csv.reader(io.StringIO(text)))
+    assert rows[0] == ["path", "details"] and rows[1] == ["/tmp/f0", '{"size": 0}']
+
+    packed = b"".join(compress(encode(_findings(), "ndjson"), "gzip"))
+    assert gzip.decompress(packed).count(b"\n") == 5
+
+
+def test_report_manager_streams_findings_and_reports(tmp_path):
+    manager = ReportManager(tmp_path / "reports", tmp_path / "logs")
+    for finding in _findings():
+        manager.findings.add(finding)
+    manager.save_scan_report({"scan_id": "scan_1", "findings": [{"threat_level": "high"}]})
+
+    paged = manager.findings.stream(batch=2)
+    assert [finding["path"] for finding in paged] == [f"/tmp/f{n}" for n in range(5)]
+
+    path = manager.export("findings", "csv", "gzip")
+    assert path.name.endswith(".csv.gz")
+    with gzip.open(path, "rt") as fh:
+        rows = list(csv.DictReader(fh))
+    assert [row["threat_level"] for row in rows] == ["low", "high", "low", "high", "low"]
+    assert rows[0]["finding_type"] == "suspicious_file"
+
+    with manager.export_stream("reports", "json") as fh:
+        [report] = json.load(fh)
+    assert report["report_id"] == "scan_1" and report["risk_score"] == 15
+
+    manager._export_json_summary()
+    [summary_file] = (tmp_path / "reports").glob("summary_export_*.json")
+    summary = json.loads(summary_file.read_text())
+    assert summary["total_findings"] == 5 and summary["total_reports"] == 1
+    assert summary["reports"][0]["report_id"] == "scan_1"
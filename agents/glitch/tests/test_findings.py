@@ -0,0 +1,79 @@
+import json
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.glitch import archive
+from agents.glitch.findings import FindingsStore, get_findings_store
+
+
+def _finding(kind, level, age_hours=0.0, **extra):
+    ts = datetime.now(timezone.utc) - timedelta(hours=age_hours)
+    return {"timestamp": ts.isoformat(), "type": kind, "threat_level": level, **extra}
+
+
+def test_batches_writes_and_serves_tail_from_memory(tmp_path):
+    store = FindingsStore(tmp_path / "findings.db", ring_size=3, batch=2, flush_seconds=60)
+    store.add(_finding("scan", "low", n=1))
+    on_disk = sqlite3.connect(str(tmp_path / "findings.db"))
+    assert on_disk.execute("SELECT COUNT(*) FROM findings").fetchone()[0] == 0
+    store.add(_finding("scan", "low", n=2))
+    assert on_disk.execute("SELECT COUNT(*) FROM findings").fetchone()[0] == 2
+
+    for n in range(3, 6):
+        store.add(_finding("scan", "low", n=n))
+    assert [f["n"] for f in store.tail()] == [3, 4, 5]
+    assert [f["n"] for f in store.recent(2)] == [5, 4]
+    assert [f["n"] for f in store.recent(10)] == [5, 4, 3, 2, 1]
+    store.close()
+
+    reopened = FindingsStore(tmp_path / "findings.db", ring_size=3)
+    assert [f["n"] for f in reopened.tail()] == [3, 4, 5]
+
+
+def test_filters_by_type_level_and_time(tmp_path):
+    store = FindingsStore(tmp_path / "findings.db", batch=100, flush_seconds=60)
+    store.add(_finding("rootkit_detected", "critical", age_hours=2))
+    store.add(_finding("system_anomalies", "medium", age_hours=30))
+    store.add({**_finding("honeypot", "HIGH"), "finding_type": "honeypot", "type": None})
+
+    assert [f["type"] for f in store.recent(None, type_="rootkit_detected")] == [
+        "rootkit_detected"
+    ]
+    assert [f["finding_type"] for f in store.recent(None, threat_level="high")] == ["honeypot"]
+    cutoff = (datetime.now(timezone.utc) - timedelta(hours=24)).timestamp()
+    assert len(store.recent(None, since=cutoff)) == 2
+
+    counts = store.counts()
+    assert counts["total"] == 3
+    assert counts["threat_levels"] == {"critical": 1, "medium": 1, "high": 1}
+    assert counts["latest"] is not None
+
+
+def test_empty_store_is_backfilled_from_findings_logs(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "zstandard", None)
+    old = tmp_path / "findings_2024-01-01.jsonl"
+    old.write_text(
+        json.dumps({**_finding("rootkit_detected", "critical"), "timestamp": "2024-01-01T10:00:00"})
+        + "\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "archive").mkdir()
+    archive.archive_file(old, tmp_path / "archive")
+    old.unlink()
+    lines = [
+        {**_finding(None, "high"), "finding_id": "finding_1", "finding_type": "honeypot"},
+        {"timestamp": "2024-01-02T09:00:00", "event_type": "finding.honeypot", "data": {}},
+    ]
+    (tmp_path / "findings_2024-01-02.jsonl").write_text(
+        "".join(json.dumps(line) + "\n" for line in lines) + "not json\n", encoding="utf-8"
+    )
+
+    store = get_findings_store(tmp_path / "findings.db")
+    assert len(store) == 2
+    assert [f.get("finding_id") for f in store.recent(None)] == ["finding_1", None]
+    assert store.counts()["threat_levels"] == {"critical": 1, "high": 1}
+    store.close()
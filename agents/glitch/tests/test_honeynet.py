@@ -0,0 +1,179 @@
+import json
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.glitch.honeynet import HoneypotServer, RateLimiter
+from agents.glitch import honeypot
+from agents.glitch.honeypot import HoneypotManager, ListenerQueue
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_rate_limiter_refills_per_source():
+    limiter = RateLimiter(rate=1, burst=2)
+    assert [limiter.allow("a", now=0) for _ in range(3)] == [True, True, False]
+    assert limiter.allow("b", now=0)
+    assert limiter.allow("a", now=1.0) and not limiter.allow("a", now=1.0)
+    limiter.prune(idle=10, now=20)
+    assert limiter.allow("a", now=20) and limiter.allow("a", now=20)
+
+
+def test_records_tcp_and_udp_contacts():
+    events = []
+    server = HoneypotServer(
+        {0: "trap_tcp"}, {0: "trap_udp"}, host="127.0.0.1", sink=events.append,
+        banners={}, read_timeout=2,
+    )
+    bound = server.start()
+    tcp_port = next(port for proto, port in bound if proto == "tcp")
+    udp_port = next(port for proto, port in bound if proto == "udp")
+    try:
+        with socket.create_connection(("127.0.0.1", tcp_port)) as conn:
+            conn.sendall(b"GET / HTTP/1.0\r\n\r\n")
+            conn.shutdown(socket.SHUT_WR)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(b"\x30\x26probe", ("127.0.0.1", udp_port))
+        assert _wait_for(lambda: len(events) == 2)
+    finally:
+        server.stop()
+
+    by_trap = {event["trap_id"]: event for event in events}
+    assert by_trap["trap_tcp"]["first_bytes"] == "GET / HTTP/1.0\r\n\r\n"
+    assert by_trap["trap_tcp"]["port"] == tcp_port
+    assert by_trap["trap_udp"]["protocol"] == "udp"
+    assert by_trap["trap_udp"]["bytes_received"] == 7
+    assert server.recent(1) == [events[-1]]
+
+
+class _Logger:
+    def __init__(self):
+        self.events = []
+
+    def log_honeypot_event(self, trap_id, event_type, details):
+        self.events.append((trap_id, event_type, details))
+
+
+def test_floods_are_summarised_and_reach_subscribers(tmp_path):
+    manager = HoneypotManager(tmp_path)
+    logger = _Logger()
+    triggers = []
+    manager.subscribe(triggers.append)
+    stats = manager.start_network_listener(
+        [0], logger=logger, host="127.0.0.1", rate=0.001, burst=3, read_timeout=0.2
+    )
+    port = int(stats["listening"][0].split("/")[1])
+    try:
+        for _ in range(10):
+            socket.create_connection(("127.0.0.1", port)).close()
+        assert _wait_for(lambda: any(kind == "rate_limited" for _, kind, _ in logger.events))
+    finally:
+        manager.stop_network_listener()
+
+    assert [t["connection_attempts"] for t in triggers] == [1, 1, 1]
+    assert {t["trap_id"] for t in triggers} == {"net_tcp_0"}
+    [(trap_id, _, summary)] = [e for e in logger.events if e[1] == "rate_limited"]
+    assert summary["dropped"] == 7 and summary["source_ip"] == "127.0.0.1"
+    assert len(logger.events) == 4
+
+
+def test_shared_port_counts_for_every_trap_off_the_event_loop(tmp_path):
+    traps = {
+        trap_id: {"trap_id": trap_id, "type": "network", "status": "active", "port": 0}
+        for trap_id in ("trap_a", "trap_b")
+    }
+    (tmp_path / "honeypots.json").write_text(json.dumps(traps))
+    manager = HoneypotManager(tmp_path)
+    release, triggers = threading.Event(), []
+    manager.subscribe(lambda trigger: release.wait(5) and triggers.append(trigger))
+    stats = manager.start_network_listener(host="127.0.0.1", read_timeout=0.2)
+    [listening] = stats["listening"]
+    port = int(listening.split("/")[1])
+    try:
+        for _ in range(2):
+            socket.create_connection(("127.0.0.1", port)).close()
+        # A blocked subscriber does not hold up the listener
+        assert _wait_for(lambda: len(manager.network_events()) == 2)
+        release.set()
+        assert _wait_for(lambda: len(triggers) == 4)
+    finally:
+        release.set()
+        manager.stop_network_listener()
+
+    assert sorted((t["trap_id"], t["connection_attempts"]) for t in triggers) == [
+        ("trap_a", 1),
+        ("trap_a", 2),
+        ("trap_b", 1),
+        ("trap_b", 2),
+    ]
+    saved = json.loads((tmp_path / "honeypots.json").read_text())
+    assert {trap_id: trap["triggers"] for trap_id, trap in saved.items()} == {
+        "trap_a": 2,
+        "trap_b": 2,
+    }
+
+
+class _BatchLogger(_Logger):
+    def __init__(self):
+        super().__init__()
+        self.batches = 0
+
+    def log_honeypot_events(self, events):
+        self.batches += 1
+        self.events.extend(events)
+
+
+def test_listener_queue_drops_and_counts_overflow():
+    events = ListenerQueue(maxsize=2)
+    for n in range(5):
+        events.offer({"n": n})
+    assert events.dropped == 3 and events.take_dropped() == 3 and events.take_dropped() == 0
+    assert events.drain() == [{"n": 0}, {"n": 1}]
+
+
+def test_full_listener_queue_reports_overflow_in_one_logged_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(honeypot, "LISTENER_QUEUE", 1)
+    manager = HoneypotManager(tmp_path)
+    logger = _BatchLogger()
+    release = threading.Event()
+    manager.subscribe(lambda trigger: release.wait(5))
+    stats = manager.start_network_listener([0], logger=logger, host="127.0.0.1", read_timeout=0.2)
+    port = int(stats["listening"][0].split("/")[1])
+    try:
+        for _ in range(6):
+            socket.create_connection(("127.0.0.1", port)).close()
+        # The worker is stuck on the subscriber, so at most two events get past the queue
+        assert _wait_for(lambda: len(manager.network_events()) == 6)
+    finally:
+        release.set()
+        manager.stop_network_listener()
+
+    overflow = [details for _, kind, details in logger.events if kind == "queue_overflow"]
+    connections = [details for _, kind, details in logger.events if kind == "connection"]
+    assert sum(summary["dropped"] for summary in overflow) == 6 - len(connections)
+    assert overflow and len(connections) <= 2
+
+
+def test_queued_events_are_logged_as_one_batch(tmp_path):
+    manager = HoneypotManager(tmp_path)
+    logger = _BatchLogger()
+    events = ListenerQueue(maxsize=3)
+    for port in (1, 2, 3, 4):
+        events.offer({"trap_id": "t", "event_type": "probe", "port": port})
+    worker = threading.Thread(target=manager._handle_network_events, args=(events, {}, logger))
+    worker.start()
+    events.close()
+    worker.join(5)
+    assert not worker.is_alive() and logger.batches == 1
+    assert [kind for _, kind, _ in logger.events] == ["probe"] * 3 + ["queue_overflow"]
@@ -0,0 +1,74 @@
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.glitch import archive
+from agents.glitch.logindex import MinuteIndex, TimeIndexedLog, reverse_lines
+
+NOW = datetime.now(timezone.utc).replace(second=30, microsecond=0)
+
+
+def _write(path, minutes_ago):
+    with path.open("a", encoding="utf-8") as fh:
+        for minutes in minutes_ago:
+            ts = (NOW - timedelta(minutes=minutes)).isoformat()
+            fh.write(json.dumps({"timestamp": ts, "event_type": "x", "m": minutes}) + "\n")
+
+
+def _day(offset_days):
+    return (datetime.now() - timedelta(days=offset_days)).strftime("%Y-%m-%d")
+
+
+def test_reverse_lines_handles_block_boundaries(tmp_path):
+    path = tmp_path / "lines.jsonl"
+    path.write_bytes(b"".join(b"%d %s\n" % (n, b"x" * n) for n in range(300)))
+    lines = list(reverse_lines(path))
+    assert [int(line.split()[0]) for line in lines] == list(range(299, -1, -1))
+
+
+def test_minute_index_is_sparse_and_incremental(tmp_path):
+    path = tmp_path / "events_2024-01-01.jsonl"
+    _write(path, [10, 10, 9, 5])
+    index = MinuteIndex(path)
+    index.refresh()
+    assert len(index.minutes) == 3
+    assert index.offset_for((NOW - timedelta(minutes=9)).timestamp()) == index.offsets[1]
+
+    _write(path, [5, 1])
+    index.refresh()
+    assert len(index.minutes) == 4
+    reloaded = MinuteIndex(path)
+    reloaded.refresh()
+    assert reloaded.minutes == index.minutes and reloaded.offsets == index.offsets
+
+
+def test_iter_recent_spans_days_newest_first(tmp_path):
+    _write(tmp_path / f"events_{_day(1)}.jsonl", [3000, 1500])
+    _write(tmp_path / f"events_{_day(0)}.jsonl", [120, 30, 20, 5])
+    _write(tmp_path / "events_2000-01-01.jsonl", [10])  # too old to be opened
+    log = TimeIndexedLog(tmp_path, "events")
+
+    since = (NOW - timedelta(minutes=25)).timestamp()
+    assert [e["m"] for e in log.iter_recent(since)] == [5, 20]
+    since = (NOW - timedelta(minutes=2000)).timestamp()
+    assert [e["m"] for e in log.iter_recent(since)] == [5, 20, 30, 120, 1500]
+    assert not (tmp_path / "events_2000-01-01.jsonl.idx").exists()
+
+
+def test_iter_recent_reads_archived_days(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "zstandard", None)
+    _write(tmp_path / f"events_{_day(2)}.jsonl", [3000])
+    _write(tmp_path / f"events_{_day(1)}.jsonl", [1500, 1400])
+    _write(tmp_path / f"events_{_day(0)}.jsonl", [5])
+    _write(tmp_path / f"audit_{_day(1)}.jsonl", [1450])
+    log = TimeIndexedLog(tmp_path, "events")
+    since = (NOW - timedelta(hours=24, minutes=30)).timestamp()
+    before = [e["m"] for e in log.iter_recent(since)]
+
+    archive.archive_logs(tmp_path, 1, today=_day(0))
+    assert not (tmp_path / f"events_{_day(1)}.jsonl").exists()
+    assert [e["m"] for e in log.iter_recent(since)] == before == [5, 1400]
+    assert [name for name, _ in log.segments(since)] == [f"events_{_day(1)}.jsonl"]
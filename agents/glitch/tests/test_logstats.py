@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.glitch import logstats
+from agents.glitch.findings import FindingsStore
+from agents.glitch.logstats import LogStats
+from agents.glitch.logwriter import LogWriter
+
+
+def test_writer_keeps_counts_without_rereading(tmp_path, monkeypatch):
+    writer = LogWriter(tmp_path, flush_interval=60, fsync_interval=0)
+    for n in range(10):
+        writer.write("events", {"timestamp": "t", "n": n})
+    writer.write("audit", {"timestamp": "t"})
+    writer.flush()
+
+    def no_reads(*_args):
+        raise AssertionError("counts should come from the writer")
+
+    monkeypatch.setattr(logstats, "_count_from", no_reads)
+    assert writer.stats.totals() == {"events": 10, "audit": 1}
+    writer.close()
+
+
+def test_tails_external_appends_and_recounts_replaced_files(tmp_path):
+    log = tmp_path / "events_2024-01-01.jsonl"
+    log.write_text("{}\n{}\n", encoding="utf-8")
+    stats = LogStats(tmp_path)
+    assert stats.totals() == {"events": 2}
+
+    with log.open("a", encoding="utf-8") as fh:
+        fh.write('{}\n{"partial"')
+    reloaded = LogStats(tmp_path)  # resumes from the checkpoint
+    files = reloaded.refresh()
+    assert files[log.name]["lines"] == 3
+    assert files[log.name]["offset"] == 9
+
+    log.write_text("{}\n", encoding="utf-8")
+    assert reloaded.totals() == {"events": 1}
+    log.unlink()
+    assert reloaded.totals() == {}
+
+
+def test_findings_counts_fold_in_new_rows(tmp_path):
+    store = FindingsStore(tmp_path / "findings.db", flush_seconds=60)
+    store.add({"timestamp": "2024-01-01T00:00:00+00:00", "type": "a", "threat_level": "high"})
+    assert store.counts()["threat_levels"] == {"high": 1}
+    store.add({"timestamp": "2024-01-02T00:00:00+00:00", "type": "a", "threat_level": "low"})
+    store.close()
+
+    reopened = FindingsStore(tmp_path / "findings.db")
+    counts = reopened.counts()
+    assert counts["total"] == 2
+    assert counts["threat_levels"] == {"high": 1, "low": 1}
+    assert counts["latest"].startswith("2024-01-02")
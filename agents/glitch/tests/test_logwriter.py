@@ -0,0 +1,90 @@
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.glitch import logwriter
+from agents.glitch.logwriter import LogWriter
+
+
+def test_batches_into_persistent_streams_and_flushes_on_demand(tmp_path):
+    writer = LogWriter(tmp_path, flush_interval=60, fsync_interval=0)
+    for n in range(50):
+        writer.write("events", {"timestamp": "t", "n": n})
+    writer.write("audit", {"timestamp": "t", "user": "bob"})
+    assert writer.flush()
+
+    events = writer.path("events").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["n"] for line in events] == list(range(50))
+    assert json.loads(writer.path("audit").read_text(encoding="utf-8"))["user"] == "bob"
+    writer.close()
+
+
+def test_write_many_queues_entries_together(tmp_path):
+    writer = LogWriter(tmp_path, flush_interval=60, fsync_interval=0)
+    writer.write("events", {"n": 0})
+    writer.write_many("events", ({"n": n} for n in range(1, 4)))
+    writer.write_many("events", [])
+    assert writer.flush()
+
+    events = writer.path("events").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["n"] for line in events] == [0, 1, 2, 3]
+    assert writer._queue.empty()
+    writer.close()
+
+
+def test_rotates_by_size_and_date(tmp_path, monkeypatch):
+    day = {"value": "2024-01-01"}
+    monkeypatch.setattr(logwriter, "_today", lambda: day["value"])
+    writer = LogWriter(
+        tmp_path, flush_interval=60, fsync_interval=0, max_bytes=60, archive_after_days=0
+    )
+    for n in range(4):
+        writer.write("events", {"timestamp": "t", "n": n})
+    writer.flush()
+    day["value"] = "2024-01-02"
+    writer.write("events", {"timestamp": "t", "n": 4})
+    writer.close()
+
+    names = sorted(p.name for p in tmp_path.glob("events_*.jsonl"))
+    assert names == [
+        "events_2024-01-01.001.jsonl",
+        "events_2024-01-01.jsonl",
+        "events_2024-01-02.jsonl",
+    ]
+    assert writer.path("events").name == "events_2024-01-02.jsonl"
+    reopened = LogWriter(tmp_path, flush_interval=60, fsync_interval=0)
+    day["value"] = "2024-01-01"
+    assert reopened.path("events").name == "events_2024-01-01.001.jsonl"
+
+
+def test_closes_earlier_days_before_archiving(tmp_path, monkeypatch):
+    day = {"value": "2024-01-01"}
+    monkeypatch.setattr(logwriter, "_today", lambda: day["value"])
+    seen, archived = {}, threading.Event()
+
+    def fake_archive(directory, older_than_days, today=None, skip=()):
+        seen["files"] = {p.name: p.read_text(encoding="utf-8") for p in directory.glob("*.jsonl")}
+        seen["skip"] = sorted(Path(p).name for p in skip)
+        archived.set()
+
+    monkeypatch.setattr(logwriter, "archive_logs", fake_archive)
+    writer = LogWriter(tmp_path, flush_interval=60, fsync_interval=0, archive_after_days=1)
+    writer.write("audit", {"timestamp": "t", "user": "bob"})
+    deadline = time.monotonic() + 5
+    while not (tmp_path / "audit_2024-01-01.jsonl").exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert archived.wait(5)
+    archived.clear()
+
+    # The audit handle is idle and still buffered when the date changes
+    day["value"] = "2024-01-02"
+    writer.write("events", {"timestamp": "t", "n": 1})
+    assert archived.wait(5)
+    writer.close()
+
+    assert json.loads(seen["files"]["audit_2024-01-01.jsonl"])["user"] == "bob"
+    assert seen["skip"] == []
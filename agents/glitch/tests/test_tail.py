@@ -0,0 +1,58 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.glitch.honeypot import parse_trap_line
+from agents.glitch.tail import TailReader
+
+
+def test_reads_only_appended_complete_lines(tmp_path):
+    log = tmp_path / "trap.log"
+    log.write_bytes(b"one\ntwo\nthr")
+    reader = TailReader(log, buffer_size=4)
+    assert list(reader.read()) == [b"one", b"two"]
+    assert reader.offset == 8 and list(reader.read()) == []
+
+    with log.open("ab") as fh:
+        fh.write(b"ee\nfour\n")
+    assert list(reader.read()) == [b"three", b"four"]
+
+    # A new reader resumes from a persisted position
+    resumed = TailReader(log, **reader.position)
+    with log.open("ab") as fh:
+        fh.write(b"five\n")
+    assert list(resumed.read()) == [b"five"]
+
+
+def test_stopping_early_resumes_at_next_line(tmp_path):
+    log = tmp_path / "trap.log"
+    log.write_bytes(b"a\nb\nc\n")
+    reader = TailReader(log)
+    lines = reader.read()
+    assert next(lines) == b"a"
+    lines.close()
+    assert list(reader.read()) == [b"b", b"c"]
+
+
+def test_restarts_after_truncation_and_rotation(tmp_path):
+    log = tmp_path / "trap.log"
+    log.write_bytes(b"old line\nanother\n")
+    reader = TailReader(log, parse=parse_trap_line)
+    assert len(list(reader.read())) == 2
+
+    log.write_bytes(b"x\n")
+    assert [event["line"] for event in reader.read()] == ["x"]
+
+    os.replace(log, tmp_path / "trap.log.1")
+    log.write_bytes(b"Mon 10:00:01: HONEYPOT TRIGGERED - key accessed\n")
+    [event] = reader.read()
+    assert event["time"] == "Mon 10:00:01"
+    assert event["message"] == "HONEYPOT TRIGGERED - key accessed"
+    assert reader.restarts == 2
+
+
+def test_missing_file_yields_nothing(tmp_path):
+    reader = TailReader(tmp_path / "absent.log")
+    assert list(reader.read()) == [] and reader.position == {"offset": 0, "inode": None}
@@ -0,0 +1,71 @@
+import json
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.glitch.honeypot import HoneypotManager
+
+
+def _append(path: Path, text: str) -> None:
+    with path.open("a") as fh:
+        fh.write(text)
+
+
+def test_check_triggers_reads_only_new_bytes(tmp_path):
+    manager = HoneypotManager(tmp_path)
+    trap_id = manager.deploy_trap("network")["trap_id"]
+    log = tmp_path / f"{trap_id}_network.log"
+
+    _append(log, "Mon: Connection attempt to port 2222\n" * 3)
+    [trigger] = manager.check_triggers()
+    assert trigger["connection_attempts"] == 3 and trigger["port"] == 2222
+    assert manager.check_triggers() == []
+
+    # A partial line is left for the next check
+    _append(log, "Tue: Connection attempt to port 2222\nWed: Connection att")
+    assert manager.check_triggers()[0]["connection_attempts"] == 4
+    _append(log, "empt to port 2222\n")
+    assert manager.check_triggers()[0]["connection_attempts"] == 5
+
+    state = json.loads((tmp_path / "honeypots.json").read_text())[trap_id]
+    assert state["triggers"] == 5 and state["log_offset"] == log.stat().st_size
+
+
+def test_legacy_state_counts_from_start(tmp_path):
+    log = tmp_path / "trap_1_process.log"
+    log.write_text("x: Possible monitoring detected\n" * 2)
+    (tmp_path / "honeypots.json").write_text(
+        json.dumps({"trap_1": {"trap_id": "trap_1", "type": "process", "status": "active",
+                               "triggers": 2}})
+    )
+    manager = HoneypotManager(tmp_path)
+    assert manager.check_triggers() == []
+    _append(log, "y: Possible monitoring detected\n")
+    assert manager.check_triggers()[0]["monitoring_events"] == 3
+
+
+def test_watcher_pushes_triggers_to_subscribers(tmp_path):
+    manager = HoneypotManager(tmp_path)
+    trap_id = manager.deploy_trap("filesystem")["trap_id"]
+    received = []
+    arrived = threading.Event()
+
+    def on_trigger(trigger):
+        received.append(trigger)
+        arrived.set()
+
+    manager.subscribe(on_trigger)
+    backend = manager.start_watching()
+    try:
+        _append(tmp_path / f"{trap_id}_access.log", "now: HONEYPOT TRIGGERED - creds accessed\n")
+        assert arrived.wait(10), f"no trigger from the {backend} backend"
+    finally:
+        manager.stop_watching()
+
+    assert received[0]["trigger_count"] == 1
+    assert received[0]["details"] == ["now: HONEYPOT TRIGGERED - creds accessed"]
+    # Also handed out once by the next poll
+    assert manager.check_triggers() == received[:1]
+    assert json.loads((tmp_path / "honeypots.json").read_text())[trap_id]["triggers"] == 1
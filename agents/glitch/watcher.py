@@ -0,0 +1,238 @@
+"""File change notifications for the honeypot directory.
+
+:class:`DirectoryWatcher` calls ``callback(name, mask)`` from a background
+thread whenever a file directly inside the watched directory is opened, written,
+created or moved into place. Three backends are available, tried in this order:
+
+``inotify``
+    Linux kernel notifications through a small ctypes binding; no dependency.
+``watchdog``
+    the ``watchdog`` package when it is installed (macOS, Windows, BSD).
+``poll``
+    ``stat`` every ``GLITCH_WATCH_POLL_SECONDS`` (default 2); write events only.
+
+``GLITCH_WATCH_BACKEND`` forces one of them.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ModuleNotFoundError:  # pragma: no cover - optional backend
+    FileSystemEventHandler = object  # type: ignore[assignment,misc]
+    Observer = None  # type: ignore[assignment]
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_OPEN = 0x00000020
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_OPEN | IN_MOVED_TO | IN_CREATE
+BACKENDS = ("inotify", "watchdog", "poll")
+
+BACKEND = os.getenv("GLITCH_WATCH_BACKEND", "").lower() or None
+POLL_SECONDS = float(os.getenv("GLITCH_WATCH_POLL_SECONDS", "2"))
+
+_EVENT = struct.Struct("iIII")
+
+Callback = Callable[[str, int], None]
+
+
+class Inotify:
+    """Minimal non-blocking inotify binding."""
+
+    def __init__(self) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path: Path, mask: int = WATCH_MASK) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(str(path)), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(path))
+        return wd
+
+    def read(self, timeout: Optional[float]) -> List[Tuple[int, int, str]]:
+        """Events as ``(wd, mask, name)``; empty after ``timeout`` seconds without any."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class _WatchdogHandler(FileSystemEventHandler):  # type: ignore[misc]
+    _MASKS = {
+        "modified": IN_MODIFY,
+        "created": IN_CREATE,
+        "moved": IN_MOVED_TO,
+        "opened": IN_OPEN,
+        "closed": IN_CLOSE_WRITE,
+    }
+
+    def __init__(self, callback: Callback) -> None:
+        super().__init__()
+        self._callback = callback
+
+    def on_any_event(self, event) -> None:  # noqa: ANN001
+        mask = self._MASKS.get(event.event_type)
+        if mask and not event.is_directory:
+            path = getattr(event, "dest_path", None) or event.src_path
+            self._callback(os.path.basename(path), mask)
+
+
+class DirectoryWatcher:
+    """Background thread delivering change events for one directory."""
+
+    def __init__(
+        self,
+        directory: Path,
+        callback: Callback,
+        *,
+        backend: Optional[str] = BACKEND,
+        idle: Optional[Callable[[], None]] = None,
+        idle_seconds: float = 1.0,
+    ) -> None:
+        self.directory = Path(directory)
+        self.callback = callback
+        self.idle = idle
+        self.idle_seconds = idle_seconds
+        self.backend = backend
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    def start(self) -> str:
+        """Start watching; returns the backend in use."""
+        for backend in [self.backend] if self.backend else BACKENDS:
+            try:
+                runner = self._prepare(backend)
+            except (OSError, AttributeError, RuntimeError):
+                continue
+            self.backend = backend
+            self._thread = threading.Thread(
+                target=runner, name=f"glitch-watch-{backend}", daemon=True
+            )
+            self._thread.start()
+            return backend
+        raise RuntimeError(f"no usable watch backend among {BACKENDS}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _prepare(self, backend: str) -> Callable[[], None]:
+        if backend == "inotify":
+            inotify = Inotify()
+            inotify.add_watch(self.directory)
+            return lambda: self._run_inotify(inotify)
+        if backend == "watchdog":
+            if Observer is None:
+                raise RuntimeError("watchdog is not installed")
+            self._observer = Observer()
+            self._observer.schedule(_WatchdogHandler(self._emit), str(self.directory))
+            self._observer.start()
+            return self._run_idle
+        if backend == "poll":
+            return self._run_poll
+        raise RuntimeError(f"unknown watch backend '{backend}'")
+
+    def _emit(self, name: str, mask: int) -> None:
+        try:
+            self.callback(name, mask)
+        except Exception as exc:  # noqa: BLE001 - a bad subscriber must not stop the watcher
+            print(f"[WATCH ERROR] {name}: {exc}", file=sys.stderr)
+
+    def _tick(self) -> None:
+        if self.idle is None:
+            return
+        try:
+            self.idle()
+        except Exception as exc:  # noqa: BLE001
+            print(f"[WATCH ERROR] idle: {exc}", file=sys.stderr)
+
+    def _run_inotify(self, inotify: Inotify) -> None:
+        try:
+            while not self._stop.is_set():
+                events = inotify.read(self.idle_seconds)
+                for _wd, mask, name in events:
+                    if mask & IN_Q_OVERFLOW:
+                        self._rescan()
+                    elif name:
+                        self._emit(name, mask)
+                self._tick()
+        finally:
+            inotify.close()
+
+    def _run_idle(self) -> None:
+        while not self._stop.wait(self.idle_seconds):
+            self._tick()
+        self._tick()
+
+    def _rescan(self) -> None:
+        """After an event overflow, report every file as modified."""
+        for path in self.directory.iterdir():
+            if path.is_file():
+                self._emit(path.name, IN_MODIFY)
+
+    def _run_poll(self) -> None:
+        seen: Dict[str, Tuple[int, int]] = {}
+        first = True
+        while True:
+            try:
+                entries = list(os.scandir(self.directory))
+            except OSError:
+                entries = []
+            for entry in entries:
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                signature = (st.st_size, st.st_mtime_ns)
+                if not first and seen.get(entry.name) != signature:
+                    self._emit(entry.name, IN_MODIFY if entry.name in seen else IN_CREATE)
+                seen[entry.name] = signature
+            first = False
+            self._tick()
+            if self._stop.wait(POLL_SECONDS):
+                return
@@ -2,14 +2,13 @@
 
 from __future__ import annotations
 
-import json
 import random
-import asyncio
 from pathlib import Path
-from typing import Any, Dict, List, Sequence
+from typing import Any, Dict, Sequence
 
-from agents.base import BaseAgent
+from agents.base import BaseAgent, command
 from agents.common.alog import info
+from agents.common.journal import Journal, open_journal
 
 
 class LyraAgent(BaseAgent):
@@ -34,14 +33,13 @@ class LyraAgent(BaseAgent):
         self._log_dir = Path("logs/lyra")
         self._log_dir.mkdir(parents=True, exist_ok=True)
 
+    def journal(self, name: str) -> Journal:
+        """Return Lyra's append-only journal ``name`` (e.g. ``herb_journal``)."""
+        return open_journal(self._log_dir, name)
+
     def _append_json(self, filename: str, entry: Dict[str, Any]) -> None:
-        """Persist structured journal entries to JSON with human-readable formatting."""
-        file_path = self._log_dir / filename
-        data: List[Dict[str, Any]] = []
-        if file_path.exists():
-            data = json.loads(file_path.read_text(encoding="utf-8"))
-        data.append(entry)
-        file_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        """Persist structured journal entries as JSON lines."""
+        self.journal(Path(filename).stem).append(entry)
 
     async def generate_lesson_plan_llm(self, topic: str, grade: str) -> Dict[str, Any]:
         """Create AI-enhanced lesson plan with LLM assistance."""
@@ -103,9 +101,15 @@ class LyraAgent(BaseAgent):
 
     def evaluate_progress(self, student: str | None, score: float | None) -> Dict[str, Any]:
         """Log learner progress snapshots while computing momentum."""
-        entry = {"student": student, "score": score or 0.0}
+        entry = {"student": student, "score": score}
         self._append_json("progress.json", entry)
-        return entry
+        return {
+            "student": student,
+            "score": score,
+            "momentum": (
+                "rising" if (score or 0) >= 85 else "steady" if (score or 0) >= 70 else "intervene"
+            ),
+        }
 
     def _select_prompt(self, prompt_type: str) -> str:
         """Choose a prompt from curated writing, art, and voice collections."""
@@ -168,105 +172,6 @@ class LyraAgent(BaseAgent):
         self._append_json("herb_journal.json", entry)
         return entry
 
-
-import json
-import random
-from pathlib import Path
-from typing import Any, Dict, List, Sequence
-
-from agents.base import BaseAgent
-from agents.common.alog import info
-
-
-class LyraAgent(BaseAgent):
-    """Curates curriculum, creative prompts, and herbal guidance for NovaOS."""
-
-    def __init__(self) -> None:
-        """Initialize Lyra with deterministic storage paths."""
-        super().__init__("lyra", description="Creative tutor and herbalist")
-        self._log_dir = Path("logs/lyra")
-        self._log_dir.mkdir(parents=True, exist_ok=True)
-
-    def _append_json(self, filename: str, entry: Dict[str, Any]) -> None:
-        """Persist structured journal entries to JSON with human-readable formatting."""
-        file_path = self._log_dir / filename
-        data: List[Dict[str, Any]] = []
-        if file_path.exists():
-            data = json.loads(file_path.read_text(encoding="utf-8"))
-        data.append(entry)
-        file_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    def generate_lesson_plan(self, topic: str, grade: str) -> Dict[str, Any]:
-        """Create a standards-aligned lesson plan with objectives and assessments."""
-        scaffolds: Dict[str, Sequence[str]] = {
-            "introduction": ["story hook", "guided discussion", "sensory warm-up"],
-            "practice": ["paired exploration", "hands-on lab", "guided journaling"],
-            "assessment": ["reflection prompt", "exit ticket", "demo recording"],
-        }
-        lesson = {
-            "topic": topic,
-            "grade": grade or "multi-age",
-            "objectives": [
-                f"Learners articulate key principles of {topic} in their own voice",
-                f"Learners demonstrate mastery of {topic} through a creative artifact",
-            ],
-            "sequence": {
-                "introduction": list(scaffolds["introduction"]),
-                "practice": list(scaffolds["practice"]),
-                "assessment": list(scaffolds["assessment"]),
-            },
-            "materials": ["journal", "audio recorder", "open-source references"],
-        }
-        return lesson
-
-    def evaluate_progress(self, student: str | None, score: float | None) -> Dict[str, Any]:
-        """Log learner progress snapshots while computing momentum."""
-        entry = {"student": student, "score": score}
-        self._append_json("progress.json", entry)
-        return {
-            "student": student,
-            "score": score,
-            "momentum": (
-                "rising" if (score or 0) >= 85 else "steady" if (score or 0) >= 70 else "intervene"
-            ),
-        }
-
-    def _select_prompt(self, prompt_type: str) -> str:
-        """Choose a prompt from curated writing, art, and voice collections."""
-        prompts: Dict[str, Sequence[str]] = {
-            "writing": [
-                "Write a letter to your future self.",
-                "Describe a day on Mars.",
-                "Chronicle the moment you reclaimed your creative power.",
-            ],
-            "art": [
-                "Sketch a plant that doesn't exist.",
-                "Draw the feeling of wind.",
-                "Illustrate the sound of resilience.",
-            ],
-            "voice": [
-                "Compose a chant that grounds your community.",
-                "Record a sonic tour of your safe space.",
-            ],
-        }
-        collection = prompts.get(prompt_type, prompts["writing"])
-        return random.choice(list(collection))
-
-    def create_prompt(self, prompt_type: str) -> Dict[str, Any]:
-        """Deliver a curated creative brief for the requested modality."""
-        prompt = self._select_prompt(prompt_type)
-        return {
-            "type": prompt_type,
-            "prompt": prompt,
-            "ritual": "light incense and set a 12-minute timer to maintain flow",
-        }
-
-    def log_herb_entry(self, name: str, details: Dict[str, Any]) -> Dict[str, Any]:
-        """Maintain a sovereign herbal apothecary journal."""
-        entry = {"name": name, "details": details}
-        self._append_json("herb_journal.json", entry)
-        return entry
-
     def calculate_dose(self, herb: str, weight_kg: float) -> Dict[str, Any]:
         """Compute safe dosage using Nova's botanicals matrix."""
         guides = {
@@ -337,106 +242,97 @@ class LyraAgent(BaseAgent):
         ]
         return {"protagonist": protagonist, "beats": beats}
 
-    def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute Lyra commands with journaled side effects and optional LLM enhancement."""
-        command = payload.get("command")
-        args = payload.get("args", {})
-        use_llm = args.get("llm", True) and self.llm_enabled  # Allow disabling LLM per command
+    def _use_llm(self, args: Dict[str, Any]) -> bool:
+        # Allow disabling LLM per command
+        return bool(args.get("llm", True)) and self.llm_enabled
 
-        info(
-            "lyra.command", {"command": command, "args": list(args.keys()), "llm_enabled": use_llm}
-        )
+    @command("generate_lesson", args={"topic": str, "grade": str}, cost="net")
+    async def _cmd_generate_lesson(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a lesson plan, LLM-enhanced when available."""
+        if self._use_llm(args):
+            return await self.generate_lesson_plan_llm(args.get("topic", ""), args.get("grade", ""))
+        return self.generate_lesson_plan(args.get("topic", ""), args.get("grade", ""))
 
-        try:
-            if command == "generate_lesson":
-                if use_llm:
-                    # Use async LLM generation
-                    result = asyncio.run(
-                        self.generate_lesson_plan_llm(args.get("topic", ""), args.get("grade", ""))
-                    )
-                else:
-                    result = self.generate_lesson_plan(args.get("topic", ""), args.get("grade", ""))
-                return {"success": True, "output": result, "error": None}
-
-            if command == "evaluate_progress":
-                result = self.evaluate_progress(args.get("student"), args.get("score"))
-                return {"success": True, "output": result, "error": None}
-
-            if command == "create_prompt":
-                if use_llm:
-                    result = asyncio.run(self.create_prompt_llm(args.get("type", "writing")))
-                else:
-                    result = self.create_prompt(args.get("type", "writing"))
-                return {"success": True, "output": result, "error": None}
-
-            if command == "herb_log":
-                return {
-                    "success": True,
-                    "output": self.log_herb_entry(args.get("name"), args.get("details", {})),
-                    "error": None,
-                }
+    @command("evaluate_progress", args={"student": str, "score": (int, float)}, cost="io")
+    def _cmd_evaluate_progress(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Log learner progress snapshots while computing momentum."""
+        return self.evaluate_progress(args.get("student"), args.get("score"))
 
-            if command == "dose_guide":
-                return {
-                    "success": True,
-                    "output": self.calculate_dose(
-                        args.get("herb", ""), float(args.get("weight_kg", 0))
-                    ),
-                    "error": None,
-                }
+    @command("create_prompt", args={"type": str}, cost="net")
+    async def _cmd_create_prompt(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Deliver a creative brief, LLM-generated when available."""
+        if self._use_llm(args):
+            return await self.create_prompt_llm(args.get("type", "writing"))
+        return self.create_prompt(args.get("type", "writing"))
 
-            if command == "curriculum_path":
-                return {
-                    "success": True,
-                    "output": self.generate_curriculum_path(
-                        args.get("theme", ""), int(args.get("weeks", 4))
-                    ),
-                    "error": None,
-                }
+    @command("herb_log", args={"name": str, "details": dict}, cost="io")
+    def _cmd_herb_log(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Maintain a sovereign herbal apothecary journal."""
+        return self.log_herb_entry(args.get("name"), args.get("details", {}))
 
-            if command == "herbal_protocol":
-                return {
-                    "success": True,
-                    "output": self.recommend_herbal_protocol(args.get("concern", "")),
-                    "error": None,
-                }
+    @command("dose_guide", args={"herb": str, "weight_kg": (int, float)}, idempotent=True)
+    def _cmd_dose_guide(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Compute safe dosage using Nova's botanicals matrix."""
+        return self.calculate_dose(args.get("herb", ""), float(args.get("weight_kg", 0)))
 
-            if command == "story_arc":
-                return {
-                    "success": True,
-                    "output": self.compose_story_arc(args.get("protagonist", "Creator")),
-                    "error": None,
-                }
+    @command("curriculum_path", args={"theme": str, "weeks": int}, idempotent=True)
+    def _cmd_curriculum_path(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Construct a multi-week curriculum with escalating depth."""
+        return self.generate_curriculum_path(args.get("theme", ""), int(args.get("weeks", 4)))
+
+    @command("herbal_protocol", args={"concern": str}, cost="io")
+    def _cmd_herbal_protocol(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Offer a resilient herbal protocol anchored in safety."""
+        return self.recommend_herbal_protocol(args.get("concern", ""))
+
+    @command("story_arc", args={"protagonist": str}, idempotent=True)
+    def _cmd_story_arc(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Draft a three-beat narrative arc."""
+        return self.compose_story_arc(args.get("protagonist", "Creator"))
+
+    @command("chat", args={"message": str}, cost="net")
+    async def _cmd_chat(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Converse with Lyra through the configured LLM."""
+        if not self._use_llm(args):
+            raise RuntimeError("LLM not available for chat")
+        response = await self.generate_llm_response(args.get("message", ""))
+        return {"response": response, "agent": "lyra"}
+
+    @command("stream_chat", args={"message": str})
+    def _cmd_stream_chat(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Open a streaming chat session."""
+        if not self._use_llm(args):
+            raise RuntimeError("LLM streaming not available")
+        # For streaming, we'll return a session ID that can be used to get streaming data
+        return {"session_id": f"lyra_stream_{hash(args.get('message', ''))}", "streaming": True}
+
+    def _log_command(self, payload: Dict[str, Any]) -> None:
+        args = payload.get("args", {})
+        info(
+            "lyra.command",
+            {
+                "command": payload.get("command"),
+                "args": list(args.keys()),
+                "llm_enabled": self._use_llm(args),
+            },
+        )
 
-            # New LLM-specific commands
-            if command == "chat":
-                if use_llm:
-                    response = asyncio.run(self.generate_llm_response(args.get("message", "")))
-                    return {
-                        "success": True,
-                        "output": {"response": response, "agent": "lyra"},
-                        "error": None,
-                    }
-                else:
-                    return {"success": False, "output": None, "error": "LLM not available for chat"}
-
-            if command == "stream_chat":
-                if use_llm:
-                    # For streaming, we'll return a session ID that can be used to get streaming data
-                    session_id = f"lyra_stream_{hash(args.get('message', ''))}"
-                    return {
-                        "success": True,
-                        "output": {"session_id": session_id, "streaming": True},
-                        "error": None,
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "output": None,
-                        "error": "LLM streaming not available",
-                    }
-
-            raise ValueError(f"unknown command '{command}'")
+    def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute Lyra commands with journaled side effects and optional LLM enhancement."""
+        self._log_command(payload)
+        try:
+            output = self.dispatch_command(payload.get("command"), payload.get("args", {}))
+            return {"success": True, "output": output, "error": None}
+        except Exception as exc:  # noqa: BLE001
+            return {"success": False, "output": None, "error": str(exc)}
 
+    async def run_async(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Async ``run``; LLM commands are awaited on the caller's event loop."""
+        self._log_command(payload)
+        try:
+            output = await self.dispatch_command_async(
+                payload.get("command"), payload.get("args", {})
+            )
+            return {"success": True, "output": output, "error": None}
         except Exception as exc:  # noqa: BLE001
             return {"success": False, "output": None, "error": str(exc)}
@@ -0,0 +1,27 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents import base
+from agents.lyra.agent import LyraAgent
+
+
+def test_chat_reaches_the_llm_when_a_provider_is_set(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(base, "LLM_AVAILABLE", True)
+    calls = []
+
+    async def fake_llm(prompt, system_prompt, provider):
+        calls.append((prompt, provider))
+        return "hello from the model"
+
+    monkeypatch.setattr(base, "generate_llm_response", fake_llm, raising=False)
+    lyra = LyraAgent()
+    assert lyra.llm_provider == "ollama" and lyra.llm_enabled
+
+    result = asyncio.run(lyra.run_async({"command": "chat", "args": {"message": "hi"}}))
+    assert result["success"], result["error"]
+    assert result["output"] == {"response": "hello from the model", "agent": "lyra"}
+    assert calls == [("hi", "ollama")]
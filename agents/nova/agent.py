@@ -1,10 +1,12 @@
 """Nova orchestrator agent."""
 from __future__ import annotations
 
-import json
+import hmac
 import os
+import time
 import uuid
-from typing import Any, Dict, List, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 try:
     import requests
@@ -12,9 +14,16 @@ except ModuleNotFoundError:  # pragma: no cover
     requests = None  # type: ignore[assignment]
 
 from agents.base import BaseAgent
+from agents.common.metrics import REGISTRY
+from agents.nova.directory import get_directory
+from agents.nova.routing import STRATEGIES, Replica, directory_heartbeats, get_replica_table
 from core.registry import AgentRegistry, AgentResponse
 
 
+class ReplicaError(RuntimeError):
+    """A remote replica could not serve the request (connection failure or 5xx)."""
+
+
 class NovaAgent(BaseAgent):
     """Routes commands across the NovaOS sovereign agent mesh."""
 
@@ -24,27 +33,167 @@ class NovaAgent(BaseAgent):
         self._registry = registry
         self._core_api_url = (os.getenv("CORE_API_URL") or "http://core-api:8000").rstrip("/")
         self._shared_token = os.getenv("AGENT_SHARED_TOKEN") or os.getenv("NOVA_AGENT_TOKEN", "")
+        self.directory = get_directory(f"{self._core_api_url}/api/agents", self._shared_token)
+        self.replicas = get_replica_table()
+        strategy = os.getenv("NOVA_ROUTING_STRATEGY", "p2c")
+        self._strategy = strategy if strategy in STRATEGIES else "p2c"
+        self._retries = int(os.getenv("NOVA_ROUTE_RETRIES", "1"))
+        self._route_timeout = float(os.getenv("NOVA_ROUTE_TIMEOUT", "30"))
+        self._commands_ttl = float(os.getenv("NOVA_COMMANDS_TTL", "300"))
+        self._advertised: Dict[str, Tuple[float, Dict[str, Dict[str, Any]]]] = {}
 
-    def list_agents(self) -> List[Dict[str, Any]]:
-        """Expose registered agent metadata sourced from core-api."""
-        headers = {"X-Agent-Token": self._shared_token} if self._shared_token else {}
-        try:
-            url = f"{self._core_api_url}/api/agents"
-            if requests is not None:
-                resp = requests.get(url, headers=headers, timeout=5)
+    def _sync_replicas(self) -> Optional[List[Dict[str, Any]]]:
+        """Bring the replica table up to date with core-api's directory of heartbeats."""
+        agents = self.directory.get()
+        version = self.directory.version
+        if agents is not None and self.replicas.version != version:
+            self.replicas.sync(directory_heartbeats(agents), version)
+        return agents
+
+    def observe_heartbeat(self, heartbeat: Dict[str, Any], token: Optional[str]) -> bool:
+        """Feed an agent heartbeat into the replica table; False asks the sender to resync.
+
+        Only agents holding the shared agent token may report, and a reported endpoint
+        must be the one core-api's directory lists for that replica.
+        """
+        if not self._shared_token or not hmac.compare_digest(token or "", self._shared_token):
+            raise PermissionError("heartbeats require the agent token")
+        endpoint = heartbeat.get("endpoint")
+        if endpoint:
+            self._sync_replicas()
+            listed = self.replicas.endpoint(heartbeat.get("agent"), heartbeat.get("instance"))
+            if endpoint != listed:
+                raise PermissionError("endpoint is not listed in the agent directory")
+        return self.replicas.observe(heartbeat)
+
+    def _is_idempotent(self, target: str, job: Dict[str, Any], replica: Replica) -> bool:
+        """Whether ``job`` may be retried, per the command metadata ``target`` advertises."""
+        command = job.get("command") or ""
+        agent = self._registry._agents.get(target)  # noqa: SLF001
+        if agent is not None:
+            spec = agent.get_command(command)
+            return bool(spec and spec.idempotent)
+        advertised = self._advertised_commands(target, replica).get(command) or {}
+        return bool(advertised.get("idempotent"))
+
+    def _advertised_commands(self, target: str, replica: Replica) -> Dict[str, Dict[str, Any]]:
+        """``target``'s command descriptions from a replica's ``/agents/{name}/commands``.
+
+        Cached per agent for ``NOVA_COMMANDS_TTL`` seconds; a failed lookup is cached
+        (as no commands) for at most a minute.
+        """
+        now = time.monotonic()
+        cached = self._advertised.get(target)
+        if cached is not None and now < cached[0]:
+            return cached[1]
+        commands: Dict[str, Dict[str, Any]] = {}
+        expires = now + min(self._commands_ttl, 60.0)
+        if requests is not None and replica.endpoint:
+            headers = {"X-Agent-Token": self._shared_token} if self._shared_token else {}
+            try:
+                resp = requests.get(
+                    f"{replica.endpoint.rstrip('/')}/agents/{target}/commands",
+                    headers=headers,
+                    timeout=min(self._route_timeout, 5.0),
+                )
                 resp.raise_for_status()
-                data = resp.json()
-            else:  # pragma: no cover - fallback path
-                from urllib.request import Request, urlopen
-
-                req = Request(url, headers=headers)
-                with urlopen(req, timeout=5) as http_resp:
-                    data = json.loads(http_resp.read().decode("utf-8"))
-            agents = data.get("agents") or []
-            if isinstance(agents, list):
-                return agents
-        except Exception:
-            pass
+                commands = {
+                    item["name"]: item
+                    for item in resp.json().get("commands") or []
+                    if isinstance(item, dict) and item.get("name")
+                }
+                expires = now + self._commands_ttl
+            except (requests.RequestException, ValueError, AttributeError):
+                pass
+        self._advertised[target] = (expires, commands)
+        return commands
+
+    def _call_replica(
+        self,
+        replica: Replica,
+        target: str,
+        job: Dict[str, Any],
+        request_id: str,
+        rbac: Dict[str, Any],
+    ) -> AgentResponse:
+        if requests is None:  # pragma: no cover - requests ships with every agent image
+            raise ReplicaError("requests is not installed")
+        headers = {"X-Request-ID": request_id}
+        if self._shared_token:
+            headers["X-Agent-Token"] = self._shared_token
+        # The replica runs the job through its registry with the caller's RBAC context
+        body = {
+            "agent": target,
+            "command": job.get("command"),
+            "args": job.get("args") or {},
+            "log": bool(job.get("log")),
+            "request_id": request_id,
+            **rbac,
+        }
+        try:
+            resp = requests.post(
+                f"{replica.endpoint.rstrip('/')}/run",
+                json=body,
+                headers=headers,
+                timeout=self._route_timeout,
+            )
+        except requests.RequestException as exc:
+            raise ReplicaError(str(exc)) from exc
+        if resp.status_code >= 500:
+            raise ReplicaError(f"{replica.instance} returned HTTP {resp.status_code}")
+        resp.raise_for_status()
+        data = resp.json()
+        return AgentResponse(
+            success=bool(data.get("success")),
+            output=data.get("output"),
+            error=data.get("error"),
+            job_id=data.get("job_id"),
+            request_id=request_id,
+        )
+
+    def _route(
+        self, target: str, job: Dict[str, Any], request_id: str, rbac: Dict[str, Any]
+    ) -> Optional[AgentResponse]:
+        """Send ``job`` to the least loaded replica, or return None when none is known."""
+        tried: List[str] = []
+        last_error: Optional[ReplicaError] = None
+        for attempt in range(1 + self._retries):
+            replica = self.replicas.choose(target, self._strategy, exclude=tried)
+            if replica is None:
+                break
+            tried.append(replica.instance)
+            REGISTRY.increment(f"route.{target}.{self._strategy}")
+            REGISTRY.increment(f"route.{target}.replica.{replica.instance}")
+            if attempt:
+                REGISTRY.increment(f"route.{target}.retry")
+            self.replicas.acquire(replica)
+            failed = False
+            try:
+                return self._call_replica(replica, target, job, request_id, rbac)
+            except ReplicaError as exc:
+                failed = True
+                last_error = exc
+                REGISTRY.increment(f"route.{target}.replica_error")
+                # Idempotency is only looked up once a retry is actually on the table
+                if not attempt and (
+                    not self._retries or not self._is_idempotent(target, job, replica)
+                ):
+                    break
+            finally:
+                self.replicas.release(replica, failed=failed)
+        if last_error is not None:
+            raise last_error
+        return None
+
+    def list_agents(self) -> List[Dict[str, Any]]:
+        """Expose registered agent metadata sourced from core-api.
+
+        Answers from the cached directory; core-api is only waited on when nothing
+        has been cached yet.
+        """
+        agents = self._sync_replicas()
+        if agents is not None:
+            return agents
         # Fallback: introspect local registry when API lookup fails.
         return [
             {"name": name, "status": "unknown", "capabilities": []}
@@ -62,8 +211,21 @@ class NovaAgent(BaseAgent):
         request_id: Optional[str] = None,
         identity: Optional[Dict[str, Any]] = None,
     ) -> AgentResponse:
-        """Delegate execution to a downstream agent with RBAC context."""
+        """Delegate execution to a downstream agent with RBAC context.
+
+        When replicas of ``target`` are known from heartbeats the job is routed to the
+        least loaded one (idempotent commands are retried on another replica after a
+        replica failure); otherwise it runs through the local registry. A routed job
+        carries the caller's token, role, identity and source so the replica applies
+        the same RBAC checks.
+        """
         request_id = request_id or uuid.uuid4().hex
+        self._sync_replicas()
+        rbac = {"token": token, "role": role, "identity": identity, "source": source or "nova"}
+        routed = self._route(target, job, request_id, rbac)
+        if routed is not None:
+            return routed
+        REGISTRY.increment(f"route.{target}.local")
         response = self._registry.call(
             target,
             job,
@@ -76,11 +238,126 @@ class NovaAgent(BaseAgent):
         response.request_id = request_id
         return response
 
+    def dispatch_many(
+        self,
+        jobs: Sequence[Dict[str, Any]],
+        token: Optional[str] = None,
+        role: Optional[str] = None,
+        *,
+        max_concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+        source: Optional[str] = None,
+        identity: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Fan ``jobs`` out to their agents concurrently, yielding results as they finish.
+
+        Each job is ``{"agent", "command", "args"}``. A failing job does not affect the
+        others. Jobs still queued or running when ``deadline`` seconds have passed are
+        cancelled and reported with ``status`` ``"timeout"``; results carry the job's
+        ``index`` so callers can match them back up.
+        """
+        if not jobs:
+            return
+        workers = max(1, min(max_concurrency or len(jobs), len(jobs)))
+        expires = time.monotonic() + deadline if deadline is not None else None
+        started = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nova-fanout")
+        futures = {
+            pool.submit(self._dispatch_one, job, token, role, source, identity): index
+            for index, job in enumerate(jobs)
+        }
+        pending = set(futures)
+        try:
+            while pending:
+                timeout = None if expires is None else max(0.0, expires - time.monotonic())
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as exc:  # noqa: BLE001
+                        result = {"success": False, "output": None, "error": str(exc)}
+                    result.update(
+                        index=index,
+                        agent=jobs[index].get("agent"),
+                        command=jobs[index].get("command"),
+                        status="ok" if result.get("success") else "failed",
+                        elapsed=time.monotonic() - started,
+                    )
+                    yield result
+                if not done:
+                    break
+            for future in pending:
+                future.cancel()
+                index = futures[future]
+                REGISTRY.increment(f"fanout.{jobs[index].get('agent')}.timeout")
+                yield {
+                    "index": index,
+                    "agent": jobs[index].get("agent"),
+                    "command": jobs[index].get("command"),
+                    "success": False,
+                    "output": None,
+                    "error": f"deadline of {deadline}s exceeded",
+                    "status": "timeout",
+                    "elapsed": time.monotonic() - started,
+                }
+        finally:
+            # Stragglers keep their worker thread until they return; nobody waits on them.
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch_one(
+        self,
+        job: Dict[str, Any],
+        token: Optional[str],
+        role: Optional[str],
+        source: Optional[str],
+        identity: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        target = job.get("agent")
+        if not target:
+            return {"success": False, "output": None, "error": "missing target agent"}
+        request_id = job.get("request_id") or uuid.uuid4().hex
+        inner = {
+            "command": job.get("command"),
+            "args": job.get("args", {}),
+            "log": job.get("log"),
+            "requested_by": identity or {"role": role},
+        }
+        resp = self.dispatch(
+            target,
+            inner,
+            token,
+            role,
+            source=source or "nova",
+            request_id=request_id,
+            identity=identity,
+        )
+        return {
+            "success": resp.success,
+            "output": resp.output,
+            "error": resp.error,
+            "job_id": resp.job_id,
+            "request_id": resp.request_id or request_id,
+        }
+
     def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Execute orchestrator commands such as dispatch and discovery."""
         action = payload.get("action", "dispatch")
         if action == "list_agents":
             return {"success": True, "output": self.list_agents(), "error": None}
+        if action == "heartbeat":
+            try:
+                accepted = self.observe_heartbeat(
+                    payload.get("heartbeat") or {}, payload.get("agent_token")
+                )
+            except PermissionError as exc:
+                return {"success": False, "output": None, "error": str(exc)}
+            return {"success": True, "output": {"resync": not accepted}, "error": None}
+        if action == "replicas":
+            self._sync_replicas()
+            return {"success": True, "output": self.replicas.snapshot(), "error": None}
+        if action == "dispatch_many":
+            return self._run_many(payload)
 
         target = payload.get("agent")
         if not target:
@@ -117,3 +394,30 @@ class NovaAgent(BaseAgent):
             }
         except Exception as exc:  # noqa: BLE001
             return {"success": False, "output": None, "error": str(exc)}
+
+    def _run_many(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        jobs = payload.get("jobs") or []
+        if not isinstance(jobs, list) or not jobs:
+            return {"success": False, "output": None, "error": "jobs must be a non-empty list"}
+        results = list(
+            self.dispatch_many(
+                jobs,
+                payload.get("token"),
+                payload.get("role"),
+                max_concurrency=payload.get("max_concurrency"),
+                deadline=payload.get("deadline"),
+                source=payload.get("source"),
+                identity=payload.get("identity"),
+            )
+        )
+        failed = [r for r in results if not r["success"]]
+        return {
+            "success": not failed,
+            "output": {
+                "results": sorted(results, key=lambda r: r["index"]),
+                "succeeded": len(results) - len(failed),
+                "failed": len(failed),
+                "partial": bool(failed) and len(failed) < len(results),
+            },
+            "error": f"{len(failed)} of {len(results)} jobs failed" if failed else None,
+        }
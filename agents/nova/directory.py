@@ -0,0 +1,185 @@
+"""Cached agent directory for Nova discovery.
+
+``/api/agents`` on core-api is fetched through a keep-alive session and cached in
+memory. Within ``NOVA_DIRECTORY_TTL`` seconds the cache is served as is; after that,
+and up to ``NOVA_DIRECTORY_STALE`` seconds, the stale copy is still served while one
+background refresh revalidates it with ``If-None-Match``. Only an empty or fully
+expired cache makes a caller wait for core-api, and concurrent callers share that
+one fetch. After a failed fetch, reads answer immediately from whatever is cached
+(possibly None) until a backoff window has passed; the window starts at
+``NOVA_DIRECTORY_BACKOFF`` seconds and doubles per consecutive failure up to
+``NOVA_DIRECTORY_BACKOFF_MAX``.
+
+Every directory subscribes to the control bus's ``directory.invalidate`` op, which
+marks the cache stale and triggers a refresh wherever the bus listener runs.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import requests
+except ModuleNotFoundError:  # pragma: no cover
+    requests = None  # type: ignore[assignment]
+
+try:
+    from agents.common import control
+except ModuleNotFoundError:  # pragma: no cover
+    control = None  # type: ignore[assignment]
+
+INVALIDATE_OP = "directory.invalidate"
+
+TTL = float(os.getenv("NOVA_DIRECTORY_TTL", "30"))
+STALE = float(os.getenv("NOVA_DIRECTORY_STALE", "300"))
+TIMEOUT = float(os.getenv("NOVA_DIRECTORY_TIMEOUT", "5"))
+BACKOFF = float(os.getenv("NOVA_DIRECTORY_BACKOFF", "5"))
+BACKOFF_MAX = float(os.getenv("NOVA_DIRECTORY_BACKOFF_MAX", "60"))
+
+
+class AgentDirectory:
+    """TTL cache with stale-while-revalidate over core-api's agent listing."""
+
+    def __init__(
+        self,
+        url: str,
+        token: str = "",
+        *,
+        ttl: float = TTL,
+        stale: float = STALE,
+        timeout: float = TIMEOUT,
+        backoff: float = BACKOFF,
+        backoff_max: float = BACKOFF_MAX,
+    ) -> None:
+        self.url = url
+        self.ttl = ttl
+        self.stale = stale
+        self.timeout = timeout
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._headers = {"X-Agent-Token": token} if token else {}
+        self._session = requests.Session() if requests is not None else None
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._agents: Optional[List[Dict[str, Any]]] = None
+        self._etag: Optional[str] = None
+        self._fetched_at = float("-inf")
+        self._refreshing = False
+        self._attempts = 0
+        self._failures = 0
+        self._retry_at = float("-inf")
+        self.version = 0  # bumped on every successful refresh, 304s included
+
+    def get(self) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached listing, or None when core-api has never answered."""
+        with self._lock:
+            agents = self._agents
+            now = time.monotonic()
+            age = now - self._fetched_at
+            backing_off = now < self._retry_at
+            attempts = self._attempts
+        if agents is not None and age <= self.ttl:
+            return agents
+        if backing_off:
+            return agents
+        if agents is not None and age <= self.ttl + self.stale:
+            self._refresh_in_background()
+            return agents
+        with self._fetch_lock:
+            # Callers that queued behind another caller's fetch reuse its outcome
+            if self._attempts == attempts:
+                self._refresh_locked()
+        with self._lock:
+            return self._agents
+
+    def invalidate(self) -> None:
+        """Forget freshness so the next read revalidates; keeps the copy for fallback."""
+        with self._lock:
+            self._fetched_at = float("-inf")
+            self._etag = None
+        self._refresh_in_background()
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name="nova-directory", daemon=True).start()
+
+    def refresh(self) -> bool:
+        """Fetch the listing now; returns True when the cache is current afterwards."""
+        with self._fetch_lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> bool:
+        try:
+            agents, etag = self._fetch()
+        except Exception:
+            with self._lock:
+                self._attempts += 1
+                self._failures += 1
+                delay = min(self.backoff * 2 ** (self._failures - 1), self.backoff_max)
+                self._retry_at = time.monotonic() + delay
+            return False
+        finally:
+            with self._lock:
+                self._refreshing = False
+        with self._lock:
+            if agents is not None:
+                self._agents = agents
+                self._etag = etag
+            self._fetched_at = time.monotonic()
+            self._attempts += 1
+            self._failures = 0
+            self._retry_at = float("-inf")
+            self.version += 1
+        return True
+
+    def _fetch(self):
+        """Return (agents, etag); agents is None when the server answered 304."""
+        headers = dict(self._headers)
+        with self._lock:
+            if self._etag and self._agents is not None:
+                headers["If-None-Match"] = self._etag
+        if self._session is not None:
+            resp = self._session.get(self.url, headers=headers, timeout=self.timeout)
+            if resp.status_code == 304:
+                return None, headers.get("If-None-Match")
+            resp.raise_for_status()
+            data = resp.json()
+            etag = resp.headers.get("ETag")
+        else:  # pragma: no cover - fallback path
+            from urllib.error import HTTPError
+            from urllib.request import Request, urlopen
+
+            try:
+                with urlopen(Request(self.url, headers=headers), timeout=self.timeout) as resp:
+                    data = json.loads(resp.read().decode("utf-8"))
+                    etag = resp.headers.get("ETag")
+            except HTTPError as exc:
+                if exc.code == 304:
+                    return None, headers.get("If-None-Match")
+                raise
+        agents = data.get("agents") or []
+        if not isinstance(agents, list):
+            raise ValueError("malformed agent listing")
+        return agents, etag
+
+
+_directories: Dict[Tuple[str, str], AgentDirectory] = {}
+_directories_lock = threading.Lock()
+
+
+def get_directory(url: str, token: str = "") -> AgentDirectory:
+    """Process-wide directory for ``url`` read with ``token``, subscribed to invalidation."""
+    with _directories_lock:
+        directory = _directories.get((url, token))
+        if directory is None:
+            directory = _directories[(url, token)] = AgentDirectory(url, token)
+            if control is not None:
+                control.on_op(INVALIDATE_OP, lambda _args: directory.invalidate())
+        return directory
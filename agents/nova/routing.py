@@ -0,0 +1,248 @@
+"""Load-aware replica selection for Nova.
+
+Nova keeps one process-wide table of agent replicas (:func:`get_replica_table`)
+built from heartbeats (see ``agents.common.heartbeat``). Agents heartbeat to
+core-api, which lists the latest registration of every replica in its agent
+directory; :meth:`ReplicaTable.sync` makes the table match that listing. A full
+registration creates or resets a replica, later delta heartbeats update only the
+fields they carry. Heartbeats are stamped with the sender's ``updated_at``; one
+older than what the table already holds (a directory listing that lags the
+heartbeats Nova received itself, or a late delivery) only marks the replica as
+seen. Replicas that have not been heard from within
+``NOVA_REPLICA_TTL`` seconds are ignored.
+
+Two strategies are available through ``NOVA_ROUTING_STRATEGY``:
+
+``least_outstanding``
+    pick the replica with the lowest load score.
+``p2c`` (default)
+    power of two choices: sample two replicas at random and keep the less loaded,
+    which avoids every router piling onto the same "best" replica.
+
+The load score is Nova's own outstanding requests to the replica plus the active
+commands and queue depth it reported; reported p95 latency breaks ties.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+STRATEGIES = ("least_outstanding", "p2c")
+
+REPLICA_TTL = float(os.getenv("NOVA_REPLICA_TTL", "60"))
+SUSPECT_SECONDS = float(os.getenv("NOVA_REPLICA_SUSPECT_SECONDS", "10"))
+
+
+@dataclass
+class Replica:
+    """One running instance of an agent as seen through its heartbeats."""
+
+    agent: str
+    instance: str
+    endpoint: Optional[str] = None
+    load: Dict[str, Any] = field(default_factory=dict)
+    info: Dict[str, Any] = field(default_factory=dict)
+    last_seen: float = field(default_factory=time.monotonic)
+    outstanding: int = 0
+    suspect_until: float = 0.0
+    updated_at: float = 0.0  # sender's wall clock for the newest heartbeat applied
+
+    def score(self) -> float:
+        return (
+            self.outstanding
+            + float(self.load.get("active_commands") or 0)
+            + float(self.load.get("queue_depth") or 0)
+        )
+
+    def rank(self) -> tuple:
+        return (self.score(), float(self.load.get("p95_ms") or 0))
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "agent": self.agent,
+            "instance": self.instance,
+            "endpoint": self.endpoint,
+            "load": dict(self.load),
+            "outstanding": self.outstanding,
+            "score": self.score(),
+            "age": round(time.monotonic() - self.last_seen, 3),
+            "suspect": self.suspect_until > time.monotonic(),
+        }
+
+
+class ReplicaTable:
+    """Thread-safe map of agent name to live replicas."""
+
+    def __init__(self, ttl: float = REPLICA_TTL, rng: Optional[random.Random] = None) -> None:
+        self.ttl = ttl
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._replicas: Dict[str, Dict[str, Replica]] = {}
+        self.version: Optional[int] = None
+
+    def observe(self, heartbeat: Dict[str, Any]) -> bool:
+        """Apply a heartbeat; returns False when a delta arrives for an unknown replica.
+
+        The caller should then ask the replica to resync (send a full registration).
+        """
+        return self._observe(heartbeat, listed=False)
+
+    def _observe(self, heartbeat: Dict[str, Any], listed: bool) -> bool:
+        agent = heartbeat.get("agent")
+        instance = heartbeat.get("instance")
+        if not agent or not instance:
+            return False
+        full = heartbeat.get("full", True)
+        stamp = _timestamp(heartbeat.get("updated_at"))
+        with self._lock:
+            replicas = self._replicas.setdefault(agent, {})
+            replica = replicas.get(instance)
+            if replica is None:
+                if not full:
+                    return False
+                replica = replicas[instance] = Replica(agent=agent, instance=instance)
+            elif (stamp is not None or listed) and (stamp or 0.0) < replica.updated_at:
+                # Older than what we hold (an unstamped listing entry counts as oldest)
+                replica.last_seen = time.monotonic()
+                return True
+            elif full:
+                # Reset in place: in-flight requests still release this object
+                replica.endpoint = None
+                replica.load.clear()
+                replica.info.clear()
+            if stamp is not None:
+                replica.updated_at = stamp
+            for key, value in heartbeat.items():
+                if key in ("agent", "instance", "seq", "full", "updated_at"):
+                    continue
+                if key == "endpoint":
+                    replica.endpoint = value
+                elif key == "load":
+                    replica.load.update(value or {})
+                else:
+                    replica.info[key] = value
+            replica.last_seen = time.monotonic()
+        return True
+
+    def sync(self, heartbeats: Iterable[Dict[str, Any]], version: Optional[int] = None) -> None:
+        """Match a complete listing: observe every registration, drop replicas it omits.
+
+        Entries older than the heartbeats already applied leave load and endpoint alone.
+        """
+        listed: Dict[str, Set[str]] = {}
+        for heartbeat in heartbeats:
+            if self._observe(heartbeat, listed=True):
+                listed.setdefault(heartbeat["agent"], set()).add(heartbeat["instance"])
+        with self._lock:
+            for agent, replicas in self._replicas.items():
+                for instance in [i for i in replicas if i not in listed.get(agent, ())]:
+                    del replicas[instance]
+            self.version = version
+
+    def endpoint(self, agent: str, instance: str) -> Optional[str]:
+        with self._lock:
+            replica = self._replicas.get(agent, {}).get(instance)
+            return replica.endpoint if replica else None
+
+    def remove(self, agent: str, instance: str) -> None:
+        with self._lock:
+            self._replicas.get(agent, {}).pop(instance, None)
+
+    def live(self, agent: str, exclude: Iterable[str] = ()) -> List[Replica]:
+        """Routable replicas of ``agent``: fresh, with an endpoint and not excluded."""
+        now = time.monotonic()
+        skip = set(exclude)
+        with self._lock:
+            candidates = [
+                replica
+                for replica in self._replicas.get(agent, {}).values()
+                if replica.endpoint
+                and replica.instance not in skip
+                and now - replica.last_seen <= self.ttl
+            ]
+        healthy = [replica for replica in candidates if replica.suspect_until <= now]
+        return healthy or candidates
+
+    def choose(
+        self, agent: str, strategy: str = "p2c", exclude: Iterable[str] = ()
+    ) -> Optional[Replica]:
+        candidates = self.live(agent, exclude)
+        if not candidates:
+            return None
+        if strategy == "p2c" and len(candidates) > 2:
+            candidates = self._rng.sample(candidates, 2)
+        return min(candidates, key=Replica.rank)
+
+    def acquire(self, replica: Replica) -> None:
+        with self._lock:
+            replica.outstanding += 1
+
+    def release(self, replica: Replica, failed: bool = False) -> None:
+        with self._lock:
+            replica.outstanding = max(0, replica.outstanding - 1)
+            if failed:
+                replica.suspect_until = time.monotonic() + SUSPECT_SECONDS
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        with self._lock:
+            replicas = {agent: list(items.values()) for agent, items in self._replicas.items()}
+        return {
+            agent: [replica.describe() for replica in sorted(items, key=Replica.rank)]
+            for agent, items in sorted(replicas.items())
+        }
+
+
+def _timestamp(value: Any) -> Optional[float]:
+    """Epoch seconds from a number or an ISO-8601 string; None when absent or unreadable."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def directory_heartbeats(agents: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Full registrations for the replicas in core-api's agent directory.
+
+    An agent entry lists its replicas' latest heartbeats under ``replicas``; an
+    entry that carries ``instance`` and ``endpoint`` itself is a single replica.
+    """
+    for entry in agents:
+        name = entry.get("name") or entry.get("agent")
+        if not name:
+            continue
+        for replica in entry.get("replicas") or [entry]:
+            if isinstance(replica, dict) and replica.get("instance") and replica.get("endpoint"):
+                yield {
+                    "agent": name,
+                    "instance": replica["instance"],
+                    "full": True,
+                    "endpoint": replica["endpoint"],
+                    "load": replica.get("load") or {},
+                    "updated_at": replica.get("updated_at"),
+                }
+
+
+_table: Optional[ReplicaTable] = None
+_table_lock = threading.Lock()
+
+
+def get_replica_table() -> ReplicaTable:
+    """The replica table shared by every Nova instance in this process."""
+    global _table
+    with _table_lock:
+        if _table is None:
+            _table = ReplicaTable()
+        return _table
@@ -0,0 +1,129 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.nova import directory as directory_module
+from agents.nova.directory import INVALIDATE_OP, AgentDirectory, get_directory
+
+
+class FakeResponse:
+    def __init__(self, status_code, agents=None, etag=None):
+        self.status_code = status_code
+        self._agents = agents
+        self.headers = {"ETag": etag} if etag else {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def json(self):
+        return {"agents": self._agents}
+
+
+class FakeSession:
+    def __init__(self):
+        self.requests = []
+        self.agents = [{"name": "glitch"}]
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(dict(headers or {}))
+        if headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(304)
+        return FakeResponse(200, self.agents, '"v1"')
+
+
+def _directory(**kwargs):
+    directory = AgentDirectory("http://core/api/agents", **kwargs)
+    directory._session = FakeSession()
+    return directory
+
+
+def test_fresh_cache_is_served_from_memory():
+    directory = _directory(ttl=60)
+    assert directory.get() == [{"name": "glitch"}]
+    assert directory.get() == [{"name": "glitch"}]
+    assert len(directory._session.requests) == 1
+
+
+def test_stale_entry_is_served_while_revalidating_with_etag():
+    directory = _directory(ttl=0, stale=60)
+    directory.get()
+    assert directory.get() == [{"name": "glitch"}]
+    deadline = time.time() + 2
+    while len(directory._session.requests) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert directory._session.requests[1]["If-None-Match"] == '"v1"'
+
+
+def test_failed_first_fetch_returns_none():
+    directory = _directory()
+    directory._session.get = lambda *a, **k: FakeResponse(503)
+    assert directory.get() is None
+
+
+def test_failures_back_off_instead_of_blocking_every_read():
+    directory = _directory(ttl=0, stale=0, backoff=60)
+    calls = []
+
+    def down(*args, **kwargs):
+        calls.append(1)
+        raise ConnectionError("core-api down")
+
+    directory._session.get = down
+    assert directory.get() is None
+    assert directory.get() is None
+    assert len(calls) == 1
+
+    directory._retry_at = 0.0
+    directory._session = FakeSession()
+    assert directory.get() == [{"name": "glitch"}]
+    assert directory._failures == 0
+
+
+def test_concurrent_cold_reads_share_one_fetch():
+    directory = _directory(ttl=60)
+    session = directory._session
+    fetch = session.get
+
+    def slow(*args, **kwargs):
+        time.sleep(0.1)
+        return fetch(*args, **kwargs)
+
+    session.get = slow
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(directory.get())) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [[{"name": "glitch"}]] * 5
+    assert len(session.requests) == 1
+
+
+def test_shared_directories_are_keyed_by_url_and_token(monkeypatch):
+    monkeypatch.setattr(directory_module, "_directories", {})
+    first = get_directory("http://core/api/agents", "a")
+    assert get_directory("http://core/api/agents", "a") is first
+    second = get_directory("http://core/api/agents", "b")
+    assert second is not first
+    assert second._headers == {"X-Agent-Token": "b"}
+
+
+def test_shared_directories_subscribe_to_invalidation(monkeypatch):
+    control = directory_module.control
+    if control is None:
+        return
+    monkeypatch.setattr(directory_module, "_directories", {})
+    monkeypatch.setattr(control, "_op_handlers", {})
+    directory = get_directory("http://core/api/agents")
+    directory._session = FakeSession()
+    directory.get()
+    [handler] = control._op_handlers[INVALIDATE_OP]
+    handler({})
+    deadline = time.time() + 2
+    while len(directory._session.requests) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(directory._session.requests) == 2
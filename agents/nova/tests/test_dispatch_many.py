@@ -0,0 +1,57 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.base import BaseAgent
+from agents.nova.agent import NovaAgent
+from core.registry import AgentRegistry
+
+
+class SleepyAgent(BaseAgent):
+    def __init__(self, name, delay, fail=False):
+        super().__init__(name)
+        self.delay = delay
+        self.fail = fail
+
+    def run(self, payload):
+        time.sleep(self.delay)
+        if self.fail:
+            return {"success": False, "output": None, "error": "boom"}
+        return {"success": True, "output": self.name, "error": None}
+
+
+def _nova(monkeypatch):
+    monkeypatch.setenv("CORE_API_URL", "http://127.0.0.1:9")
+    registry = AgentRegistry()
+    registry.register("fast", SleepyAgent("fast", 0.05))
+    registry.register("slow", SleepyAgent("slow", 0.3))
+    registry.register("broken", SleepyAgent("broken", 0.05, fail=True))
+    return NovaAgent(registry)
+
+
+def test_fan_out_takes_time_of_slowest_job(monkeypatch):
+    nova = _nova(monkeypatch)
+    started = time.monotonic()
+    result = nova.run(
+        {
+            "action": "dispatch_many",
+            "jobs": [
+                {"agent": "slow", "command": "go"},
+                {"agent": "fast", "command": "go"},
+                {"agent": "broken", "command": "go"},
+            ],
+        }
+    )
+    assert time.monotonic() - started < 0.6
+    output = result["output"]
+    assert result["success"] is False and output["partial"] is True
+    assert [r["status"] for r in output["results"]] == ["ok", "ok", "failed"]
+
+
+def test_results_stream_in_completion_order_and_deadline_cancels(monkeypatch):
+    nova = _nova(monkeypatch)
+    jobs = [{"agent": "slow", "command": "go"}, {"agent": "fast", "command": "go"}]
+    results = list(nova.dispatch_many(jobs, deadline=0.15))
+    assert [(r["agent"], r["status"]) for r in results] == [("fast", "ok"), ("slow", "timeout")]
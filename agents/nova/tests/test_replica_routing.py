@@ -0,0 +1,120 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.base import BaseAgent, command
+from agents.nova import agent as nova_module
+from agents.nova.agent import NovaAgent
+from agents.nova.routing import ReplicaTable
+from core.registry import AgentRegistry
+
+LISTING = [{"name": "remote", "replicas": [{"instance": "r1", "endpoint": "http://r1:8000"}]}]
+
+
+class RemoteAgent(BaseAgent):
+    def __init__(self):
+        super().__init__("remote")
+
+    @command("wipe")
+    def _wipe(self, args):
+        return {"wiped": True}
+
+    def run(self, payload):
+        return {"success": True, "output": "local", "error": None}
+
+
+class FakeResponse:
+    status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"success": True, "output": "routed", "error": None}
+
+
+def _nova(monkeypatch, calls):
+    monkeypatch.setenv("CORE_API_URL", "http://127.0.0.1:9")
+    monkeypatch.setenv("AGENT_SHARED_TOKEN", "s3cret")
+    monkeypatch.setattr(nova_module, "get_replica_table", ReplicaTable)
+
+    def post(url, json=None, headers=None, timeout=None):
+        calls.append((url, json, headers))
+        return FakeResponse()
+
+    monkeypatch.setattr(nova_module.requests, "post", post)
+    registry = AgentRegistry()
+    registry.register("remote", RemoteAgent())
+    nova = NovaAgent(registry)
+    monkeypatch.setattr(nova.directory, "get", lambda: LISTING)
+    return nova
+
+
+def test_routed_jobs_carry_the_callers_rbac_context(monkeypatch):
+    calls = []
+    nova = _nova(monkeypatch, calls)
+    result = nova.run(
+        {
+            "agent": "remote",
+            "command": "wipe",
+            "token": "user-jwt",
+            "role": "analyst",
+            "identity": {"sub": "u1"},
+            "idempotent": True,
+        }
+    )
+    assert result["output"] == "routed"
+    [(url, body, headers)] = calls
+    assert url == "http://r1:8000/run" and headers["X-Agent-Token"] == "s3cret"
+    assert (body["token"], body["role"], body["identity"]) == ("user-jwt", "analyst", {"sub": "u1"})
+    assert body["source"] == "nova"
+    # Idempotency comes from the CommandSpec, not from the caller
+    replica = nova.replicas.choose("remote")
+    assert not nova._is_idempotent("remote", {"command": "wipe", "idempotent": True}, replica)
+
+
+def test_heartbeats_need_the_agent_token_and_a_listed_endpoint(monkeypatch):
+    nova = _nova(monkeypatch, [])
+    beat = {"agent": "remote", "instance": "r1", "full": True, "endpoint": "http://evil:1"}
+    denied = nova.run({"action": "heartbeat", "heartbeat": beat})
+    assert not denied["success"] and "token" in denied["error"]
+    spoofed = nova.run({"action": "heartbeat", "heartbeat": beat, "agent_token": "s3cret"})
+    assert not spoofed["success"] and "directory" in spoofed["error"]
+
+    beat["endpoint"] = "http://r1:8000"
+    accepted = nova.run({"action": "heartbeat", "heartbeat": beat, "agent_token": "s3cret"})
+    assert accepted["success"] and accepted["output"] == {"resync": False}
+
+
+def test_retries_follow_the_commands_a_remote_agent_advertises(monkeypatch):
+    monkeypatch.setenv("CORE_API_URL", "http://127.0.0.1:9")
+    monkeypatch.setattr(nova_module, "get_replica_table", ReplicaTable)
+    posts, gets = [], []
+
+    def post(url, json=None, headers=None, timeout=None):
+        posts.append(json["command"])
+        if len(posts) % 2:
+            raise nova_module.requests.RequestException("connection reset")
+        return FakeResponse()
+
+    class Commands(FakeResponse):
+        def json(self):
+            return {"commands": [{"name": "scan", "idempotent": True}, {"name": "wipe"}]}
+
+    def get(url, headers=None, timeout=None):
+        gets.append(url)
+        return Commands()
+
+    monkeypatch.setattr(nova_module.requests, "post", post)
+    monkeypatch.setattr(nova_module.requests, "get", get, raising=False)
+    nova = NovaAgent(AgentRegistry())  # "remote" only exists on its replicas
+    second = {"instance": "r2", "endpoint": "http://r2:8000"}
+    listing = [dict(LISTING[0], replicas=LISTING[0]["replicas"] + [second])]
+    monkeypatch.setattr(nova.directory, "get", lambda: listing)
+
+    assert nova.run({"agent": "remote", "command": "scan"})["output"] == "routed"
+    assert posts == ["scan", "scan"]
+    assert not nova.run({"agent": "remote", "command": "wipe"})["success"]
+    assert posts == ["scan", "scan", "wipe"]
+    assert len(gets) == 1 and gets[0].endswith("/agents/remote/commands")
@@ -0,0 +1,110 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.nova.routing import ReplicaTable, directory_heartbeats
+
+
+def _register(table, instance, **load):
+    return table.observe(
+        {
+            "agent": "glitch",
+            "instance": instance,
+            "full": True,
+            "endpoint": f"http://{instance}:8000",
+            "load": load,
+        }
+    )
+
+
+def test_deltas_update_known_replicas_only():
+    table = ReplicaTable()
+    assert _register(table, "a", active_commands=0)
+    delta = {"agent": "glitch", "instance": "a", "full": False, "load": {"queue_depth": 4}}
+    assert table.observe(delta)
+    replica = table.live("glitch")[0]
+    assert replica.load == {"active_commands": 0, "queue_depth": 4}
+    assert not table.observe({"agent": "glitch", "instance": "b", "full": False})
+
+
+def test_least_outstanding_prefers_idle_replica():
+    table = ReplicaTable()
+    _register(table, "busy", active_commands=5)
+    _register(table, "idle", active_commands=0)
+    chosen = table.choose("glitch", "least_outstanding")
+    assert chosen.instance == "idle"
+    for _ in range(6):
+        table.acquire(chosen)
+    assert table.choose("glitch", "least_outstanding").instance == "busy"
+
+
+def test_p2c_never_picks_the_most_loaded_of_three():
+    table = ReplicaTable(rng=random.Random(7))
+    for name, depth in (("a", 0), ("b", 1), ("c", 9)):
+        _register(table, name, queue_depth=depth)
+    picks = {table.choose("glitch", "p2c").instance for _ in range(50)}
+    assert "c" not in picks
+
+
+def test_failed_replica_is_avoided_and_excluded():
+    table = ReplicaTable()
+    _register(table, "a")
+    _register(table, "b", active_commands=1)
+    first = table.choose("glitch", "least_outstanding")
+    table.acquire(first)
+    table.release(first, failed=True)
+    assert table.choose("glitch", "least_outstanding").instance == "b"
+    assert table.choose("glitch", "least_outstanding", exclude=["a", "b"]) is None
+
+
+def test_sync_matches_the_directory_listing():
+    table = ReplicaTable()
+    _register(table, "gone")
+    listing = [
+        {"name": "glitch", "replicas": [{"instance": "a", "endpoint": "http://a:8000"}]},
+        {"name": "lyra", "instance": "l1", "endpoint": "http://l1:8000", "load": {"p95_ms": 3}},
+        {"name": "echo", "status": "online"},
+    ]
+    table.sync(directory_heartbeats(listing), version=1)
+    assert table.version == 1
+    assert [r.instance for r in table.live("glitch")] == ["a"]
+    assert table.endpoint("lyra", "l1") == "http://l1:8000"
+    assert table.live("echo") == []
+
+
+def test_full_registration_keeps_outstanding_requests():
+    table = ReplicaTable()
+    _register(table, "a", queue_depth=3)
+    replica = table.choose("glitch")
+    table.acquire(replica)
+    _register(table, "a")
+    table.release(replica)
+    [current] = table.live("glitch")
+    assert current is replica and current.outstanding == 0 and current.load == {}
+
+
+def test_sync_does_not_overwrite_newer_heartbeat_load():
+    table = ReplicaTable()
+    table.observe(
+        {
+            "agent": "glitch",
+            "instance": "a",
+            "endpoint": "http://a:8000",
+            "load": {"queue_depth": 7},
+            "updated_at": 200.0,
+        }
+    )
+    stale = [{"name": "glitch", "replicas": [{"instance": "a", "endpoint": "http://a:8000"}]}]
+    table.sync(directory_heartbeats(stale), version=1)
+    assert table.live("glitch")[0].load == {"queue_depth": 7}
+
+    stale[0]["replicas"][0].update(load={"queue_depth": 1}, updated_at=100.0)
+    table.sync(directory_heartbeats(stale), version=2)
+    assert table.live("glitch")[0].load == {"queue_depth": 7}
+
+    stale[0]["replicas"][0].update(load={"queue_depth": 2}, updated_at="1970-01-01T00:05:00Z")
+    table.sync(directory_heartbeats(stale), version=3)
+    replica = table.live("glitch")[0]
+    assert replica.load == {"queue_depth": 2} and replica.updated_at == 300.0
@@ -1,14 +1,15 @@
 """Riven agent: parental and survival support."""
 from __future__ import annotations
 
-import json
-import math
 import shutil
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from agents.base import BaseAgent
+from agents.base import BaseAgent, command
 from agents.common.alog import info
+from agents.common.journal import Journal, open_journal
+from agents.riven.geo import Fence, FenceIndex, GeofenceStore, evaluate, get_geofences, haversine
+from agents.riven.locations import LocationStore, get_location_store, parse_ping
 
 
 class RivenAgent(BaseAgent):
@@ -19,33 +20,103 @@ class RivenAgent(BaseAgent):
         super().__init__("riven", description="Parental and survival agent")
         self._log_dir = Path("logs/riven")
         self._log_dir.mkdir(parents=True, exist_ok=True)
+        self.locations: LocationStore = get_location_store(self._log_dir / "locations")
+        self.geofences: GeofenceStore = get_geofences(self._log_dir / "geofences.json")
+        legacy = [self._log_dir / "device_track", self._log_dir / "device_track.json"]
+        if not self.locations.devices() and any(path.exists() for path in legacy):
+            self._import_device_track()
+
+    def _import_device_track(self) -> None:
+        """Seed the location store from the pre-columnar ``device_track`` journal.
+
+        Opening the journal first migrates a baseline ``device_track.json`` array.
+        """
+        pings = (
+            parse_ping(entry.get("device_id"), entry.get("location"))
+            for entry in self.journal("device_track")
+            if isinstance(entry, dict)
+        )
+        self.locations.ingest(ping for ping in pings if ping is not None)
+        self.locations.flush()
+
+    def journal(self, name: str) -> Journal:
+        """Return Riven's append-only journal ``name`` (e.g. ``device_track``)."""
+        return open_journal(self._log_dir, name)
 
     def _append_json(self, filename: str, entry: Dict[str, Any]) -> None:
         """Append structured entries to Riven's journal files."""
-        path = self._log_dir / filename
-        data: List[Dict[str, Any]] = []
-        if path.exists():
-            data = json.loads(path.read_text(encoding="utf-8"))
-        data.append(entry)
-        path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        self.journal(Path(filename).stem).append(entry)
 
     def _haversine(self, start: Tuple[float, float], end: Tuple[float, float]) -> float:
         """Calculate great-circle distance between coordinates in meters."""
-        R = 6371_000
-        lat1, lon1 = map(math.radians, start)
-        lat2, lon2 = map(math.radians, end)
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        return R * c
+        return haversine(start, end)
 
     def track_device(self, device_id: str, location: Dict[str, Any]) -> Dict[str, Any]:
-        """Record device location updates for guardians."""
+        """Record device location updates for guardians.
+
+        Every update is journaled to ``device_track``; those with usable coordinates
+        also go to the location store.
+        """
         entry = {"device_id": device_id, "location": location}
         self._append_json("device_track.json", entry)
+        ping = parse_ping(device_id, location)
+        if ping is not None:
+            self.locations.ingest([ping])
         return entry
 
+    def track_devices(self, pings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Record a batch of ``{"device_id", "location", "ts"?}`` pings in one call."""
+        parsed = [
+            parse_ping(p.get("device_id"), p.get("location", p), p.get("ts"))
+            if isinstance(p, dict)
+            else None
+            for p in pings
+        ]
+        accepted = self.locations.ingest(p for p in parsed if p is not None)
+        rejected = [idx for idx, p in enumerate(parsed) if p is None]
+        return {
+            "accepted": accepted,
+            "rejected": len(rejected),
+            "rejected_indexes": rejected[:100],
+            "devices": len({p[0] for p in parsed if p is not None}),
+        }
+
+    def device_location(self, device_id: Optional[str] = None) -> Dict[str, Any]:
+        """Latest known position of one device, or of every tracked device."""
+        if device_id:
+            latest = self.locations.latest(device_id)
+            if latest is None:
+                raise ValueError(f"unknown device: {device_id}")
+            return latest
+        return {"devices": self.locations.latest_all()}
+
+    def set_geofences(self, fences: List[Dict[str, Any]], replace: bool = False) -> Dict[str, Any]:
+        """Add or update safe/restricted zones; ``replace`` drops fences not listed."""
+        stored = self.geofences.set(fences, replace=replace)
+        return {"fences": [fence.to_dict() for fence in stored]}
+
+    def geofence_check(
+        self,
+        fences: Optional[List[Dict[str, Any]]] = None,
+        device_ids: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Evaluate tracked devices against every fence in one pass.
+
+        ``fences`` checks ad-hoc zones instead of the stored ones; ``device_ids``
+        limits the devices considered.
+        """
+        if fences is not None:
+            index = FenceIndex(Fence.from_dict(item) for item in fences)
+        else:
+            index = self.geofences.index()
+        latest = self.locations.latest_all()
+        if device_ids is not None:
+            latest = {d: latest[d] for d in device_ids if d in latest}
+        positions = {d: (entry["lat"], entry["lon"]) for d, entry in latest.items()}
+        result = evaluate(index, positions)
+        result["checked"] = {"devices": len(positions), "fences": len(index.fences)}
+        return result
+
     def log_symptom(self, user: str, symptom: str) -> Dict[str, str]:
         """Track symptoms for on-call medics."""
         entry = {"user": user, "symptom": symptom}
@@ -94,33 +165,71 @@ class RivenAgent(BaseAgent):
         alerts = [user for user, symptoms in summary.items() if len(symptoms) >= 3]
         return {"patients": summary, "escalate": alerts}
 
+    @command("track_device", args={"device_id": str, "location": dict}, cost="io")
+    def _cmd_track_device(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Record device location updates for guardians."""
+        return self.track_device(args.get("device_id"), args.get("location"))
+
+    @command("track_devices", args={"pings": list}, cost="io")
+    def _cmd_track_devices(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a batch of device location pings."""
+        return self.track_devices(list(args.get("pings", [])))
+
+    @command("device_location", args={"device_id": str}, idempotent=True)
+    def _cmd_device_location(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Latest known device positions, served from memory."""
+        return self.device_location(args.get("device_id"))
+
+    @command("set_geofences", args={"fences": list, "replace": bool}, cost="io")
+    def _cmd_set_geofences(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Add or update safe/restricted zones."""
+        return self.set_geofences(list(args.get("fences", [])), bool(args.get("replace")))
+
+    @command("geofence_check", args={"fences": list, "device_ids": list}, idempotent=True)
+    def _cmd_geofence_check(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Check every tracked device against every geofence."""
+        return self.geofence_check(args.get("fences"), args.get("device_ids"))
+
+    @command("log_symptom", args={"user": str, "symptom": str}, cost="io")
+    def _cmd_log_symptom(self, args: Dict[str, Any]) -> Dict[str, str]:
+        """Track symptoms for on-call medics."""
+        return self.log_symptom(args.get("user"), args.get("symptom"))
+
+    @command("generate_protocol", args={"title": str, "steps": list})
+    def _cmd_generate_protocol(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Produce survival or care protocol steps."""
+        return self.generate_protocol(args.get("title", ""), list(args.get("steps", [])))
+
+    @command(
+        "bugout_map", args={"start": (list, tuple), "end": (list, tuple)}, idempotent=True
+    )
+    def _cmd_bugout_map(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Return escape path and distance."""
+        start = tuple(args.get("start", (0.0, 0.0)))
+        end = tuple(args.get("end", (0.0, 0.0)))
+        return self.bugout_map(start, end)
+
+    @command("wipe_device", args={"path": str}, cost="io")
+    def _cmd_wipe_device(self, args: Dict[str, Any]) -> Dict[str, str]:
+        """Securely remove a directory or file on-demand."""
+        return self.wipe_device(args.get("path", ""))
+
+    @command("supply_run", args={"days": int, "people": int}, idempotent=True)
+    def _cmd_supply_run(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Estimate required supplies for off-grid survival."""
+        return self.calculate_supply_run(int(args.get("days", 3)), int(args.get("people", 1)))
+
+    @command("medical_summary", args={"entries": list}, idempotent=True)
+    def _cmd_medical_summary(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Synthesize symptom logs into a quick triage summary."""
+        return self.medical_summary(list(args.get("entries", [])))
+
     def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Dispatch Riven operations."""
         command = payload.get("command")
         args = payload.get("args", {})
         info("riven.command", {"command": command, "args": list(args.keys())})
         try:
-            if command == "track_device":
-                return {"success": True, "output": self.track_device(args.get("device_id"), args.get("location")), "error": None}
-            if command == "log_symptom":
-                return {"success": True, "output": self.log_symptom(args.get("user"), args.get("symptom")), "error": None}
-            if command == "generate_protocol":
-                return {"success": True, "output": self.generate_protocol(args.get("title", ""), list(args.get("steps", []))), "error": None}
-            if command == "bugout_map":
-                start = tuple(args.get("start", (0.0, 0.0)))
-                end = tuple(args.get("end", (0.0, 0.0)))
-                return {"success": True, "output": self.bugout_map(start, end), "error": None}
-            if command == "wipe_device":
-                return {"success": True, "output": self.wipe_device(args.get("path", "")), "error": None}
-            if command == "supply_run":
-                return {
-                    "success": True,
-                    "output": self.calculate_supply_run(int(args.get("days", 3)), int(args.get("people", 1))),
-                    "error": None,
-                }
-            if command == "medical_summary":
-                return {"success": True, "output": self.medical_summary(list(args.get("entries", []))), "error": None}
-            raise ValueError(f"unknown command '{command}'")
+            return {"success": True, "output": self.dispatch_command(command, args), "error": None}
         except Exception as exc:  # noqa: BLE001
             return {"success": False, "output": None, "error": str(exc)}
-
@@ -0,0 +1,293 @@
+"""Distance kernels and geofence evaluation for Riven.
+
+Distances use the haversine formula on a spherical Earth. When NumPy is installed
+the N×M kernels are vectorised; otherwise the same maths runs in pure Python.
+
+Fences are circles (``center`` + ``radius_m``) or polygons (``polygon`` as a list of
+``[lat, lon]`` vertices, tested in plain lat/lon space, which is accurate for
+zones of city scale or smaller). :class:`FenceIndex` buckets fence bounding boxes
+into a uniform grid of ``RIVEN_GEOFENCE_GRID_DEG`` degree cells so each device is
+only tested against the fences whose box covers its cell. Fences crossing the
+antimeridian are not supported.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ModuleNotFoundError:  # pragma: no cover - optional speed-up
+    np = None  # type: ignore[assignment]
+
+EARTH_RADIUS_M = 6_371_000.0
+METERS_PER_DEGREE = 111_320.0
+FENCE_KINDS = ("safe", "restricted")
+
+GRID_DEG = float(os.getenv("RIVEN_GEOFENCE_GRID_DEG", "0.25"))
+# Fences covering more cells than this are checked against every point instead
+MAX_FENCE_CELLS = 4096
+
+Point = Tuple[float, float]
+
+
+def haversine(start: Sequence[float], end: Sequence[float]) -> float:
+    """Great-circle distance between two ``(lat, lon)`` pairs in metres."""
+    lat1, lon1 = map(math.radians, start)
+    lat2, lon2 = map(math.radians, end)
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distance_matrix(sources: Sequence[Point], targets: Sequence[Point]) -> List[List[float]]:
+    """Distances in metres from every source to every target, as ``len(sources)`` rows."""
+    if not sources or not targets:
+        return [[] for _ in sources]
+    if np is None:
+        return [[haversine(s, t) for t in targets] for s in sources]
+    a = np.radians(np.asarray(sources, dtype=float))
+    b = np.radians(np.asarray(targets, dtype=float))
+    lat1, lon1 = a[:, 0:1], a[:, 1:2]
+    lat2, lon2 = b[:, 0], b[:, 1]
+    h = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return (2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(h, 1.0)))).tolist()
+
+
+def points_in_polygon(points: Sequence[Point], polygon: Sequence[Point]) -> List[bool]:
+    """Even-odd ray-casting test of every point against one polygon."""
+    if len(polygon) < 3 or not points:
+        return [False] * len(points)
+    if np is not None:
+        pts = np.asarray(points, dtype=float)
+        y, x = pts[:, 0], pts[:, 1]
+        inside = np.zeros(len(pts), dtype=bool)
+        prev = polygon[-1]
+        for vertex in polygon:
+            (y1, x1), (y2, x2) = prev, vertex
+            crosses = (y1 > y) != (y2 > y)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x_at = (x2 - x1) * (y - y1) / (y2 - y1) + x1
+            inside ^= crosses & (x < x_at)
+            prev = vertex
+        return inside.tolist()
+    result = []
+    for y, x in points:
+        inside = False
+        prev = polygon[-1]
+        for vertex in polygon:
+            (y1, x1), (y2, x2) = prev, vertex
+            if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+                inside = not inside
+            prev = vertex
+        result.append(inside)
+    return result
+
+
+@dataclass(frozen=True)
+class Fence:
+    """A named safe or restricted zone."""
+
+    id: str
+    kind: str = "safe"
+    center: Optional[Point] = None
+    radius_m: float = 0.0
+    polygon: Tuple[Point, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Fence":
+        fence_id = data.get("id") or data.get("name")
+        if not fence_id:
+            raise ValueError("geofence requires an id")
+        kind = data.get("kind", "safe")
+        if kind not in FENCE_KINDS:
+            raise ValueError(f"geofence '{fence_id}' kind must be one of {FENCE_KINDS}")
+        try:
+            if data.get("polygon"):
+                polygon = tuple((float(lat), float(lon)) for lat, lon in data["polygon"])
+                if len(polygon) < 3:
+                    raise ValueError
+                return cls(id=str(fence_id), kind=kind, polygon=polygon)
+            lat, lon = data["center"]
+            radius = float(data["radius_m"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(
+                f"geofence '{fence_id}' needs a polygon of 3+ [lat, lon] points "
+                "or a center and radius_m"
+            ) from None
+        return cls(id=str(fence_id), kind=kind, center=(float(lat), float(lon)), radius_m=radius)
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.polygon:
+            return {"id": self.id, "kind": self.kind, "polygon": [list(p) for p in self.polygon]}
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "center": list(self.center),
+            "radius_m": self.radius_m,
+        }
+
+    def bbox(self) -> Tuple[float, float, float, float]:
+        """``(min_lat, min_lon, max_lat, max_lon)`` enclosing the fence."""
+        if self.polygon:
+            lats = [p[0] for p in self.polygon]
+            lons = [p[1] for p in self.polygon]
+            return min(lats), min(lons), max(lats), max(lons)
+        lat, lon = self.center
+        dlat = self.radius_m / METERS_PER_DEGREE
+        cos_lat = math.cos(math.radians(lat))
+        dlon = 180.0 if cos_lat < 1e-6 else min(180.0, dlat / cos_lat)
+        return (
+            max(-90.0, lat - dlat),
+            max(-180.0, lon - dlon),
+            min(90.0, lat + dlat),
+            min(180.0, lon + dlon),
+        )
+
+    def contains(self, points: Sequence[Point]) -> List[bool]:
+        if self.polygon:
+            return points_in_polygon(points, self.polygon)
+        return [row[0] <= self.radius_m for row in distance_matrix(points, [self.center])]
+
+
+class FenceIndex:
+    """Uniform grid over fence bounding boxes for point-in-region queries."""
+
+    def __init__(self, fences: Iterable[Fence], cell_deg: float = GRID_DEG) -> None:
+        self.fences = list(fences)
+        self.cell_deg = cell_deg
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._wide: List[int] = []
+        for position, fence in enumerate(self.fences):
+            min_lat, min_lon, max_lat, max_lon = fence.bbox()
+            (i0, j0), (i1, j1) = self._cell(min_lat, min_lon), self._cell(max_lat, max_lon)
+            if (i1 - i0 + 1) * (j1 - j0 + 1) > MAX_FENCE_CELLS:
+                self._wide.append(position)
+                continue
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    self._cells.setdefault((i, j), []).append(position)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def match(self, points: Sequence[Point]) -> List[List[str]]:
+        """Ids of the fences containing each point, in fence order."""
+        groups: Dict[Tuple[int, int], List[int]] = {}
+        for idx, (lat, lon) in enumerate(points):
+            groups.setdefault(self._cell(lat, lon), []).append(idx)
+        hits: List[List[int]] = [[] for _ in points]
+        for cell, members in groups.items():
+            candidates = self._cells.get(cell, []) + self._wide
+            if not candidates:
+                continue
+            subset = [points[idx] for idx in members]
+            circles = [p for p in candidates if self.fences[p].center is not None]
+            if circles:
+                distances = distance_matrix(subset, [self.fences[p].center for p in circles])
+                for row, idx in zip(distances, members):
+                    hits[idx].extend(
+                        p for p, d in zip(circles, row) if d <= self.fences[p].radius_m
+                    )
+            for p in candidates:
+                if self.fences[p].polygon:
+                    for idx, inside in zip(members, self.fences[p].contains(subset)):
+                        if inside:
+                            hits[idx].append(p)
+        return [[self.fences[p].id for p in sorted(found)] for found in hits]
+
+
+def evaluate(index: FenceIndex, positions: Dict[str, Point]) -> Dict[str, Any]:
+    """Evaluate every device position against every fence in ``index``.
+
+    A device is in breach when it is inside a restricted fence, or when safe fences
+    exist and it is outside all of them.
+    """
+    device_ids = list(positions)
+    matches = index.match([positions[d] for d in device_ids])
+    kinds = {fence.id: fence.kind for fence in index.fences}
+    has_safe = "safe" in kinds.values()
+    devices: Dict[str, Any] = {}
+    members: Dict[str, List[str]] = {fence.id: [] for fence in index.fences}
+    breaches: List[str] = []
+    for device_id, inside in zip(device_ids, matches):
+        restricted = [f for f in inside if kinds[f] == "restricted"]
+        safe = any(kinds[f] == "safe" for f in inside)
+        devices[device_id] = {"inside": inside, "restricted": restricted}
+        for fence_id in inside:
+            members[fence_id].append(device_id)
+        if restricted or (has_safe and not safe):
+            breaches.append(device_id)
+    return {"devices": devices, "fences": members, "breaches": breaches}
+
+
+class GeofenceStore:
+    """Persisted fence definitions with a cached :class:`FenceIndex`."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._fences: Dict[str, Fence] = {}
+        self._index: Optional[FenceIndex] = None
+        if self.path.exists():
+            try:
+                raw = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                raw = []
+            for item in raw if isinstance(raw, list) else []:
+                fence = Fence.from_dict(item)
+                self._fences[fence.id] = fence
+
+    def set(self, fences: Iterable[Dict[str, Any]], replace: bool = False) -> List[Fence]:
+        parsed = [Fence.from_dict(item) for item in fences]
+        with self._lock:
+            if replace:
+                self._fences.clear()
+            self._fences.update((fence.id, fence) for fence in parsed)
+            self._index = None
+            self._save()
+            return list(self._fences.values())
+
+    def remove(self, fence_ids: Iterable[str]) -> None:
+        with self._lock:
+            for fence_id in fence_ids:
+                self._fences.pop(fence_id, None)
+            self._index = None
+            self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps([f.to_dict() for f in self._fences.values()]), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def index(self) -> FenceIndex:
+        with self._lock:
+            if self._index is None:
+                self._index = FenceIndex(self._fences.values())
+            return self._index
+
+
+_stores: Dict[Path, GeofenceStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_geofences(path: Path) -> GeofenceStore:
+    """Process-wide fence store backed by ``path``."""
+    key = Path(path).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = GeofenceStore(path)
+        return store
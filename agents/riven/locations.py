@@ -0,0 +1,302 @@
+"""Batched, columnar device-location store for Riven.
+
+Pings are accepted into an in-memory buffer and flushed when
+``RIVEN_TRACK_BATCH`` pings are waiting or ``RIVEN_TRACK_FLUSH_SECONDS`` have
+passed. Each device is its own partition: timestamps, latitudes and longitudes
+are appended to ``<dir>/<device>/{ts,lat,lon}.f64`` on flush, so a flush is three
+sequential writes per device regardless of history. Partition directories are
+named after the sanitised device id plus a short hash of the raw one, so ids that
+sanitise alike (``a/b`` and ``a_b``) never share a partition. Memory holds only the newest
+position of every device and its last ``RIVEN_TRACK_WINDOW`` rows as parallel
+``array('d')`` columns; :meth:`LocationStore.history` answers from that window
+when it can and otherwise reads the column files.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import os
+import re
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+BATCH = int(os.getenv("RIVEN_TRACK_BATCH", "500"))
+FLUSH_SECONDS = float(os.getenv("RIVEN_TRACK_FLUSH_SECONDS", "2.0"))
+WINDOW = int(os.getenv("RIVEN_TRACK_WINDOW", "256"))
+
+COLUMNS = ("ts", "lat", "lon")
+_SAFE_ID = re.compile(r"[^A-Za-z0-9._-]")
+
+Ping = Tuple[str, float, float, float, Dict[str, Any]]
+
+
+def parse_ping(device_id: Any, location: Any, ts: Any = None) -> Optional[Ping]:
+    """Normalise a ping to ``(device_id, ts, lat, lon, location)``; None if unusable."""
+    if not device_id or not isinstance(location, dict):
+        return None
+    lat = location.get("lat", location.get("latitude"))
+    lon = location.get("lon", location.get("lng", location.get("longitude")))
+    when = ts if ts is not None else location.get("ts", location.get("timestamp"))
+    try:
+        lat, lon = float(lat), float(lon)
+        when = float(when) if when is not None else time.time()
+    except (TypeError, ValueError):
+        return None
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        return None
+    return str(device_id), when, lat, lon, location
+
+
+def _read_column(path: Path, start: int, stop: int) -> array:
+    column = array("d")
+    if stop > start:
+        with path.open("rb") as fh:
+            fh.seek(start * 8)
+            column.fromfile(fh, stop - start)
+    return column
+
+
+def _first_at_or_after(path: Path, rows: int, since: float, chunk: int = 64 * 1024) -> int:
+    """Index of the first of ``rows`` timestamps in ``path`` that is >= ``since``."""
+    for start in range(0, rows, chunk):
+        column = _read_column(path, start, min(start + chunk, rows))
+        for offset, ts in enumerate(column):
+            if ts >= since:
+                return start + offset
+    return rows
+
+
+class DevicePartition:
+    """Newest position and the most recent rows of one device."""
+
+    def __init__(self, window: int = WINDOW, rows: int = 0) -> None:
+        self.window = window
+        self.rows = rows  # persisted plus buffered
+        self.ts = array("d")
+        self.lat = array("d")
+        self.lon = array("d")
+        self.latest: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def append(self, ts: float, lat: float, lon: float) -> None:
+        self.ts.append(ts)
+        self.lat.append(lat)
+        self.lon.append(lon)
+        self.rows += 1
+        # Trim in bulk so appends stay amortised O(1)
+        if len(self.ts) >= 2 * self.window:
+            for name in COLUMNS:
+                del getattr(self, name)[: -self.window]
+
+    def in_memory(self, since: Optional[float], limit: Optional[int]) -> bool:
+        """Whether the recent window alone answers a history query."""
+        if len(self.ts) == self.rows:
+            return True
+        return since is None and bool(limit) and limit <= len(self.ts)
+
+
+class LocationStore:
+    """Per-device columnar location history with a buffered ingestion path."""
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        batch: int = BATCH,
+        flush_seconds: float = FLUSH_SECONDS,
+        window: int = WINDOW,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.batch = batch
+        self.flush_seconds = flush_seconds
+        self.window = max(1, window)
+        self._lock = threading.RLock()
+        self._buffer: List[Ping] = []
+        self._devices: Dict[str, DevicePartition] = {}
+        self._dirs: Dict[str, Path] = {}
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._load()
+
+    # -- persistence --------------------------------------------------
+    def _device_dir(self, device_id: str) -> Path:
+        path = self._dirs.get(device_id)
+        if path is None:
+            digest = hashlib.sha1(device_id.encode("utf-8")).hexdigest()[:8]
+            name = f"{_SAFE_ID.sub('_', device_id)[:64]}-{digest}"
+            path = self._dirs[device_id] = self.directory / name
+        return path
+
+    def _load(self) -> None:
+        for device_dir in sorted(p for p in self.directory.iterdir() if p.is_dir()):
+            sizes = [
+                (device_dir / f"{name}.f64").stat().st_size
+                if (device_dir / f"{name}.f64").exists()
+                else 0
+                for name in COLUMNS
+            ]
+            # A crash between column writes leaves them uneven; trust the shortest and
+            # cut the others back so later appends stay aligned
+            rows = min(sizes) // 8
+            partition = DevicePartition(self.window, rows)
+            for name, size in zip(COLUMNS, sizes):
+                path = device_dir / f"{name}.f64"
+                if size > rows * 8:
+                    os.truncate(path, rows * 8)
+                column = _read_column(path, max(0, rows - self.window), rows)
+                getattr(partition, name).extend(column)
+            id_file = device_dir / "device_id"
+            device_id = id_file.read_text(encoding="utf-8") if id_file.exists() else device_dir.name
+            self._dirs[device_id] = device_dir  # partitions written before ids were hashed
+            if rows:
+                partition.latest = {
+                    "device_id": device_id,
+                    "ts": partition.ts[-1],
+                    "lat": partition.lat[-1],
+                    "lon": partition.lon[-1],
+                }
+            self._devices[device_id] = partition
+
+    def _write(self, pings: List[Ping]) -> None:
+        grouped: Dict[str, List[Ping]] = {}
+        for ping in pings:
+            grouped.setdefault(ping[0], []).append(ping)
+        for device_id, rows in grouped.items():
+            device_dir = self._device_dir(device_id)
+            if not device_dir.exists():
+                device_dir.mkdir(parents=True)
+                (device_dir / "device_id").write_text(device_id, encoding="utf-8")
+            for offset, name in enumerate(COLUMNS, start=1):
+                column = array("d", (row[offset] for row in rows))
+                with (device_dir / f"{name}.f64").open("ab") as fh:
+                    column.tofile(fh)
+
+    # -- ingestion ----------------------------------------------------
+    def ingest(self, pings: Iterable[Ping]) -> int:
+        """Buffer parsed pings; returns how many were accepted."""
+        accepted = 0
+        with self._lock:
+            for ping in pings:
+                device_id, ts, lat, lon, location = ping
+                partition = self._devices.get(device_id)
+                if partition is None:
+                    partition = self._devices[device_id] = DevicePartition(self.window)
+                partition.append(ts, lat, lon)
+                if partition.latest is None or ts >= partition.latest["ts"]:
+                    partition.latest = {
+                        **location,
+                        "device_id": device_id,
+                        "ts": ts,
+                        "lat": lat,
+                        "lon": lon,
+                    }
+                self._buffer.append(ping)
+                accepted += 1
+            full = len(self._buffer) >= self.batch
+        if full:
+            self.flush()
+        else:
+            self._ensure_flusher()
+        return accepted
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._buffer = self._buffer, []
+            if pending:
+                self._write(pending)
+        return len(pending)
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="riven-track-flush", daemon=True
+                )
+                self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except OSError:
+                continue
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+
+    # -- queries ------------------------------------------------------
+    def latest(self, device_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            partition = self._devices.get(device_id)
+            return dict(partition.latest) if partition and partition.latest else None
+
+    def latest_all(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                device_id: dict(partition.latest)
+                for device_id, partition in self._devices.items()
+                if partition.latest
+            }
+
+    def history(
+        self, device_id: str, since: Optional[float] = None, limit: Optional[int] = None
+    ) -> Dict[str, List[float]]:
+        """Columns for ``device_id`` in ingestion order, optionally from ``since`` onwards.
+
+        Served from the recent window when it covers the query, otherwise read from the
+        partition files after flushing buffered pings.
+        """
+        with self._lock:
+            partition = self._devices.get(device_id)
+            if partition is None:
+                return {name: [] for name in COLUMNS}
+            if partition.in_memory(since, limit):
+                recent = len(partition.ts)
+                start = 0
+                if since is not None:
+                    start = next((i for i, ts in enumerate(partition.ts) if ts >= since), recent)
+                if limit:
+                    start = max(start, recent - limit)
+                return {name: getattr(partition, name)[start:].tolist() for name in COLUMNS}
+            self.flush()
+            rows = partition.rows
+            device_dir = self._device_dir(device_id)
+        start = 0
+        if since is not None:
+            start = _first_at_or_after(device_dir / "ts.f64", rows, since)
+        if limit:
+            start = max(start, rows - limit)
+        return {
+            name: _read_column(device_dir / f"{name}.f64", start, rows).tolist()
+            for name in COLUMNS
+        }
+
+    def devices(self) -> List[str]:
+        with self._lock:
+            return sorted(self._devices)
+
+
+_stores: Dict[Path, LocationStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_location_store(directory: Path) -> LocationStore:
+    """Process-wide store for ``directory``; flushed at interpreter exit."""
+    key = Path(directory).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            # Resolved, so later flushes land in the same place whatever the cwd is then
+            store = _stores[key] = LocationStore(key)
+            atexit.register(store.close)
+        return store
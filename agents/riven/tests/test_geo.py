@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.riven import geo
+from agents.riven.geo import Fence, FenceIndex, GeofenceStore, distance_matrix, evaluate, haversine
+
+HOME = {"id": "home", "center": [51.5007, -0.1246], "radius_m": 500}
+SCHOOL = {
+    "id": "school",
+    "polygon": [[51.51, -0.14], [51.51, -0.12], [51.52, -0.12], [51.52, -0.14]],
+}
+QUARRY = {"id": "quarry", "kind": "restricted", "center": [51.60, -0.20], "radius_m": 1000}
+
+
+def test_distance_matrix_matches_scalar_haversine():
+    sources = [(51.5007, -0.1246), (40.6892, -74.0445)]
+    targets = [(48.8584, 2.2945), (51.5007, -0.1246), (35.6586, 139.7454)]
+    matrix = distance_matrix(sources, targets)
+    assert len(matrix) == 2 and len(matrix[0]) == 3
+    for row, source in zip(matrix, sources):
+        for value, target in zip(row, targets):
+            assert value == pytest.approx(haversine(source, target), rel=1e-9)
+    assert matrix[0][1] == pytest.approx(0.0, abs=1e-6)
+    assert 340_000 < matrix[0][0] < 345_000
+
+
+def test_pure_python_fallback_agrees(monkeypatch):
+    points = [(51.515, -0.13), (51.53, -0.13)]
+    polygon = [tuple(p) for p in SCHOOL["polygon"]]
+    expected = geo.points_in_polygon(points, polygon)
+    distances = [row[0] for row in distance_matrix(points, [(51.5, -0.12)])]
+    monkeypatch.setattr(geo, "np", None)
+    assert geo.points_in_polygon(points, polygon) == expected == [True, False]
+    fallback = [row[0] for row in distance_matrix(points, [(51.5, -0.12)])]
+    assert fallback == pytest.approx(distances)
+
+
+def test_fence_index_and_breaches():
+    index = FenceIndex([Fence.from_dict(f) for f in (HOME, SCHOOL, QUARRY)], cell_deg=0.05)
+    result = evaluate(
+        index,
+        {
+            "kid": (51.515, -0.13),
+            "parent": (51.5010, -0.1250),
+            "teen": (51.601, -0.201),
+            "dog": (52.0, 1.0),
+        },
+    )
+    assert result["devices"]["kid"]["inside"] == ["school"]
+    assert result["devices"]["parent"]["inside"] == ["home"]
+    assert result["devices"]["teen"]["restricted"] == ["quarry"]
+    assert result["fences"]["home"] == ["parent"]
+    assert sorted(result["breaches"]) == ["dog", "teen"]
+
+
+def test_wide_fence_is_checked_everywhere():
+    fence = Fence.from_dict({"id": "uk", "center": [54, -2], "radius_m": 600_000})
+    index = FenceIndex([fence], cell_deg=0.01)
+    assert index.match([(51.5, -0.12), (40.7, -74.0)]) == [["uk"], []]
+
+
+def test_fence_validation_and_persistence(tmp_path):
+    with pytest.raises(ValueError):
+        Fence.from_dict({"id": "x", "polygon": [[0, 0], [1, 1]]})
+    with pytest.raises(ValueError):
+        Fence.from_dict({"id": "x", "kind": "odd", "center": [0, 0], "radius_m": 1})
+    store = GeofenceStore(tmp_path / "geofences.json")
+    store.set([HOME, SCHOOL])
+    store.set([QUARRY])
+    assert [f.id for f in GeofenceStore(tmp_path / "geofences.json").index().fences] == [
+        "home",
+        "school",
+        "quarry",
+    ]
+    store.set([HOME], replace=True)
+    assert [f.id for f in store.index().fences] == ["home"]
@@ -0,0 +1,117 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from agents.riven.locations import LocationStore, parse_ping
+
+
+def test_parse_ping_accepts_aliases_and_rejects_bad_coordinates():
+    ping = parse_ping("d1", {"latitude": "10.5", "lng": 20, "timestamp": 5})
+    assert ping[:4] == ("d1", 5.0, 10.5, 20.0)
+    assert parse_ping("d1", {"lat": 91, "lon": 0}) is None
+    assert parse_ping("d1", {"lat": "x", "lon": 0}) is None
+    assert parse_ping("", {"lat": 1, "lon": 1}) is None
+
+
+def test_ingest_buffers_until_batch_and_reloads_columns(tmp_path):
+    store = LocationStore(tmp_path, batch=3, flush_seconds=60)
+    store.ingest([parse_ping("d1", {"lat": 1, "lon": 2, "ts": 1})])
+    assert not (store._device_dir("d1") / "ts.f64").exists()
+    assert store.latest("d1")["lat"] == 1.0
+
+    store.ingest(
+        [
+            parse_ping("d1", {"lat": 3, "lon": 4, "ts": 3}),
+            parse_ping("d2", {"lat": 5, "lon": 6, "ts": 2, "battery": 80}),
+        ]
+    )
+    assert (store._device_dir("d1") / "ts.f64").stat().st_size == 16
+    assert store.latest("d2")["battery"] == 80
+
+    reloaded = LocationStore(tmp_path, batch=3, flush_seconds=60)
+    assert reloaded.devices() == ["d1", "d2"]
+    assert reloaded.history("d1") == {"ts": [1.0, 3.0], "lat": [1.0, 3.0], "lon": [2.0, 4.0]}
+    assert reloaded.latest("d1")["lon"] == 4.0
+    assert reloaded.history("d1", since=2)["ts"] == [3.0]
+    assert reloaded.history("d1", limit=1)["ts"] == [3.0]
+
+
+def test_out_of_order_ping_keeps_newest_latest(tmp_path):
+    store = LocationStore(tmp_path, batch=10, flush_seconds=60)
+    store.ingest([parse_ping("d1", {"lat": 1, "lon": 1, "ts": 10})])
+    store.ingest([parse_ping("d1", {"lat": 2, "lon": 2, "ts": 5})])
+    assert store.latest("d1")["ts"] == 10.0
+    store.close()
+    assert len(LocationStore(tmp_path).history("d1")["ts"]) == 2
+
+
+def test_memory_keeps_a_bounded_window_and_history_reads_disk(tmp_path):
+    store = LocationStore(tmp_path, batch=1000, flush_seconds=60, window=4)
+    store.ingest(parse_ping("d1", {"lat": i, "lon": i, "ts": i}) for i in range(20))
+    partition = store._devices["d1"]
+    assert len(partition) == 20 and len(partition.ts) < 8
+    assert store.history("d1", limit=3)["ts"] == [17.0, 18.0, 19.0]
+    assert store.history("d1", since=5, limit=100)["ts"] == [float(i) for i in range(5, 20)]
+    assert len(store.history("d1")["lat"]) == 20
+
+    reloaded = LocationStore(tmp_path, window=4)
+    assert len(reloaded._devices["d1"].ts) == 4
+    assert reloaded.latest("d1")["ts"] == 19.0
+    assert reloaded.history("d1", since=18)["lon"] == [18.0, 19.0]
+
+
+def test_uneven_columns_are_trimmed_on_load(tmp_path):
+    store = LocationStore(tmp_path, batch=1)
+    store.ingest([parse_ping("d1", {"lat": 1, "lon": 1, "ts": 1})])
+    with (store._device_dir("d1") / "ts.f64").open("ab") as fh:
+        fh.write(b"\0" * 8)
+    reloaded = LocationStore(tmp_path)
+    reloaded.ingest([parse_ping("d1", {"lat": 2, "lon": 2, "ts": 2})])
+    reloaded.flush()
+    assert LocationStore(tmp_path).history("d1") == {
+        "ts": [1.0, 2.0],
+        "lat": [1.0, 2.0],
+        "lon": [1.0, 2.0],
+    }
+
+
+def test_riven_imports_the_baseline_device_track_file(tmp_path, monkeypatch):
+    from agents.riven.agent import RivenAgent
+
+    monkeypatch.chdir(tmp_path)
+    log_dir = tmp_path / "logs" / "riven"
+    log_dir.mkdir(parents=True)
+    entries = [{"device_id": "kid", "location": {"lat": 1.5, "lon": 2.5, "ts": 7}}]
+    (log_dir / "device_track.json").write_text(json.dumps(entries))
+
+    riven = RivenAgent()
+    assert riven.locations.latest("kid")["lat"] == 1.5
+    assert (log_dir / "device_track.json.migrated").exists()
+
+
+def test_ids_that_sanitise_alike_keep_separate_partitions(tmp_path):
+    store = LocationStore(tmp_path, batch=1, flush_seconds=60)
+    store.ingest([parse_ping("a/b", {"lat": 1, "lon": 1, "ts": 1})])
+    store.ingest([parse_ping("a_b", {"lat": 2, "lon": 2, "ts": 2})])
+
+    reloaded = LocationStore(tmp_path, batch=1, flush_seconds=60)
+    assert reloaded.devices() == ["a/b", "a_b"]
+    assert reloaded.history("a/b")["lat"] == [1.0]
+    assert reloaded.history("a_b")["lat"] == [2.0]
+
+
+def test_track_device_journals_pings_without_coordinates(tmp_path, monkeypatch):
+    from agents.riven.agent import RivenAgent
+
+    monkeypatch.chdir(tmp_path)
+    riven = RivenAgent()
+    riven.track_device("kid", {"place": "school"})
+    riven.track_device("kid", {"lat": 3, "lon": 4})
+
+    assert [entry["location"] for entry in riven.journal("device_track")] == [
+        {"place": "school"},
+        {"lat": 3, "lon": 4},
+    ]
+    assert riven.locations.latest("kid")["lat"] == 3.0
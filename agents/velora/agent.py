@@ -9,7 +9,7 @@ from pathlib import Path
 from statistics import mean
 from typing import Any, Dict, Iterable, List, Sequence
 
-from agents.base import BaseAgent
+from agents.base import BaseAgent, command
 from agents.common.alog import info
 
 
@@ -113,102 +113,64 @@ class VeloraAgent(BaseAgent):
                 alerts.append(f"Severe drop between {start} and {end}")
         return {"conversions": conversions, "alerts": alerts}
 
-    def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Route Velora commands to analytics routines."""
-        command = payload.get("command")
-        args = payload.get("args", {})
-        info("velora.command", {"command": command, "args": list(args.keys())})
-        try:
-            if command == "generate_report":
-                return {
-                    "success": True,
-                    "output": self.generate_report(args.get("data", {})),
-                    "error": None,
-                }
-            if command == "schedule_post":
-                return {
-                    "success": True,
-                    "output": self.schedule_post(args.get("content", ""), args.get("when")),
-                    "error": None,
-                }
-            if command == "forecast_revenue":
-                return {
-                    "success": True,
-                    "output": self.forecast_revenue(args.get("history", [])),
-                    "error": None,
-                }
-            if command == "crm_export":
-                return {
-                    "success": True,
-                    "output": self.export_crm(args.get("clients", [])),
-                    "error": None,
-                }
-            if command == "ad_generate":
-                return {
-                    "success": True,
-                    "output": self.generate_ad_copy(
-                        args.get("product", ""), args.get("audience", "")
-                    ),
-                    "error": None,
-                }
-            if command == "segment_customers":
-                return {
-                    "success": True,
-                    "output": self.segment_customers(args.get("clients", [])),
-                    "error": None,
-                }
-            if command == "calculate_ltv":
-                return {
-                    "success": True,
-                    "output": self.calculate_ltv(
-                        float(args.get("monthly_spend", 0.0)),
-                        int(args.get("retention_months", 1)),
-                        float(args.get("margin", 0.6)),
-                    ),
-                    "error": None,
-                }
-            if command == "funnel_health":
-                return {
-                    "success": True,
-                    "output": self.funnel_health(args.get("stages", {})),
-                    "error": None,
-                }
-
-            if command == "creator_analytics":
-                return {"success": True, "output": self.creator_analytics(args), "error": None}
-
-            if command == "revenue_optimization":
-                return {"success": True, "output": self.revenue_optimization(args), "error": None}
+    @command("generate_report", args={"data": dict})
+    def _cmd_generate_report(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarize numeric metrics with total, average, and ranking."""
+        return self.generate_report(args.get("data", {}))
 
-            if command == "content_performance":
-                return {"success": True, "output": self.content_performance(args), "error": None}
+    @command("schedule_post", args={"content": str, "when": str}, cost="io")
+    def _cmd_schedule_post(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist scheduled campaign posts with ISO timestamps."""
+        return self.schedule_post(args.get("content", ""), args.get("when"))
 
-            if command == "subscriber_analytics":
-                return {"success": True, "output": self.subscriber_analytics(args), "error": None}
+    @command("forecast_revenue", args={"history": list})
+    def _cmd_forecast_revenue(self, args: Dict[str, Any]) -> Dict[str, float]:
+        """Project next-period revenue using simple momentum and average growth."""
+        return self.forecast_revenue(args.get("history", []))
 
-            if command == "pricing_optimization":
-                return {"success": True, "output": self.pricing_optimization(args), "error": None}
+    @command("crm_export", args={"clients": list}, cost="io")
+    def _cmd_crm_export(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Export CRM roster to CSV for sovereign records."""
+        return self.export_crm(args.get("clients", []))
 
-            if command == "engagement_analytics":
-                return {"success": True, "output": self.engagement_analytics(args), "error": None}
+    @command("ad_generate", args={"product": str, "audience": str})
+    def _cmd_ad_generate(self, args: Dict[str, Any]) -> Dict[str, str]:
+        """Produce conversion-optimized copy for paid placements."""
+        return self.generate_ad_copy(args.get("product", ""), args.get("audience", ""))
 
-            if command == "revenue_forecast_advanced":
-                return {
-                    "success": True,
-                    "output": self.revenue_forecast_advanced(args),
-                    "error": None,
-                }
+    @command("segment_customers", args={"clients": list})
+    def _cmd_segment_customers(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Cluster customers by spend bands for tailored nurture sequences."""
+        return self.segment_customers(args.get("clients", []))
 
-            if command == "competitor_analysis":
-                return {"success": True, "output": self.competitor_analysis(args), "error": None}
+    @command(
+        "calculate_ltv",
+        args={"monthly_spend": float, "retention_months": int, "margin": float},
+    )
+    def _cmd_calculate_ltv(self, args: Dict[str, Any]) -> Dict[str, float]:
+        """Compute lifetime value using deterministic gross margin."""
+        return self.calculate_ltv(
+            float(args.get("monthly_spend", 0.0)),
+            int(args.get("retention_months", 1)),
+            float(args.get("margin", 0.6)),
+        )
 
-            if command == "platform_analytics":
-                return {"success": True, "output": self.platform_analytics(args), "error": None}
+    @command("funnel_health", args={"stages": dict})
+    def _cmd_funnel_health(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluate funnel conversion rates and flag drop-off points."""
+        return self.funnel_health(args.get("stages", {}))
 
-            raise ValueError(f"unknown command '{command}'")
+    def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Route Velora commands to analytics routines."""
+        command = payload.get("command")
+        args = payload.get("args", {})
+        info("velora.command", {"command": command, "args": list(args.keys())})
+        try:
+            return {"success": True, "output": self.dispatch_command(command, args), "error": None}
         except Exception as exc:  # noqa: BLE001
             return {"success": False, "output": None, "error": str(exc)}
 
+    @command(args={"creator_id": str, "timeframe": str, "include_predictions": bool})
     def creator_analytics(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Comprehensive creator analytics with AI insights."""
         creator_id = args.get("creator_id", "current_user")
@@ -392,6 +354,7 @@ class VeloraAgent(BaseAgent):
 
         return predictions
 
+    @command(args={"creator_id": str, "type": str})
     def revenue_optimization(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Advanced revenue optimization analysis."""
         import random
@@ -450,6 +413,7 @@ class VeloraAgent(BaseAgent):
 
         return optimization
 
+    @command(args={"timeframe": str, "content_type": str})
     def content_performance(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Detailed content performance analytics."""
         import random
@@ -538,6 +502,7 @@ class VeloraAgent(BaseAgent):
 
         return performance_data
 
+    @command(args={"timeframe": str})
     def subscriber_analytics(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Advanced subscriber behavior and analytics."""
         import random
@@ -606,6 +571,7 @@ class VeloraAgent(BaseAgent):
 
         return subscriber_data
 
+    @command(args={"content_items": list, "goal": str})
     def pricing_optimization(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """AI-powered pricing optimization analysis."""
         import random
@@ -678,6 +644,7 @@ class VeloraAgent(BaseAgent):
 
         return pricing_analysis
 
+    @command(args={"timeframe": str})
     def engagement_analytics(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Comprehensive engagement analytics and optimization."""
         import random
@@ -734,6 +701,7 @@ class VeloraAgent(BaseAgent):
 
         return engagement_data
 
+    @command(args={"historical_data": list, "forecast_period": str, "include_scenarios": bool})
     def revenue_forecast_advanced(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Advanced machine learning-based revenue forecasting."""
         import random
@@ -817,6 +785,7 @@ class VeloraAgent(BaseAgent):
 
         return forecast
 
+    @command(args={"scope": str})
     def competitor_analysis(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Competitive intelligence and benchmarking."""
         import random
@@ -900,6 +869,7 @@ class VeloraAgent(BaseAgent):
 
         return analysis
 
+    @command(args={"platforms": list})
     def platform_analytics(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Multi-platform performance analytics."""
         import random
@@ -5,9 +5,35 @@ import argparse
 import json
 import os
 import sys
+import time
 from typing import Any, Dict
 
 
+def _run_job(requests: Any, base: str, payload: Dict[str, Any], interval: float) -> int:
+    """Submit ``payload`` to the job queue and poll until it reaches a final state."""
+    try:
+        resp = requests.post(base + "/jobs", json=payload, timeout=10)
+        resp.raise_for_status()
+        job_id = resp.json()["job_id"]
+        print(f"job {job_id} queued", file=sys.stderr)
+        seen = 0
+        while True:
+            resp = requests.get(f"{base}/jobs/{job_id}", timeout=10)
+            resp.raise_for_status()
+            job = resp.json()
+            for event in job.get("events", []):
+                if event["seq"] > seen and event["kind"] == "progress":
+                    print(json.dumps(event["data"]), file=sys.stderr)
+                seen = max(seen, event["seq"])
+            if job["status"] in {"succeeded", "failed"}:
+                print(json.dumps(job.get("result") or {"error": job.get("error")}, indent=2))
+                return 0 if job["status"] == "succeeded" else 5
+            time.sleep(interval)
+    except Exception as e:
+        print(f"request failed: {e}", file=sys.stderr)
+        return 4
+
+
 def main() -> int:
     p = argparse.ArgumentParser(description="NovaCLI: orchestrate NovaOS agents")
     sub = p.add_subparsers(dest="cmd", required=True)
@@ -17,9 +43,63 @@ def main() -> int:
     r.add_argument("command", help="command for the agent, e.g., hash_file")
     r.add_argument("--arg", action="append", default=[], help="key=value pairs for args")
     r.add_argument("--orchestrator", default=os.getenv("ORCHESTRATOR_URL", "http://localhost:9400"))
+    r.add_argument(
+        "--async",
+        dest="use_job",
+        action="store_true",
+        help="submit as a background job and poll for the result",
+    )
+    r.add_argument("--poll-interval", type=float, default=1.0, help="seconds between job polls")
+    r.add_argument("--profile", action="store_true", help="profile the command on the server")
+
+    j = sub.add_parser("job", help="Show status and result of a background job")
+    j.add_argument("job_id", help="job id returned by 'run --async'")
+    j.add_argument("--orchestrator", default=os.getenv("ORCHESTRATOR_URL", "http://localhost:9400"))
+
+    m = sub.add_parser("metrics", help="Summarize per-command latency and error metrics")
+    m.add_argument("--limit", type=int, default=0, help="show only the N slowest commands")
+    m.add_argument("--json", action="store_true", help="print the raw metrics snapshot")
+    m.add_argument("--orchestrator", default=os.getenv("ORCHESTRATOR_URL", "http://localhost:9400"))
 
     ns = p.parse_args()
 
+    if ns.cmd == "metrics":
+        try:
+            import requests  # type: ignore
+        except Exception:
+            print("ERROR: requests not installed. pip install requests", file=sys.stderr)
+            return 3
+        try:
+            resp = requests.get(ns.orchestrator.rstrip("/") + "/metrics", timeout=10)
+            resp.raise_for_status()
+            snapshot = resp.json()
+        except Exception as e:
+            print(f"request failed: {e}", file=sys.stderr)
+            return 4
+        if ns.json:
+            print(json.dumps(snapshot, indent=2))
+        else:
+            from agents.common.metrics import format_summary
+
+            print(format_summary(snapshot, ns.limit or None))
+        return 0
+
+    if ns.cmd == "job":
+        try:
+            import requests  # type: ignore
+        except Exception:
+            print("ERROR: requests not installed. pip install requests", file=sys.stderr)
+            return 3
+        url = ns.orchestrator.rstrip("/") + f"/jobs/{ns.job_id}"
+        try:
+            resp = requests.get(url, timeout=10)
+            resp.raise_for_status()
+            print(json.dumps(resp.json(), indent=2))
+            return 0
+        except Exception as e:
+            print(f"request failed: {e}", file=sys.stderr)
+            return 4
+
     if ns.cmd == "run":
         args: Dict[str, Any] = {}
         for kv in ns.arg:
@@ -41,11 +121,15 @@ def main() -> int:
             args[k] = vv
 
         payload = {"agent": ns.agent, "command": ns.command, "args": args}
+        if ns.profile:
+            payload["profile"] = True
         try:
             import requests  # type: ignore
         except Exception:
             print("ERROR: requests not installed. pip install requests", file=sys.stderr)
             return 3
+        if ns.use_job:
+            return _run_job(requests, ns.orchestrator.rstrip("/"), payload, ns.poll_interval)
         url = ns.orchestrator.rstrip("/") + "/run"
         try:
             resp = requests.post(url, json=payload, timeout=60)
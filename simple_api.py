@@ -12,12 +12,35 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from fastapi import FastAPI
+import asyncio
+import hmac
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 import json
 
-app = FastAPI(title="NovaOS Simple Core API")
+from agents.common.jobs import TERMINAL_EVENTS, JobQueue
+from agents.common.metrics import REGISTRY as METRICS, format_summary
+from agents.common.profiling import find_artifact
+
+# How often an SSE stream checks for new job events, and how long it stays silent
+# before sending a keep-alive comment
+EVENT_POLL_SECONDS = float(os.getenv("NOVA_JOB_EVENT_POLL_SECONDS", "0.5"))
+KEEPALIVE_SECONDS = 15.0
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resume queued jobs (and fail interrupted ones) as soon as the API is up
+    queue = _job_queue()
+    yield
+    queue.shutdown(wait=False)
+
+
+app = FastAPI(title="NovaOS Simple Core API", lifespan=lifespan)
 
 
 class RunAgentRequest(BaseModel):
@@ -25,54 +48,228 @@ class RunAgentRequest(BaseModel):
     command: str
     args: Dict[str, Any] = {}
     log: bool = False
+    profile: bool = False
+    # RBAC context forwarded by Nova when it routes a job to this replica
+    token: Optional[str] = None
+    role: Optional[str] = None
+    identity: Optional[Dict[str, Any]] = None
+    source: Optional[str] = None
+    request_id: Optional[str] = None
+
+
+def _build_agent(name: str):
+    """Instantiate the agent registered under ``name``."""
+    if name == "nova":
+        from agents.nova.agent import NovaAgent
+        from core.registry import AgentRegistry
+
+        registry = AgentRegistry()
+        return NovaAgent(registry)
+    elif name == "echo":
+        from agents.echo.agent import EchoAgent
+
+        return EchoAgent()
+    elif name == "glitch":
+        from agents.glitch.agent import GlitchAgent
+
+        return GlitchAgent()
+    elif name == "lyra":
+        from agents.lyra.agent import LyraAgent
+
+        return LyraAgent()
+    elif name == "velora":
+        from agents.velora.agent import VeloraAgent
+
+        return VeloraAgent()
+    elif name == "audita":
+        from agents.audita.agent import AuditaAgent
+
+        return AuditaAgent()
+    elif name == "riven":
+        from agents.riven.agent import RivenAgent
+
+        return RivenAgent()
+    raise KeyError(f"Unknown agent: {name}")
+
+
+def _agent_payload(
+    command: str, args: Dict[str, Any], profile: bool = False
+) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"command": command, "args": args}
+    if profile:
+        payload["profile"] = True
+    return payload
+
+
+def _run_agent(
+    agent: str, command: str, args: Dict[str, Any], profile: bool = False
+) -> Dict[str, Any]:
+    try:
+        agent_instance = _build_agent(agent)
+    except KeyError as exc:
+        return {"success": False, "output": None, "error": exc.args[0]}
+    return agent_instance.run(_agent_payload(command, args, profile))
+
+
+async def _run_agent_async(
+    agent: str, command: str, args: Dict[str, Any], profile: bool = False
+) -> Dict[str, Any]:
+    try:
+        agent_instance = _build_agent(agent)
+    except KeyError as exc:
+        return {"success": False, "output": None, "error": exc.args[0]}
+    return await agent_instance.run_async(_agent_payload(command, args, profile))
+
+
+def _run_routed(request: RunAgentRequest) -> Dict[str, Any]:
+    """Run a job Nova routed here through the registry, applying the caller's RBAC."""
+    from core.registry import AgentRegistry
+
+    try:
+        agent_instance = _build_agent(request.agent)
+    except KeyError as exc:
+        return {"success": False, "output": None, "error": exc.args[0]}
+    registry = AgentRegistry()
+    registry.register(request.agent, agent_instance)
+    job = {
+        "command": request.command,
+        "args": request.args,
+        "log": request.log,
+        "requested_by": request.identity or {"role": request.role},
+    }
+    response = registry.call(
+        request.agent,
+        job,
+        request.token,
+        request.role,
+        source=request.source or "nova",
+        request_id=request.request_id,
+        identity=request.identity,
+    )
+    return {
+        "success": response.success,
+        "output": response.output,
+        "error": response.error,
+        "job_id": response.job_id,
+        "request_id": response.request_id or request.request_id,
+    }
+
+
+def _command_idempotent(agent: str, command: str) -> bool:
+    spec = _build_agent(agent).get_command(command)
+    return bool(spec and spec.idempotent)
+
+
+_jobs: Optional[JobQueue] = None
+
+
+def _job_queue() -> JobQueue:
+    global _jobs
+    if _jobs is None:
+        _jobs = JobQueue(_run_agent, is_idempotent=_command_idempotent)
+        _jobs.start()
+    return _jobs
 
 
 @app.post("/run")
-async def run_agent_orchestrator(request: RunAgentRequest):
+async def run_agent_orchestrator(
+    request: RunAgentRequest, x_agent_token: Optional[str] = Header(None)
+):
     """
     Simple orchestrator endpoint for running agents.
+
+    Requests carrying ``X-Agent-Token`` were routed here by Nova and run through
+    the registry with the RBAC context they carry.
     """
+    if x_agent_token is not None:
+        shared = os.getenv("AGENT_SHARED_TOKEN") or os.getenv("NOVA_AGENT_TOKEN", "")
+        if not shared or not hmac.compare_digest(x_agent_token, shared):
+            raise HTTPException(status_code=403, detail="invalid agent token")
+        try:
+            return await asyncio.to_thread(_run_routed, request)
+        except PermissionError as e:
+            raise HTTPException(status_code=403, detail=str(e))
+        except Exception as e:
+            return {"success": False, "output": None, "error": str(e)}
     try:
-        # Import agent modules dynamically
-        if request.agent == "nova":
-            from agents.nova.agent import NovaAgent
-            from core.registry import AgentRegistry
+        return await _run_agent_async(
+            request.agent, request.command, request.args, request.profile
+        )
+    except Exception as e:
+        return {"success": False, "output": None, "error": str(e)}
 
-            registry = AgentRegistry()
-            agent_instance = NovaAgent(registry)
-        elif request.agent == "echo":
-            from agents.echo.agent import EchoAgent
 
-            agent_instance = EchoAgent()
-        elif request.agent == "glitch":
-            from agents.glitch.agent import GlitchAgent
+@app.get("/agents/{name}/commands")
+async def list_agent_commands(name: str):
+    """Describe the commands an agent exposes, including cost class and restrictions."""
+    try:
+        agent_instance = _build_agent(name)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=exc.args[0])
+    return {"agent": name, "commands": agent_instance.list_commands()}
 
-            agent_instance = GlitchAgent()
-        elif request.agent == "lyra":
-            from agents.lyra.agent import LyraAgent
 
-            agent_instance = LyraAgent()
-        elif request.agent == "velora":
-            from agents.velora.agent import VeloraAgent
+@app.post("/jobs")
+async def submit_job(request: RunAgentRequest):
+    """Queue a long-running agent command and return its job id immediately."""
+    job_id = _job_queue().submit(request.agent, request.command, request.args)
+    return {"job_id": job_id, "status": "queued"}
 
-            agent_instance = VeloraAgent()
-        elif request.agent == "audita":
-            from agents.audita.agent import AuditaAgent
 
-            agent_instance = AuditaAgent()
-        elif request.agent == "riven":
-            from agents.riven.agent import RivenAgent
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Return job status, result and any partial results reported so far."""
+    queue = _job_queue()
+    job = queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    job["events"] = queue.events(job_id)
+    return job
 
-            agent_instance = RivenAgent()
-        else:
-            return {"success": False, "output": None, "error": f"Unknown agent: {request.agent}"}
 
-        # Run the agent with the provided command and args
-        result = agent_instance.run({"command": request.command, "args": request.args})
-        return result
+@app.get("/jobs/{job_id}/events")
+async def stream_job(job_id: str, after: int = 0):
+    """Stream job events as Server-Sent Events until the job finishes."""
+    queue = _job_queue()
+    if queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="job not found")
 
-    except Exception as e:
-        return {"success": False, "output": None, "error": str(e)}
+    async def event_source():
+        last = after
+        quiet_since = time.monotonic()
+        while True:
+            events = queue.events(job_id, last)
+            for event in events:
+                last = event["seq"]
+                yield f"id: {last}\nevent: {event['kind']}\ndata: {json.dumps(event)}\n\n"
+                if event["kind"] in TERMINAL_EVENTS:
+                    return
+            if events:
+                quiet_since = time.monotonic()
+            elif time.monotonic() - quiet_since >= KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                quiet_since = time.monotonic()
+            await asyncio.sleep(EVENT_POLL_SECONDS)
+
+    return StreamingResponse(event_source(), media_type="text/event-stream")
+
+
+@app.get("/metrics")
+async def metrics(format: str = "json", limit: int = 0):
+    """Per agent/command latency histograms, throughput and error counters."""
+    snapshot = METRICS.snapshot()
+    if format == "text":
+        return PlainTextResponse(format_summary(snapshot, limit or None))
+    return snapshot
+
+
+@app.get("/profiles/{agent}/{artifact_id}")
+async def get_profile(agent: str, artifact_id: str):
+    """Download a profile artifact produced by a profiled command."""
+    path = find_artifact(agent, artifact_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="profile not found")
+    return FileResponse(path, filename=path.name)
 
 
 @app.get("/health")
@@ -114,29 +114,31 @@ def test_agent_control_redis_connection():
     """Test agent control bus Redis connection."""
     print("\n🔍 Testing agent control bus Redis connection...")
     
+    # The control bus and every other agent-side client share agents.common.redis_client
+    from agents.common.redis_client import (
+        _parse_redis_db_from_url,
+        base_url,
+        pool_kwargs,
+        resolve_redis_db,
+    )
+
     # Test with REDIS_DB environment variable
     with patch.dict(os.environ, {'REDIS_DB': '1', 'AGENT_NAME': 'test'}):
-        # Manually test the logic since imports are complex
-        redis_db = int(os.getenv("REDIS_DB")) if os.getenv("REDIS_DB") else None
-        assert redis_db == 1
+        assert resolve_redis_db() == 1
+        assert pool_kwargs()['db'] == 1
         print("  ✅ Agent control bus reads REDIS_DB environment variable")
-        
-        # Test URL parsing manually
-        from urllib.parse import urlparse
-        
-        def _parse_redis_db_from_url(redis_url: str) -> int:
-            try:
-                parsed = urlparse(redis_url)
-                if parsed.path and len(parsed.path) > 1:
-                    db_str = parsed.path.lstrip('/')
-                    return int(db_str) if db_str.isdigit() else 0
-            except:
-                pass
-            return 0
-        
+
         assert _parse_redis_db_from_url("redis://redis:6379/2") == 2
         print("  ✅ Agent control bus URL parsing works correctly")
 
+    # Without REDIS_DB the database comes from REDIS_URL
+    env = {k: v for k, v in os.environ.items() if k != 'REDIS_DB'}
+    env['REDIS_URL'] = 'redis://redis:6379/2'
+    with patch.dict(os.environ, env, clear=True):
+        assert resolve_redis_db() == 2
+        assert base_url() == 'redis://redis:6379'
+        print("  ✅ Agent control bus falls back to the REDIS_URL database")
+
 def test_redis_logging_behavior():
     """Test that Redis connections log the database they're connecting to."""
     print("\n🔍 Testing Redis connection logging...")
@@ -172,30 +174,14 @@ def test_redis_logging_behavior():
             
             with patch.dict(os.environ, test_env):
                 # Test the core-api Redis connection logic directly
-                from urllib.parse import urlparse
-                
-                def _get_redis_db():
-                    redis_db = int(os.getenv("REDIS_DB")) if os.getenv("REDIS_DB") else None
-                    if redis_db is not None:
-                        return redis_db
-                    
-                    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-                    parsed = urlparse(redis_url)
-                    if parsed.path and len(parsed.path) > 1:
-                        db_str = parsed.path.lstrip('/')
-                        return int(db_str) if db_str.isdigit() else 0
-                    return 0
-                
-                db_num = _get_redis_db()
+                from agents.common.redis_client import base_url, resolve_redis_db
+
+                db_num = resolve_redis_db()
                 assert db_num == 1
-                
-                # Simulate the Redis connection call
-                parsed = urlparse(os.getenv("REDIS_URL"))
-                base_url = f"{parsed.scheme}://{parsed.netloc}"
-                
+
                 # This simulates what happens in get_redis()
                 import redis.asyncio as redis
-                redis.from_url(base_url, db=db_num, decode_responses=True)
+                redis.from_url(base_url(), db=db_num, decode_responses=True)
                 
                 # Verify Redis was called with correct DB
                 mock_redis.assert_called()